@@ -0,0 +1,310 @@
+"""
+清单驱动的批量查重模块
+
+按 CSV 或 JSONL 清单列出的 (原文, 待比较论文) 对批量计算相似度，取代逐对调用 main.py 的脚本循环：
+进程只启动一次。主进程的 asyncio 事件循环只负责调度：清单在 I/O 线程中分批流式读取和解析，
+结果也在 I/O 线程中写出，两者都与进程池中的计算重叠；向进程池提交的是文件路径，
+论文文件由工作进程读取并按路径缓存（同一原文与多篇论文相邻时只读取、分词一次），
+因此一对论文的读取与其他文档对的计算在不同的工作进程中并行，原文不经过主进程。
+同时处理的文档对数有上限，内存占用不随清单长度增长。
+
+结果按完成顺序逐行追加到 JSONL 文件，每行包含 index（清单中的序号）、id、original、candidate、metric，
+以及 similarity 或 error。中途崩溃后重新运行同一命令即可续跑：已有 similarity 的文档对被跳过，
+出错的文档对会重新计算，写到一半的末行会被截掉。续跑前先压缩结果文件，删除出错的记录和同一 id 的重复记录，
+因此每个 id 在结果文件中最多只有一行：反复出错的文档对只保留最近一次的错误，之后算出结果时错误记录不再保留。
+
+清单格式：
+    CSV    表头包含 original 和 candidate 列（可选 id 列）；没有表头时取前两列
+    JSONL  每行一个对象，包含 original 和 candidate 字段（可选 id 字段）
+相对路径相对于清单文件所在目录。未指定 id 时以“原文路径\\t待比较论文路径”作为 id。
+
+用法:
+    python batch_runner.py manifest.csv results.jsonl [--metric cosine] [--workers N] [--max-in-flight N]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from parallel import ParallelScorer
+from similarity_calculator import METRICS
+
+
+def _resolve(base_dir, path):
+    return os.path.normpath(os.path.join(base_dir, path))
+
+
+def _pair(base_dir, index, original, candidate, pair_id=None):
+    if not original or not candidate:
+        raise ValueError(f"清单第 {index} 项缺少原文或待比较论文路径")
+    if pair_id in (None, ''):
+        pair_id = f"{original}\t{candidate}"
+    return index, str(pair_id), _resolve(base_dir, original), _resolve(base_dir, candidate)
+
+
+def iter_manifest(manifest_path):
+    """
+    逐项读取清单
+
+    Args:
+        manifest_path (str): CSV 或 JSONL 清单文件路径（.jsonl/.json 为 JSONL，其余为 CSV）
+
+    Yields:
+        tuple[int, str, str, str]: (序号, id, 原文路径, 待比较论文路径)，序号从 1 开始
+
+    Raises:
+        ValueError: 当清单格式错误时
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, encoding='utf-8-sig', newline='') as file:
+        if manifest_path.lower().endswith(('.jsonl', '.json')):
+            index = 0
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"清单第 {line_number} 行不是有效的 JSON") from e
+                index += 1
+                yield _pair(base_dir, index, item.get('original'), item.get('candidate'), item.get('id'))
+            return
+
+        rows = csv.reader(file)
+        first = next(rows, None)
+        if first is None:
+            return
+        header = [name.strip() for name in first]
+        if 'original' in header and 'candidate' in header:
+            columns = {name: header.index(name) for name in ('original', 'candidate', 'id') if name in header}
+        else:
+            # 没有表头，第一行就是数据
+            columns = {'original': 0, 'candidate': 1}
+            rows = _chain_row(first, rows)
+
+        index = 0
+        for row in rows:
+            if not any(field.strip() for field in row):
+                continue
+            index += 1
+            fields = {
+                name: row[position].strip() if position < len(row) else ''
+                for name, position in columns.items()
+            }
+            yield _pair(base_dir, index, fields['original'], fields['candidate'], fields.get('id'))
+
+
+def _chain_row(first, rows):
+    yield first
+    yield from rows
+
+
+def load_completed(output_path):
+    """
+    读取已有结果，返回已完成的文档对 id
+
+    上次运行在写入一行的中途退出时，末尾不完整的行会被截掉，续跑时从完整的行之后追加。
+    出错的记录、无法解析的行以及同一 id 的重复记录会从文件中删除（先写入临时文件再替换），
+    出错的文档对随后重新计算并追加新的记录，每个 id 在文件中最多只有一行。
+
+    Args:
+        output_path (str): JSONL 结果文件路径
+
+    Returns:
+        set[str]: 已有 similarity 的 id（出错的记录不计入，续跑时重新计算）
+    """
+    completed = set()
+    try:
+        file = open(output_path, 'r+b')
+    except FileNotFoundError:
+        return completed
+
+    with file:
+        data = file.read()
+        end = data.rfind(b'\n') + 1
+        kept = []
+        for line in data[:end].splitlines(keepends=True):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and 'similarity' in record and record.get('id') not in completed:
+                completed.add(record.get('id'))
+                kept.append(line)
+        if len(kept) == data.count(b'\n', 0, end):
+            if end < len(data):
+                file.truncate(end)
+            return completed
+
+    # 有需要删除的记录：写入临时文件后原子替换，中途崩溃时原文件保持不变
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'wb') as temp:
+        temp.writelines(kept)
+    os.replace(temp_path, output_path)
+    return completed
+
+
+def _next_batch(iterator, size):
+    """从迭代器中取出至多 size 项（在 I/O 线程中调用）"""
+    return list(itertools.islice(iterator, size))
+
+
+def _append(file, text):
+    file.write(text)
+    file.flush()
+
+
+class BatchRunner:
+    """基于 asyncio 的清单批量查重"""
+
+    def __init__(self, metric='cosine', workers=None, max_in_flight=None, io_threads=4):
+        """
+        Args:
+            metric (str): 相似度指标
+            workers (int | None): 计算相似度的进程数，默认为 CPU 核心数
+            max_in_flight (int | None): 同时处理（排队中和计算中）的文档对上限，默认为进程数的 4 倍
+            io_threads (int): 写出结果的线程数
+        """
+        if metric not in METRICS:
+            raise ValueError(f"不支持的相似度指标: {metric}")
+        self.metric = metric
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = self.workers * 4 if max_in_flight is None else max_in_flight
+        if self.max_in_flight < 1:
+            raise ValueError("max_in_flight 必须为正整数")
+        self.io_threads = io_threads
+
+    def run(self, manifest_path, output_path):
+        """
+        运行清单中尚未完成的全部文档对
+
+        Args:
+            manifest_path (str): 清单文件路径
+            output_path (str): JSONL 结果文件路径，已存在时续跑并追加
+
+        Returns:
+            dict: total（清单项数）、skipped（已有结果而跳过）、scored（本次完成）、failed（本次出错）和 seconds
+        """
+        return asyncio.run(self.run_async(manifest_path, output_path))
+
+    async def run_async(self, manifest_path, output_path):
+        """run 的协程版本"""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        summary = {'total': 0, 'skipped': 0, 'scored': 0, 'failed': 0}
+
+        queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        pending = set()
+        with ThreadPoolExecutor(self.io_threads) as io_executor, ParallelScorer(self.workers) as scorer:
+            completed = await loop.run_in_executor(io_executor, load_completed, output_path)
+            manifest = iter_manifest(manifest_path)
+            with open(output_path, 'a', encoding='utf-8') as output:
+                writer = asyncio.create_task(self._write_results(queue, output, io_executor, summary))
+                try:
+                    while True:
+                        # 清单按批在 I/O 线程中读取和解析，事件循环同时调度已提交的文档对
+                        batch = await loop.run_in_executor(io_executor, _next_batch, manifest, self.max_in_flight)
+                        if not batch:
+                            break
+                        for index, pair_id, original, candidate in batch:
+                            summary['total'] += 1
+                            if pair_id in completed:
+                                summary['skipped'] += 1
+                                continue
+                            # 清单中重复的文档对只计算一次
+                            completed.add(pair_id)
+
+                            await semaphore.acquire()
+                            task = asyncio.create_task(
+                                self._process(index, pair_id, original, candidate, scorer, queue, semaphore)
+                            )
+                            pending.add(task)
+                            task.add_done_callback(pending.discard)
+
+                    if pending:
+                        await asyncio.gather(*pending)
+                    await queue.put(None)
+                    await writer
+                except BaseException:
+                    # 清单格式错误或被中断：已写入的结果保留，未完成的文档对留待续跑
+                    for task in list(pending) + [writer]:
+                        task.cancel()
+                    raise
+                finally:
+                    # 被中断时清单可能仍在 I/O 线程中读取，此时由垃圾回收关闭
+                    with contextlib.suppress(ValueError):
+                        manifest.close()
+
+        summary['seconds'] = round(time.perf_counter() - start, 3)
+        return summary
+
+    async def _process(self, index, pair_id, original, candidate, scorer, queue, semaphore):
+        record = {'index': index, 'id': pair_id, 'original': original, 'candidate': candidate, 'metric': self.metric}
+        try:
+            similarity = await asyncio.wrap_future(scorer.submit_pair(original, candidate, self.metric))
+            record['similarity'] = round(similarity, 4)
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+        await queue.put(record)
+        semaphore.release()
+
+    async def _write_results(self, queue, output, io_executor, summary):
+        """唯一的写入协程：每次取出队列中已有的全部结果，一次写入并刷新"""
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            records = [await queue.get()]
+            while not queue.empty():
+                records.append(queue.get_nowait())
+            finished = records[-1] is None
+            records = [record for record in records if record is not None]
+            if not records:
+                continue
+            for record in records:
+                summary['scored' if 'similarity' in record else 'failed'] += 1
+            lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+            await loop.run_in_executor(io_executor, _append, output, lines)
+
+
+def run_manifest(manifest_path, output_path, metric='cosine', workers=None, max_in_flight=None):
+    """
+    清单批量查重的函数接口
+
+    Args:
+        manifest_path (str): 清单文件路径
+        output_path (str): JSONL 结果文件路径
+        metric (str): 相似度指标
+        workers (int | None): 进程数
+        max_in_flight (int | None): 同时处理的文档对上限
+
+    Returns:
+        dict: BatchRunner.run 的返回值
+    """
+    return BatchRunner(metric, workers, max_in_flight).run(manifest_path, output_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='按清单批量查重，结果逐行追加到 JSONL 文件，可中断续跑')
+    parser.add_argument('manifest', help='CSV 或 JSONL 清单文件路径')
+    parser.add_argument('output', help='JSONL 结果文件路径，已存在时跳过已完成的文档对')
+    parser.add_argument('--metric', choices=METRICS, default='cosine', help='相似度指标，默认 cosine')
+    parser.add_argument('--workers', type=int, default=None, help='计算相似度的进程数，默认为 CPU 核心数')
+    parser.add_argument('--max-in-flight', type=int, default=None, help='同时处理的文档对上限，默认为进程数的 4 倍')
+    args = parser.parse_args(argv)
+
+    summary = run_manifest(args.manifest, args.output, args.metric, args.workers, args.max_in_flight)
+    print(
+        f"共 {summary['total']} 对，跳过已完成 {summary['skipped']} 对，本次完成 {summary['scored']} 对，"
+        f"失败 {summary['failed']} 对，用时 {summary['seconds']:.1f} 秒"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+编辑距离基准测试
+
+在项目自带的样例文件上对比朴素动态规划与位并行编辑距离的耗时。
+朴素算法在完整文件上需要数分钟，默认只在前缀上测量并按 n·m 外推，
+使用 --full-reference 可强制在完整文件上运行朴素算法。
+
+用法:
+    python benchmarks/bench_edit_distance.py [--prefix 2000] [--full-reference]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from edit_distance import levenshtein, reference_edit_distance  # noqa: E402
+from file_handler import read_file  # noqa: E402
+
+VARIANT_FILES = [
+    "orig_0.8_add.txt",
+    "orig_0.8_del.txt",
+    "orig_0.8_dis_1.txt",
+    "orig_0.8_dis_10.txt",
+    "orig_0.8_dis_15.txt",
+]
+
+
+def timed(func, *args):
+    """执行函数并返回 (结果, 耗时秒数)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(prefix, full_reference):
+    original = read_file(os.path.join(project_root, "orig.txt"))
+    print(f"{'文件':<22}{'距离':>8}{'位并行(s)':>12}{'朴素(s)':>12}{'加速比':>10}")
+
+    for name in VARIANT_FILES:
+        variant = read_file(os.path.join(project_root, name))
+        distance, fast_time = timed(levenshtein, original, variant)
+
+        if full_reference:
+            ref_distance, ref_time = timed(reference_edit_distance, original, variant)
+            assert ref_distance == distance, f"{name}: 结果不一致"
+        else:
+            # 在前缀上测量朴素算法并校验结果，再按单元格数量外推到完整文件
+            s1, s2 = original[:prefix], variant[:prefix]
+            ref_distance, prefix_time = timed(reference_edit_distance, s1, s2)
+            assert ref_distance == levenshtein(s1, s2), f"{name}: 前缀结果不一致"
+            ref_time = prefix_time * (len(original) * len(variant)) / (len(s1) * len(s2))
+
+        speedup = ref_time / fast_time if fast_time > 0 else float('inf')
+        marker = "" if full_reference else "*"
+        print(f"{name:<22}{distance:>8}{fast_time:>12.3f}{ref_time:>11.1f}{marker}{speedup:>9.0f}x")
+
+    if not full_reference:
+        print(f"* 朴素算法耗时由前 {prefix} 个字符的实测值外推")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='编辑距离基准测试')
+    parser.add_argument('--prefix', type=int, default=2000, help='朴素算法测量所用的前缀长度')
+    parser.add_argument('--full-reference', action='store_true', help='在完整文件上运行朴素算法')
+    args = parser.parse_args()
+    run(args.prefix, args.full_reference)
+
+
+if __name__ == "__main__":
+    main()
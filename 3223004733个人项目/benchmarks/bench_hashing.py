@@ -0,0 +1,119 @@
+"""
+哈希特征准确性与内存基准测试
+
+在项目自带的样例文件上对比现有 TF-IDF 余弦相似度、不限词表的 TF-IDF 余弦相似度
+与不同宽度哈希特征的余弦相似度，并给出哈希冲突带来的误差（与不哈希的词频余弦相似度之差）。
+指定 --stream-mb 时另外生成一个该大小的文件，测量流式计算哈希特征向量的耗时和内存峰值。
+
+用法:
+    python benchmarks/bench_hashing.py [--bits 20 16 12] [--stream-mb 100]
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from document import Document  # noqa: E402
+from file_handler import read_file  # noqa: E402
+from hashing import TermHasher  # noqa: E402
+from idf_model import iter_features  # noqa: E402
+from similarity_calculator import SimilarityCalculator  # noqa: E402
+
+VARIANT_FILES = [
+    "orig_0.8_add.txt",
+    "orig_0.8_del.txt",
+    "orig_0.8_dis_1.txt",
+    "orig_0.8_dis_10.txt",
+    "orig_0.8_dis_15.txt",
+]
+
+
+def tf_cosine(doc1, doc2):
+    """不哈希的词频余弦相似度"""
+    counts1 = Counter(iter_features(doc1.terms))
+    counts2 = Counter(iter_features(doc2.terms))
+    dot = sum(count * counts2[feature] for feature, count in counts1.items())
+    norm = math.sqrt(sum(c * c for c in counts1.values()) * sum(c * c for c in counts2.values()))
+    return dot / norm if norm else 0.0
+
+
+def full_vocabulary_cosine(doc1, doc2):
+    """不限制特征数的两文档 TF-IDF 余弦相似度"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(tokenizer=str.split, token_pattern=None, ngram_range=(1, 2))
+    matrix = vectorizer.fit_transform([doc1.terms_text, doc2.terms_text])
+    return (matrix[0] @ matrix[1].T).toarray()[0, 0]
+
+
+def compare_accuracy(bits_list):
+    calculator = SimilarityCalculator()
+    hashers = [TermHasher(2 ** bits) for bits in bits_list]
+    original = Document(read_file(os.path.join(project_root, "orig.txt")))
+
+    header = f"{'文件':<22}{'TF-IDF':>9}{'不限词表':>10}" + ''.join(f"{'2^' + str(b):>10}" for b in bits_list)
+    print(header)
+    max_errors = [0.0] * len(hashers)
+    for name in VARIANT_FILES:
+        variant = Document(read_file(os.path.join(project_root, name)))
+        row = f"{name:<22}{calculator.calculate_cosine_similarity(original, variant):>9.4f}"
+        row += f"{full_vocabulary_cosine(original, variant):>12.4f}"
+        exact = tf_cosine(original, variant)
+        for position, hasher in enumerate(hashers):
+            score = hasher.cosine(hasher.vector(original), hasher.vector(variant))
+            max_errors[position] = max(max_errors[position], abs(score - exact))
+            row += f"{score:>10.4f}"
+        print(row)
+    print("哈希冲突误差（与不哈希的词频余弦相似度的最大差）：" + '，'.join(
+        f"2^{bits} {error:.1e}" for bits, error in zip(bits_list, max_errors)
+    ))
+
+
+def measure_streaming(size_mb):
+    source = read_file(os.path.join(project_root, "orig.txt"))
+    hasher = TermHasher()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "large.txt")
+        with open(path, 'w', encoding='utf-8') as file:
+            written = 0
+            copy = 0
+            while written < size_mb * 1024 * 1024:
+                # 每份副本带上编号，避免特征完全重复
+                text = f"第{copy}份副本\n{source}\n"
+                file.write(text)
+                written += len(text.encode('utf-8'))
+                copy += 1
+
+        hasher.vector_from_chunks(["预热"])
+        start = time.perf_counter()
+        vector = hasher.vector_from_file(path)
+        elapsed = time.perf_counter() - start
+
+        # tracemalloc 会使分词慢数倍，单独运行一次测量内存峰值
+        tracemalloc.start()
+        hasher.vector_from_file(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"流式计算 {size_mb} MB 文件：{elapsed:.1f}s，非零特征 {len(vector)}，内存峰值 {peak / 1024 / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='哈希特征准确性与内存基准测试')
+    parser.add_argument('--bits', type=int, nargs='+', default=[20, 16, 12], help='特征空间宽度的位数')
+    parser.add_argument('--stream-mb', type=int, default=0, help='生成该大小的文件测量流式计算的内存峰值')
+    args = parser.parse_args()
+    compare_accuracy(args.bits)
+    if args.stream_mb:
+        measure_streaming(args.stream_mb)
+
+
+if __name__ == "__main__":
+    main()
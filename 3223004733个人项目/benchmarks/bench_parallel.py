@@ -0,0 +1,69 @@
+"""
+多进程扩展性基准测试
+
+将样例文件两两组成一批论文对，分别用不同进程数计算相似度，
+输出耗时、相对单进程的加速比，并校验各进程数下的结果完全一致。
+
+用法:
+    python benchmarks/bench_parallel.py [--workers 1 2 4 8] [--repeat 8] [--metric comprehensive]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from parallel import METRICS, ParallelScorer  # noqa: E402
+
+FIXTURE_FILES = [
+    "orig.txt",
+    "orig_0.8_add.txt",
+    "orig_0.8_del.txt",
+    "orig_0.8_dis_1.txt",
+    "orig_0.8_dis_10.txt",
+    "orig_0.8_dis_15.txt",
+]
+
+
+def build_pairs(repeat):
+    """生成全部有序论文对，重复 repeat 次"""
+    paths = [os.path.join(project_root, name) for name in FIXTURE_FILES]
+    pairs = [(a, b) for a in paths for b in paths if a != b]
+    return pairs * repeat
+
+
+def run(worker_counts, repeat, metric):
+    pairs = build_pairs(repeat)
+    print(f"论文对数: {len(pairs)}，指标: {metric}，CPU 核心数: {os.cpu_count()}")
+    print(f"{'进程数':>6}{'耗时(s)':>10}{'加速比':>8}")
+
+    baseline_time = None
+    baseline_scores = None
+    for workers in worker_counts:
+        with ParallelScorer(workers) as scorer:
+            # 预热：启动进程并加载词典，不计入耗时
+            scorer.score_pairs(pairs[:workers], metric)
+            start = time.perf_counter()
+            scores = scorer.score_pairs(pairs, metric)
+            elapsed = time.perf_counter() - start
+
+        if baseline_scores is None:
+            baseline_time, baseline_scores = elapsed, scores
+        assert scores == baseline_scores, f"{workers} 个进程的结果与基准不一致"
+        print(f"{workers:>6}{elapsed:>10.2f}{baseline_time / elapsed:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多进程扩展性基准测试')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='要测试的进程数')
+    parser.add_argument('--repeat', type=int, default=8, help='论文对重复次数')
+    parser.add_argument('--metric', choices=METRICS, default='comprehensive', help='相似度指标')
+    args = parser.parse_args()
+    run(args.workers, args.repeat, args.metric)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+常驻服务延迟基准测试
+
+分别以独立进程运行 main.py 和通过 client.py 请求常驻服务，比较单次查重的端到端耗时。
+两种方式都从启动新的 Python 进程开始计时，与评分流水线逐个调用命令行的方式一致。
+
+用法:
+    python benchmarks/bench_server.py [--repeat 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from client import SERVER_ENV, connect  # noqa: E402
+
+
+def timed_run(script, args, env):
+    """运行一次脚本，返回耗时（秒）"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(project_root, script)] + args,
+                   env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def wait_for_server(address, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connect(address).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("常驻服务启动超时")
+
+
+def run(repeat):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        address = os.path.join(temp_dir, "bench.sock")
+        env = dict(os.environ, **{SERVER_ENV: address})
+        args = [
+            os.path.join(project_root, "orig.txt"),
+            os.path.join(project_root, "orig_0.8_add.txt"),
+            os.path.join(temp_dir, "result.txt"),
+        ]
+
+        cold = [timed_run("main.py", args, env) for _ in range(repeat)]
+
+        server = subprocess.Popen([sys.executable, os.path.join(project_root, "server.py")],
+                                  env=env, stdout=subprocess.DEVNULL)
+        try:
+            wait_for_server(address)
+            warm = [timed_run("client.py", args, env) for _ in range(repeat)]
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'方式':<12}{'最短(s)':>10}{'平均(s)':>10}")
+    for name, times in [("main.py", cold), ("client.py", warm)]:
+        print(f"{name:<12}{min(times):>10.3f}{sum(times) / len(times):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='常驻服务延迟基准测试')
+    parser.add_argument('--repeat', type=int, default=5, help='每种方式的运行次数')
+    args = parser.parse_args()
+    run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+冷启动耗时基准测试
+
+每次都启动新的 Python 进程，分别测量：
+    import   仅导入 main 模块
+    jaccard  对两篇短文本查重（走 Jaccard 备用路径，不需要 sklearn）
+    cosine   对样例论文查重（完整的 main.py 调用）
+分词缓存被关闭，以便测到 jieba 词典的加载耗时。
+指定 --max-import 等上限时，任何一项超出都以非零状态码退出，可在 CI 中发现启动时间的回退。
+
+用法:
+    python benchmarks/bench_startup.py [--repeat 5] [--max-import 0.3] [--max-cosine 5] [--output startup.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed_run(args, env):
+    """运行一次新进程，返回耗时（秒）"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, cwd=project_root, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def run(repeat):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env = dict(os.environ, PAPER_CHECK_TOKEN_CACHE='0')
+        short1 = os.path.join(temp_dir, "short1.txt")
+        short2 = os.path.join(temp_dir, "short2.txt")
+        for path, text in [(short1, "查重"), (short2, "查重！")]:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(text)
+        output = os.path.join(temp_dir, "result.txt")
+
+        cases = {
+            'import': ['-c', 'import main'],
+            'jaccard': ['main.py', short1, short2, output],
+            'cosine': ['main.py', 'orig.txt', 'orig_0.8_add.txt', output],
+        }
+        # 预热：生成 jieba 词典缓存并让操作系统缓存相关文件
+        timed_run(cases['cosine'], env)
+
+        results = {}
+        for name, args in cases.items():
+            times = sorted(timed_run(args, env) for _ in range(repeat))
+            results[name] = {'min': times[0], 'median': times[len(times) // 2]}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动耗时基准测试')
+    parser.add_argument('--repeat', type=int, default=5, help='每项的运行次数')
+    parser.add_argument('--output', default=None, help='将结果写入 JSON 文件')
+    for name in ('import', 'jaccard', 'cosine'):
+        parser.add_argument(f'--max-{name}', type=float, default=None, help=f'{name} 中位耗时上限（秒）')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"{'场景':<10}{'最短(s)':>10}{'中位(s)':>10}")
+    for name, stats in results.items():
+        print(f"{name:<10}{stats['min']:>10.3f}{stats['median']:>10.3f}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+    failed = False
+    for name, stats in results.items():
+        limit = getattr(args, f'max_{name}')
+        if limit is not None and stats['median'] > limit:
+            print(f"回退：{name} 中位耗时 {stats['median']:.3f}s 超过上限 {limit:.3f}s")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
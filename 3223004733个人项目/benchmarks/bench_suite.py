@@ -0,0 +1,299 @@
+"""
+可复现的分阶段基准测试套件
+
+对每个阶段和指标计时：
+    read_file       读取两篇论文
+    process         TextProcessor.process 处理两篇论文
+    cosine          calculate_cosine_similarity
+    jaccard         calculate_jaccard_similarity
+    edit            _calculate_edit_similarity
+    comprehensive   calculate_comprehensive_similarity
+各指标与原有接口一致，直接传入原文字符串，因此耗时包含分词。
+
+测试数据分两组：
+    fixture/<变体>     orig.txt 与各 orig_0.8_* 样例文件
+    synthetic/<大小>   由 orig.txt 的句子按固定随机种子拼接出的 1KB～10MB 文档，
+                       与其约 80% 相同的改写版本比较
+编辑距离即使采用位并行实现仍是二次复杂度：单核上 edit 阶段 256KB 约 6 秒、512KB 约 22 秒、
+1MB 约 76 秒（cosine 约 92 秒，comprehensive 约 194 秒），10MB 按平方外推约需 2 小时。
+超过 --max-quadratic-bytes（默认 1MB）的合成文档跳过 cosine（高相似度时触发编辑距离修正）、
+edit 和 comprehensive，因此默认只有 10MB 的这三个阶段不计时。
+
+每项重复 --repeat 次，以最短耗时作为比较依据（受系统噪声影响最小）。
+结果写为 JSON；指定 --baseline 时与基线逐项比较，
+最短耗时超过基线 (1 + tolerance) 倍且差值大于 --min-delta 的阶段视为回退，以非零状态码退出。
+基线中有而本次没有计时的阶段同样报告并视为失败，除非它们被本次显式指定的
+--sizes、--stages 或 --max-quadratic-bytes 排除。
+
+用法:
+    python benchmarks/bench_suite.py --output baseline.json
+    python benchmarks/bench_suite.py --baseline baseline.json --tolerance 0.25 [--sizes 1KB 100KB] [--repeat 3]
+    python benchmarks/bench_suite.py --idf-model model.idf     # 余弦相似度使用预先拟合的 IDF 模型
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+# 分词缓存会让重复运行跳过分词，计时前关闭
+os.environ['PAPER_CHECK_TOKEN_CACHE'] = '0'
+
+from file_handler import read_file  # noqa: E402
+from idf_model import load_idf_model, set_idf_model  # noqa: E402
+from similarity_calculator import SimilarityCalculator  # noqa: E402
+from text_processor import TextProcessor  # noqa: E402
+
+VARIANT_FILES = [
+    "orig_0.8_add.txt",
+    "orig_0.8_del.txt",
+    "orig_0.8_dis_1.txt",
+    "orig_0.8_dis_10.txt",
+    "orig_0.8_dis_15.txt",
+]
+
+DEFAULT_SIZES = ['1KB', '10KB', '100KB', '1MB', '10MB']
+# 位并行编辑距离下 1MB 的 edit 阶段约 76 秒，10MB 约需 2 小时
+DEFAULT_MAX_QUADRATIC = '1MB'
+# 编辑距离是二次复杂度；余弦相似度高于 0.95 时会用编辑距离修正，合成文档取自同一组句子，大文档必然触发
+QUADRATIC_STAGES = ('cosine', 'edit', 'comprehensive')
+SYNTHETIC_SEED = 20240901
+
+_SIZE_PATTERN = re.compile(r'^(\d+)\s*(B|KB|MB)$', re.IGNORECASE)
+_SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 * 1024}
+_SENTENCE_PATTERN = re.compile(r'[^。！？\n]+[。！？\n]?')
+
+
+def parse_size(text):
+    """解析 1KB、10MB 形式的大小，返回字节数"""
+    match = _SIZE_PATTERN.match(text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"无法解析的大小: {text}")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).upper()]
+
+
+def synthetic_pair(source_text, size, seed=SYNTHETIC_SEED):
+    """
+    生成一对合成文档
+
+    原文由 source_text 的句子随机拼接到 size 字节（UTF-8）；
+    改写版本逐句以 10% 概率删除、10% 概率替换为其他句子、5% 概率插入新句子。
+
+    Returns:
+        tuple[str, str]: (原文, 改写版本)
+    """
+    rng = random.Random(f"{seed}-{size}")
+    sentences = [s for s in _SENTENCE_PATTERN.findall(source_text) if s.strip()]
+
+    chosen = []
+    total = 0
+    while total < size:
+        sentence = rng.choice(sentences)
+        chosen.append(sentence)
+        total += len(sentence.encode('utf-8'))
+
+    rewritten = []
+    for sentence in chosen:
+        roll = rng.random()
+        if roll < 0.10:
+            continue
+        if roll < 0.20:
+            rewritten.append(rng.choice(sentences))
+        else:
+            rewritten.append(sentence)
+        if rng.random() < 0.05:
+            rewritten.append(rng.choice(sentences))
+    return ''.join(chosen), ''.join(rewritten)
+
+
+def build_stages(calculator, text_processor):
+    """返回 {阶段名: 以 (路径1, 路径2, 文本1, 文本2) 为参数的函数}"""
+    return {
+        'read_file': lambda p1, p2, t1, t2: (read_file(p1), read_file(p2)),
+        'process': lambda p1, p2, t1, t2: (text_processor.process(t1), text_processor.process(t2)),
+        'cosine': lambda p1, p2, t1, t2: calculator.calculate_cosine_similarity(t1, t2),
+        'jaccard': lambda p1, p2, t1, t2: calculator.calculate_jaccard_similarity(t1, t2),
+        'edit': lambda p1, p2, t1, t2: calculator._calculate_edit_similarity(t1, t2),
+        'comprehensive': lambda p1, p2, t1, t2: calculator.calculate_comprehensive_similarity(t1, t2),
+    }
+
+
+def time_stage(func, args, repeat):
+    """重复执行 repeat 次，返回耗时统计"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {'min': times[0], 'median': times[len(times) // 2], 'runs': len(times)}
+
+
+def iter_cases(temp_dir, sizes):
+    """产出 (用例名, 路径1, 路径2, 文本1, 文本2)"""
+    original_path = os.path.join(project_root, "orig.txt")
+    original = read_file(original_path)
+    for name in VARIANT_FILES:
+        path = os.path.join(project_root, name)
+        yield f"fixture/{name}", original_path, path, original, read_file(path)
+
+    for size_name in sizes:
+        text1, text2 = synthetic_pair(original, parse_size(size_name))
+        path1 = os.path.join(temp_dir, f"{size_name}_1.txt")
+        path2 = os.path.join(temp_dir, f"{size_name}_2.txt")
+        for path, text in [(path1, text1), (path2, text2)]:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(text)
+        yield f"synthetic/{size_name}", path1, path2, text1, text2
+
+
+def run(sizes, repeat, max_quadratic_bytes, stage_names=None):
+    """
+    运行基准测试
+
+    Returns:
+        dict: {"meta": 运行环境, "results": {"用例/阶段": 耗时统计},
+               "skipped": 因超过二次复杂度上限而跳过的 "用例/阶段"}
+    """
+    calculator = SimilarityCalculator()
+    text_processor = TextProcessor()
+    stages = build_stages(calculator, text_processor)
+    if stage_names:
+        stages = {name: stages[name] for name in stage_names}
+
+    # 预热：加载 jieba 词典和 sklearn，不计入各阶段耗时
+    calculator.calculate_comprehensive_similarity("论文查重基准测试预热", "论文查重基准测试启动")
+
+    results = {}
+    skipped = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for case, path1, path2, text1, text2 in iter_cases(temp_dir, sizes):
+            size = max(os.path.getsize(path1), os.path.getsize(path2))
+            for stage, func in stages.items():
+                key = f"{case}/{stage}"
+                if stage in QUADRATIC_STAGES and size > max_quadratic_bytes:
+                    print(f"{key:<44}{'跳过（超过二次复杂度上限）':>20}")
+                    skipped.append(key)
+                    continue
+                stats = time_stage(func, (path1, path2, text1, text2), repeat)
+                stats['bytes'] = size
+                results[key] = stats
+                print(f"{key:<44}{stats['min']:>10.4f}{stats['median']:>10.4f}", flush=True)
+
+    meta = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': repeat,
+    }
+    return {'meta': meta, 'results': results, 'skipped': skipped}
+
+
+def is_filtered(key, sizes=None, stages=None, skipped=()):
+    """
+    判断 "用例/阶段" 是否被显式指定的选项排除
+
+    Args:
+        key (str): 如 synthetic/1MB/edit
+        sizes (list[str] | None): 显式指定的 --sizes，未指定时为 None
+        stages (list[str] | None): 显式指定的 --stages，未指定时为 None
+        skipped (Iterable[str]): 因显式指定的 --max-quadratic-bytes 而跳过的键
+    """
+    case, stage = key.rsplit('/', 1)
+    group, name = case.split('/', 1)
+    if stages is not None and stage not in stages:
+        return True
+    if sizes is not None and group == 'synthetic' and name not in sizes:
+        return True
+    return key in skipped
+
+
+def compare(results, baseline, tolerance, min_delta, filtered=None):
+    """
+    与基线逐项比较
+
+    Args:
+        results (dict): 本次的 results 字段
+        baseline (dict): 基线的 results 字段
+        tolerance (float): 允许的相对增幅
+        min_delta (float): 允许的绝对增幅（秒），避免毫秒级阶段因噪声误报
+        filtered (Callable[[str], bool] | None): 判断基线中的键是否被显式排除，默认都不排除
+
+    Returns:
+        tuple[list[tuple[str, float, float]], list[str]]:
+            回退的 (阶段, 基线耗时, 本次耗时)，以及基线中有、本次没有计时且未被排除的阶段
+    """
+    regressions = []
+    missing = []
+    for key, old_stats in baseline.items():
+        if key not in results:
+            if filtered is None or not filtered(key):
+                missing.append(key)
+            continue
+        old, new = old_stats['min'], results[key]['min']
+        if new > old * (1 + tolerance) and new - old > min_delta:
+            regressions.append((key, old, new))
+    return regressions, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='论文查重分阶段基准测试套件')
+    parser.add_argument('--sizes', nargs='*', default=None, help='合成文档大小，如 1KB 10MB；只写 --sizes 不带参数则不测合成文档')
+    parser.add_argument('--stages', nargs='+', choices=list(build_stages(None, None)), default=None,
+                        help='只测指定阶段')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数')
+    parser.add_argument('--max-quadratic-bytes', type=parse_size, default=None,
+                        help=f'超过该大小的文档跳过 cosine、edit 和 comprehensive，默认 {DEFAULT_MAX_QUADRATIC}')
+    parser.add_argument('--idf-model', default=None, help='使用预先拟合的 IDF 模型（只做变换）')
+    parser.add_argument('--output', default=None, help='将结果写入 JSON 文件')
+    parser.add_argument('--baseline', default=None, help='用于比较的基线 JSON 文件')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='允许的相对增幅，默认 0.25')
+    parser.add_argument('--min-delta', type=float, default=0.005, help='允许的绝对增幅（秒），默认 0.005')
+    args = parser.parse_args()
+
+    # 未显式指定的选项取默认值；比较基线时只有显式指定的选项才算有意排除
+    sizes = DEFAULT_SIZES if args.sizes is None else args.sizes
+    max_quadratic_bytes = parse_size(DEFAULT_MAX_QUADRATIC) if args.max_quadratic_bytes is None else args.max_quadratic_bytes
+    for size_name in sizes:
+        parse_size(size_name)
+
+    if args.idf_model:
+        set_idf_model(load_idf_model(args.idf_model))
+
+    print(f"{'阶段':<44}{'最短(s)':>10}{'中位(s)':>10}")
+    report = run(sizes, args.repeat, max_quadratic_bytes, args.stages)
+    report['meta']['idf_model'] = args.idf_model
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        skipped = report['skipped'] if args.max_quadratic_bytes is not None else ()
+        regressions, missing = compare(
+            report['results'], baseline['results'], args.tolerance, args.min_delta,
+            filtered=lambda key: is_filtered(key, args.sizes, args.stages, skipped),
+        )
+        for key, old, new in regressions:
+            print(f"回退：{key} {old:.4f}s -> {new:.4f}s（+{(new / old - 1):.0%}）")
+        for key in missing:
+            print(f"缺失：{key} 在基线中有，本次没有计时")
+        if regressions or missing:
+            sys.exit(1)
+        print(f"与基线相比没有超过 {args.tolerance:.0%} 的回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+分词器速度与得分基准测试
+
+在项目自带的样例文件上对比 jieba 与汉字 n-gram 分词器：
+分词吞吐量（分词缓存关闭，jieba 词典已加载）、各样例的余弦和综合相似度，
+以及各分词器给出的样例排序与 jieba 是否一致。
+
+用法:
+    python benchmarks/bench_tokenizers.py [--tokenizers jieba char2 char3] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from document import Document  # noqa: E402
+from file_handler import read_file  # noqa: E402
+from similarity_calculator import SimilarityCalculator  # noqa: E402
+from tokenization import TOKENIZERS, create_tokenizer  # noqa: E402
+
+VARIANT_FILES = [
+    "orig_0.8_add.txt",
+    "orig_0.8_del.txt",
+    "orig_0.8_dis_1.txt",
+    "orig_0.8_dis_10.txt",
+    "orig_0.8_dis_15.txt",
+]
+
+
+def measure_throughput(tokenizer, texts, repeat):
+    """分词吞吐量（MB/s），取多次运行中最快的一次"""
+    tokenizer.prepare()
+    size = sum(len(text.encode('utf-8')) for text in texts)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            tokenizer.tokenize(text, use_cache=False)
+        best = min(best, time.perf_counter() - start)
+    return size / 1024 / 1024 / best
+
+
+def score_variants(tokenizer, original_text, variant_texts, metric):
+    calculator = SimilarityCalculator(tokenizer=tokenizer)
+    original = Document(original_text, tokens=tokenizer.tokenize(original_text, use_cache=False), tokenizer=tokenizer)
+    scores = []
+    for text in variant_texts:
+        variant = Document(text, tokens=tokenizer.tokenize(text, use_cache=False), tokenizer=tokenizer)
+        scores.append(calculator.calculate_similarity(original, variant, metric))
+    return scores
+
+
+def ranking(scores):
+    return sorted(range(len(scores)), key=lambda index: -scores[index])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分词器速度与得分基准测试')
+    parser.add_argument('--tokenizers', nargs='+', choices=TOKENIZERS, default=list(TOKENIZERS), help='参与对比的分词器')
+    parser.add_argument('--repeat', type=int, default=3, help='吞吐量测量的重复次数')
+    args = parser.parse_args()
+
+    tokenizers = [create_tokenizer(name) for name in args.tokenizers]
+    original_text = read_file(os.path.join(project_root, "orig.txt"))
+    variant_texts = [read_file(os.path.join(project_root, name)) for name in VARIANT_FILES]
+
+    print("分词吞吐量：" + '，'.join(
+        f"{tokenizer.name} {measure_throughput(tokenizer, [original_text] + variant_texts, args.repeat):.2f} MB/s"
+        for tokenizer in tokenizers
+    ))
+
+    for metric in ('cosine', 'comprehensive'):
+        results = [score_variants(tokenizer, original_text, variant_texts, metric) for tokenizer in tokenizers]
+        print(f"\n{metric} 相似度")
+        print(f"{'样例':<22}" + ''.join(f"{tokenizer.name:>10}" for tokenizer in tokenizers))
+        for position, name in enumerate(VARIANT_FILES):
+            print(f"{name:<22}" + ''.join(f"{scores[position]:>10.4f}" for scores in results))
+        reference = ranking(results[0])
+        print("排序与 " + tokenizers[0].name + " 一致：" + '，'.join(
+            f"{tokenizer.name} {'是' if ranking(scores) == reference else '否'}"
+            for tokenizer, scores in zip(tokenizers[1:], results[1:])
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+常驻查重服务的轻量客户端
+
+命令行参数与 main.py 完全相同，参数原样转发给 server.py 启动的常驻服务，
+由服务端在已加载好 sklearn、numpy 和 jieba 词典的进程中执行，客户端只回显输出并返回相同的退出码。
+客户端只依赖标准库，启动时不导入任何重量级模块；服务未运行（无法连接）时自动退回到进程内执行 main.py。
+请求发出后连接中断时服务端可能已经执行了查重并写出结果，此时只报告错误，不在本进程中重复执行。
+
+用法:
+    python server.py &
+    python client.py orig.txt orig_0.8_add.txt result.txt
+
+服务地址由环境变量 PAPER_CHECK_SERVER 指定：Unix 套接字路径，或 host:port 形式的本机 TCP 地址。
+默认的 Unix 套接字位于当前用户私有的目录中（$XDG_RUNTIME_DIR/paper_check，未设置时为缓存根目录），
+目录权限为 0700；连接和绑定前都会检查套接字文件属于当前用户，其他用户预先创建的套接字不会被使用。
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+
+from token_cache import cache_root
+
+# 指定服务地址的环境变量
+SERVER_ENV = 'PAPER_CHECK_SERVER'
+# 默认的 Unix 套接字文件名
+DEFAULT_SOCKET_NAME = 'server.sock'
+# 不支持 Unix 套接字的平台（如 Windows）使用的默认本机 TCP 地址
+DEFAULT_TCP_ADDRESS = ('127.0.0.1', 8765)
+# 连接服务的超时时间（秒），连接建立后等待结果不设超时
+CONNECT_TIMEOUT = 1.0
+
+
+def parse_address(spec):
+    """
+    解析服务地址
+
+    Args:
+        spec (str): Unix 套接字路径，或 host:port 形式的 TCP 地址
+
+    Returns:
+        str | tuple[str, int]: 套接字路径或 (host, port)
+    """
+    host, sep, port = spec.rpartition(':')
+    if sep and port.isdigit() and '/' not in spec and '\\' not in spec:
+        return host or DEFAULT_TCP_ADDRESS[0], int(port)
+    return spec
+
+
+def default_socket_dir():
+    """默认套接字所在的目录：$XDG_RUNTIME_DIR/paper_check，未设置时为缓存根目录"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'paper_check')
+    return cache_root()
+
+
+def default_socket_path():
+    """默认的 Unix 套接字路径"""
+    return os.path.join(default_socket_dir(), DEFAULT_SOCKET_NAME)
+
+
+def ensure_private_dir(path):
+    """
+    创建仅当前用户可访问的目录（0700），已存在时检查属主和权限
+
+    Raises:
+        PermissionError: 目录属于其他用户，或其他用户可以访问时
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"套接字目录不属于当前用户: {path}")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+def check_socket_owner(path):
+    """
+    检查套接字文件属于当前用户
+
+    Raises:
+        FileNotFoundError: 套接字文件不存在时
+        PermissionError: 文件不是套接字或属于其他用户时
+    """
+    info = os.lstat(path)
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"套接字文件不属于当前用户: {path}")
+
+
+def default_address():
+    """返回环境变量指定的服务地址，未指定时按平台选择默认地址"""
+    spec = os.environ.get(SERVER_ENV)
+    if spec:
+        return parse_address(spec)
+    if hasattr(socket, 'AF_UNIX'):
+        return default_socket_path()
+    return DEFAULT_TCP_ADDRESS
+
+
+def connect(address, timeout=CONNECT_TIMEOUT):
+    """
+    连接常驻服务
+
+    Raises:
+        PermissionError: Unix 套接字文件不属于当前用户时
+        OSError: 服务未运行或无法连接时
+    """
+    if isinstance(address, tuple):
+        sock = socket.create_connection(address, timeout=timeout)
+    else:
+        check_socket_owner(address)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+    sock.settimeout(None)
+    return sock
+
+
+def send_request(argv, cwd=None, address=None):
+    """
+    将一次命令行调用发送给常驻服务
+
+    Args:
+        argv (list[str]): 与 main.py 相同的命令行参数
+        cwd (str | None): 解析相对路径使用的工作目录，默认为当前目录
+        address (str | tuple[str, int] | None): 服务地址，默认由 default_address() 决定
+
+    Returns:
+        dict: 包含 exit_code、stdout、stderr 的响应
+
+    Raises:
+        OSError: 服务未运行或连接中断时
+    """
+    with connect(address or default_address()) as sock:
+        return exchange(sock, argv, cwd)
+
+
+def exchange(sock, argv, cwd=None):
+    """
+    在已建立的连接上发送一次命令行调用并读取响应
+
+    Args:
+        sock (socket.socket): connect() 返回的连接
+        argv (list[str]): 与 main.py 相同的命令行参数
+        cwd (str | None): 解析相对路径使用的工作目录，默认为当前目录
+
+    Returns:
+        dict: 包含 exit_code、stdout、stderr 的响应
+
+    Raises:
+        OSError: 连接中断或服务未返回结果时
+        ValueError: 响应不是合法的 JSON 时
+    """
+    request = {'argv': list(argv), 'cwd': cwd or os.getcwd()}
+    sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+    with sock.makefile('rb') as reader:
+        line = reader.readline()
+    if not line:
+        raise ConnectionError("常驻服务未返回结果")
+    return json.loads(line)
+
+
+def run_local(argv):
+    """服务不可用时在当前进程中执行 main.py，返回退出码"""
+    import main as checker
+
+    try:
+        checker.main(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+
+def main(argv=None):
+    """客户端入口，返回与 main.py 相同的退出码"""
+    argv = sys.argv[1:] if argv is None else argv
+    # 只有连接失败时才退回到本进程执行；请求发出后服务端可能已经执行，重试会重复计算并再次写出结果
+    try:
+        sock = connect(default_address())
+    except PermissionError as e:
+        print(f"警告：{e}，改为在本进程中执行", file=sys.stderr)
+        return run_local(argv)
+    except OSError:
+        return run_local(argv)
+
+    try:
+        with sock:
+            response = exchange(sock, argv)
+    except (OSError, ValueError) as e:
+        print(f"错误：与常驻服务的连接在请求发出后中断（{e}），查重可能已在服务端执行，未在本进程中重试",
+              file=sys.stderr)
+        return 1
+
+    sys.stdout.write(response.get('stdout', ''))
+    sys.stderr.write(response.get('stderr', ''))
+    return response.get('exit_code', 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,631 @@
+"""
+语料库存储模块
+
+把已分词的往届论文保存为单个二进制文件：词表、每篇文档的词语 id 数组、偏移表和文档元数据表。
+打开时用 mmap 映射整个文件，每篇文档的 id 数组是文件上的零拷贝视图，
+不再需要逐个读取、解码 .txt 文件并重新分词；多个进程打开同一文件时共享操作系统的页缓存。
+
+取出的 StoredDocument 只持有存储和下标：Jaccard 相似度使用的 token_ids、bigram_ids 直接由 id 视图过滤得到，
+原文和词语字符串只在余弦、编辑距离等需要字符串的指标访问时才还原。
+词表保存为每个词表块一个字符串加偏移数组，不为每个词语创建字符串对象；
+词语到 id 的映射只在把存储之外的文档驻留到该词表时才建立。
+
+文件只追加：每次提交在文件末尾依次写入新词语、新文档的 id 数组、完整的索引块和定长的尾部，
+旧数据从不改写，正在读取的进程看到的仍是打开时的一致快照（refresh 后看到新提交的文档）。
+写入中途崩溃时末尾的数据不完整，打开时从后向前找到最后一个校验通过的尾部，之后的追加从该处截断。
+
+文件格式（小端）：
+    文件头  MAGIC | 格式版本（uint32）
+    词表块  词语数（uint32）| 每个词语的字符数（uint32 数组）| UTF-8 文本
+    id 块   每篇文档的词语 id（uint32 数组，4 字节对齐）
+    索引块  头部长度、偏移表长度、元数据长度（3 个 uint32）| JSON 头部（词表块位置、分词配置等）
+            | 偏移表（每篇文档的 id 块偏移和词语数，uint64 对，8 字节对齐）| zlib(JSON 元数据：名称、内容摘要、字符数)
+    尾部    FOOTER_MAGIC | 索引块偏移、索引块长度（uint64）| 索引块 CRC32（uint32）
+
+用法:
+    python corpus_store.py build corpus.pcc 论文目录或通配符... [--workers N]
+    python corpus_store.py info corpus.pcc
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+from functools import cached_property
+from itertools import accumulate, compress
+
+from document import DEFAULT_STOP_WORDS, Document, tokenizer_config
+from interning import NUMPY_MIN_SIZE, Vocabulary
+from tokenization import get_default_tokenizer
+
+MAGIC = b'PCCORP\0\0'
+FOOTER_MAGIC = b'PCCEND\0\0'
+# 文件格式版本，格式变化时递增
+STORE_FORMAT_VERSION = 1
+# build 命令每读取多少篇文档提交一次
+BUILD_BATCH_SIZE = 256
+
+_FILE_HEADER = struct.Struct('<8sI')
+_INDEX_HEADER = struct.Struct('<III')
+_FOOTER = struct.Struct('<8sQQI')
+_COUNT = struct.Struct('<I')
+
+
+def store_config():
+    """分词配置指纹：分词配置不同时保存的分词结果不能使用"""
+    return hashlib.sha256(tokenizer_config().encode('utf-8')).hexdigest()
+
+
+def is_corpus_store(path):
+    """判断路径是否为语料库存储文件"""
+    try:
+        with open(path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _find_footer(data):
+    """
+    从后向前查找最后一个完整的提交
+
+    Returns:
+        tuple[int, int, int] | None: (索引块偏移, 索引块长度, 尾部结束位置)，没有完整的提交时为 None
+    """
+    end = len(data)
+    while True:
+        position = data.rfind(FOOTER_MAGIC, _FILE_HEADER.size, end)
+        if position < 0:
+            return None
+        if position + _FOOTER.size <= len(data):
+            _, offset, size, checksum = _FOOTER.unpack_from(data, position)
+            if offset + size <= position and zlib.crc32(data[offset:offset + size]) == checksum:
+                return offset, size, position + _FOOTER.size
+        end = position
+
+
+def _as_uint_view(data, offset, count, typecode):
+    """文件上的零拷贝数组视图（大端平台上需要字节交换，只能复制）"""
+    itemsize = array(typecode).itemsize
+    view = memoryview(data)[offset:offset + count * itemsize].cast(typecode)
+    if sys.byteorder == 'big':
+        values = array(typecode, view)
+        values.byteswap()
+        return memoryview(values)
+    return view
+
+
+class StoreVocabulary(Vocabulary):
+    """
+    语料库存储的词表：id 即存储文件中的词语 id
+
+    每个词表块解码为一个字符串和一个字符偏移数组，按 id 取词语时切片；
+    词语到 id 的映射在第一次驻留（intern）时才建立，存储之外的新词语分配在存储词表之后。
+    """
+
+    def __init__(self, blocks):
+        """
+        Args:
+            blocks (list[tuple[str, array]]): 各词表块的 (文本, 字符偏移数组)，偏移数组比词语数多一个元素
+        """
+        super().__init__()
+        self._texts = [text for text, _ in blocks]
+        self._starts = [starts for _, starts in blocks]
+        self._firsts = list(accumulate((len(starts) - 1 for starts in self._starts), initial=0))
+        self._size = self._firsts.pop()
+        self._loaded = False
+
+    def __len__(self):
+        return len(self._ids) if self._loaded else self._size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._size:
+            raise IndexError("词语 id 超出存储词表范围")
+        block = bisect_right(self._firsts, index) - 1
+        starts = self._starts[block]
+        local = index - self._firsts[block]
+        return self._texts[block][starts[local]:starts[local + 1]]
+
+    def __iter__(self):
+        for text, starts in zip(self._texts, self._starts):
+            for index in range(len(starts) - 1):
+                yield text[starts[index]:starts[index + 1]]
+
+    def words(self, ids):
+        """
+        将 id 数组还原为词语列表
+
+        Args:
+            ids (Iterable[int]): 存储词表中的 id
+
+        Returns:
+            list[str]: 词语
+        """
+        if len(self._texts) == 1:
+            text, starts = self._texts[0], self._starts[0]
+            return [text[starts[index]:starts[index + 1]] for index in ids]
+        return list(map(self.__getitem__, ids))
+
+    def intern(self, tokens):
+        if not self._loaded:
+            self._ids = {word: index for index, word in enumerate(self)}
+            self._loaded = True
+        return super().intern(tokens)
+
+
+class StoredDocument(Document):
+    """语料库存储中的文档：token_ids 由存储文件上的 id 视图过滤得到，原文和分词结果只在需要时还原"""
+
+    # 分词结果保存在存储中，读取 tokens 不需要分词
+    tokenized = True
+
+    def __init__(self, store, index):
+        """
+        Args:
+            store (CorpusStore): 所在的存储（文档使用期间不能关闭）
+            index (int): 文档下标
+        """
+        self.store = store
+        self.index = index
+        self.stop_words = store.stop_words
+        self.tokenizer = get_default_tokenizer()
+        self.vocabulary = store.vocabulary
+        # 内容摘要已保存，结果缓存不必重新计算
+        self.digest = store._metadata[index][1]
+
+    def __len__(self):
+        return self.store._metadata[self.index][2]
+
+    @cached_property
+    def text(self):
+        """原文（由词语拼接还原）"""
+        return ''.join(self.tokens)
+
+    @cached_property
+    def tokens(self):
+        """分词结果（由存储词表还原）"""
+        return self.store.tokens(self.index)
+
+    @cached_property
+    def token_ids(self):
+        """filtered_tokens 在存储词表中的 id 数组，不还原字符串"""
+        return self.store.filtered_ids(self.index)
+
+
+class CorpusStore:
+    """只读打开的语料库存储，按下标访问 Document"""
+
+    def __init__(self, path, stop_words=None):
+        """
+        Args:
+            path (str): 存储文件路径
+            stop_words (set[str] | None): 构造 Document 时使用的停用词表，默认使用 DEFAULT_STOP_WORDS
+
+        Raises:
+            ValueError: 文件格式错误，或保存时的分词配置与当前不一致
+        """
+        self.path = path
+        self.stop_words = DEFAULT_STOP_WORDS if stop_words is None else stop_words
+        self._mmap = None
+        self._load()
+
+    def _load(self):
+        # mmap 持有自己的文件描述符，映射之后即可关闭文件
+        with open(self.path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _FILE_HEADER.size:
+                raise ValueError(f"不是语料库存储文件: {self.path}")
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version = _FILE_HEADER.unpack_from(data, 0)
+            if magic != MAGIC:
+                raise ValueError(f"不是语料库存储文件: {self.path}")
+            if version != STORE_FORMAT_VERSION:
+                raise ValueError(f"不支持的语料库存储格式版本: {version}")
+            footer = _find_footer(data)
+            if footer is None:
+                raise ValueError(f"语料库存储文件已损坏: {self.path}")
+
+            offset, _, end = footer
+            try:
+                header_size, table_size, meta_size = _INDEX_HEADER.unpack_from(data, offset)
+                position = offset + _INDEX_HEADER.size
+                header = json.loads(data[position:position + header_size])
+                if header.get('config') != store_config():
+                    raise ValueError("语料库存储的分词配置与当前不一致，请重新构建")
+                position = _align(position + header_size, 8)
+                table = _as_uint_view(data, position, header['documents'] * 2, 'Q')
+                position += table_size
+                metadata = json.loads(zlib.decompress(data[position:position + meta_size]))
+                vocabulary = StoreVocabulary([_read_block(data, block_offset) for block_offset in header['vocabulary']])
+            except (KeyError, TypeError, struct.error, zlib.error, UnicodeDecodeError) as e:
+                raise ValueError(f"语料库存储文件已损坏: {self.path}") from e
+        except BaseException:
+            table = None
+            try:
+                data.close()
+            except BufferError:
+                pass
+            raise
+
+        self._release()
+        self._mmap = data
+        self._table = table
+        self._metadata = metadata
+        self._names = {entry[0]: index for index, entry in enumerate(metadata)}
+        self.vocabulary = vocabulary
+        self.vocabulary_blocks = header['vocabulary']
+        self.committed_size = end
+        self._keep = None
+
+    def _release(self):
+        self._table = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 仍有 token_ids 视图在使用，映射随最后一个视图释放
+                pass
+            self._mmap = None
+
+    def refresh(self):
+        """重新读取索引，看到打开之后追加的文档"""
+        self._load()
+
+    def close(self):
+        """关闭文件映射（取出的 StoredDocument 之后不能再还原原文）"""
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"CorpusStore(path={self.path!r}, documents={len(self)})"
+
+    def __len__(self):
+        return len(self._metadata)
+
+    def __getitem__(self, index):
+        return self.document(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.document(index)
+
+    @property
+    def names(self):
+        """全部文档的名称（构建时的文件路径）"""
+        return [entry[0] for entry in self._metadata]
+
+    def index(self, name):
+        """
+        按名称查找文档下标
+
+        Raises:
+            KeyError: 没有该名称的文档时
+        """
+        return self._names[name]
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def metadata(self, index):
+        """文档元数据：name、digest（原文 SHA-256）和 chars（字符数）"""
+        name, digest, chars = self._metadata[index]
+        return {'name': name, 'digest': digest, 'chars': chars}
+
+    def token_ids(self, index):
+        """
+        文档的词语 id 数组
+
+        Returns:
+            memoryview: 格式为 'I' 的零拷贝视图（id 为本存储词表中的下标）
+        """
+        offset, count = self._table[2 * index], self._table[2 * index + 1]
+        return _as_uint_view(self._mmap, offset, count, 'I')
+
+    def filtered_ids(self, index):
+        """
+        文档去停用词和空白后的词语（Document.filtered_tokens）的 id 数组，由 id 视图直接过滤得到
+
+        Returns:
+            array: 类型为 'I' 的 id 数组（id 为本存储词表中的下标）
+        """
+        ids = self.token_ids(index)
+        keep = self._keep_mask()
+        if len(ids) < NUMPY_MIN_SIZE:
+            return array('I', compress(ids, map(keep.__getitem__, ids)))
+
+        import numpy as np
+
+        values = np.frombuffer(ids, dtype=np.uint32)
+        return array('I', values[np.frombuffer(keep, dtype=np.bool_)[values]].tobytes())
+
+    def _keep_mask(self):
+        """词表中每个词语是否保留在 filtered_tokens 中（非空白且不是停用词），每个词语一个字节"""
+        keep = self._keep
+        if keep is None:
+            stop_words = self.stop_words
+            keep = self._keep = bytearray(
+                1 if word.strip() and word not in stop_words else 0 for word in self.vocabulary
+            )
+        return keep
+
+    def tokens(self, index):
+        """文档的分词结果（与 jieba 分词结果一致，拼接后等于原文）"""
+        return self.vocabulary.words(self.token_ids(index))
+
+    def text(self, index):
+        """文档原文"""
+        return ''.join(self.tokens(index))
+
+    def document(self, index):
+        """
+        取出文档（不再调用 jieba，原文和分词结果在需要时才从存储还原）
+
+        Args:
+            index (int): 文档下标
+
+        Returns:
+            StoredDocument: 文档
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("文档下标超出范围")
+        return StoredDocument(self, index)
+
+
+def _align(position, alignment):
+    return (position + alignment - 1) // alignment * alignment
+
+
+def _read_block(data, offset):
+    """
+    读取一个词表块
+
+    Returns:
+        tuple[str, array]: (块内全部词语拼接的文本, 每个词语的起始字符偏移，末尾附加文本长度)
+    """
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    lengths = _as_uint_view(data, offset, count, 'I')
+    offset += count * lengths.itemsize
+    size = _COUNT.unpack_from(data, offset)[0]
+    offset += _COUNT.size
+    text = str(data[offset:offset + size], 'utf-8', 'surrogatepass')
+    return text, array('Q', accumulate(lengths, initial=0))
+
+
+def _words_block(words):
+    text = ''.join(words).encode('utf-8', 'surrogatepass')
+    lengths = array('I', map(len, words))
+    if sys.byteorder == 'big':
+        lengths.byteswap()
+    return _COUNT.pack(len(words)) + lengths.tobytes() + _COUNT.pack(len(text)) + text
+
+
+class CorpusWriter:
+    """向语料库存储追加文档，同一时间只能有一个写入者"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): 存储文件路径，不存在时创建
+
+        Raises:
+            ValueError: 已有文件的格式错误或分词配置与当前不一致，或当前分词器的结果拼接后不等于原文
+        """
+        if not get_default_tokenizer().reversible:
+            raise ValueError("语料库存储从词语还原原文，只支持拼接后等于原文的分词器（如 jieba）")
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self._create()
+        with CorpusStore(path) as store:
+            self._ids = {word: index for index, word in enumerate(store.vocabulary)}
+            self._vocabulary_blocks = list(store.vocabulary_blocks)
+            self._table = array('Q', store._table)
+            self._metadata = [list(entry) for entry in store._metadata]
+            self._end = store.committed_size
+        self._names = {entry[0] for entry in self._metadata}
+        self._pending = []
+
+    def _create(self):
+        with open(self.path, 'wb') as file:
+            file.write(_FILE_HEADER.pack(MAGIC, STORE_FORMAT_VERSION))
+            file.write(b'\0' * (_align(_FILE_HEADER.size, 8) - _FILE_HEADER.size))
+            self._write_index(file, file.tell(), [], array('Q'), [])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+
+    def __len__(self):
+        return len(self._metadata) + len(self._pending)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def add(self, name, text, tokens=None):
+        """
+        添加一篇文档（commit 后写入文件）
+
+        Args:
+            name (str): 文档名称，通常为文件路径，不能重复
+            text (str): 原文
+            tokens (list[str] | None): 分词结果，默认使用默认分词器（jieba 时使用分词缓存）
+
+        Raises:
+            ValueError: 名称重复，或分词结果拼接后不等于原文
+        """
+        if name in self._names:
+            raise ValueError(f"语料库中已有同名文档: {name}")
+        if tokens is None:
+            tokens = get_default_tokenizer().tokenize(text) if text else []
+        elif ''.join(tokens) != text:
+            raise ValueError("分词结果拼接后与原文不一致")
+        self._names.add(name)
+        self._pending.append((name, text, tokens))
+
+    def add_document(self, name, document):
+        """添加一篇 Document（复用其分词结果）"""
+        self.add(name, document.text, document.tokens)
+
+    def commit(self):
+        """把尚未提交的文档追加到文件末尾"""
+        if not self._pending:
+            return
+        ids = self._ids
+        new_words = []
+        id_arrays = []
+        for _, _, tokens in self._pending:
+            for token in tokens:
+                if token not in ids:
+                    ids[token] = len(ids)
+                    new_words.append(token)
+            id_arrays.append(array('I', map(ids.__getitem__, tokens)))
+
+        with open(self.path, 'r+b') as file:
+            # 丢弃上次崩溃留下的不完整数据
+            file.truncate(self._end)
+            file.seek(self._end)
+            if new_words:
+                self._vocabulary_blocks.append(file.tell())
+                file.write(_words_block(new_words))
+
+            table = array('Q', self._table)
+            metadata = [list(entry) for entry in self._metadata]
+            for (name, text, _), values in zip(self._pending, id_arrays):
+                file.write(b'\0' * (_align(file.tell(), 4) - file.tell()))
+                table.extend((file.tell(), len(values)))
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                file.write(values.tobytes())
+                digest = hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+                metadata.append([name, digest, len(text)])
+
+            end = self._write_index(file, file.tell(), self._vocabulary_blocks, table, metadata)
+            file.flush()
+            os.fsync(file.fileno())
+
+        self._table = table
+        self._metadata = metadata
+        self._end = end
+        self._pending = []
+
+    @staticmethod
+    def _write_index(file, position, vocabulary_blocks, table, metadata):
+        """写入索引块和尾部，返回尾部结束位置"""
+        header = json.dumps({
+            'format': STORE_FORMAT_VERSION,
+            'config': store_config(),
+            'documents': len(metadata),
+            'vocabulary': vocabulary_blocks,
+        }).encode('utf-8')
+        table_start = _align(position + _INDEX_HEADER.size + len(header), 8)
+        if sys.byteorder == 'big':
+            table = array('Q', table)
+            table.byteswap()
+        table_data = table.tobytes()
+        meta_data = zlib.compress(json.dumps(metadata, ensure_ascii=False).encode('utf-8'))
+
+        index = b''.join([
+            _INDEX_HEADER.pack(len(header), len(table_data), len(meta_data)),
+            header,
+            b'\0' * (table_start - position - _INDEX_HEADER.size - len(header)),
+            table_data,
+            meta_data,
+        ])
+        file.write(index)
+        file.write(_FOOTER.pack(FOOTER_MAGIC, position, len(index), zlib.crc32(index)))
+        return position + len(index) + _FOOTER.size
+
+
+def open_corpus(path, stop_words=None):
+    """
+    打开语料库存储的函数接口
+
+    Args:
+        path (str): 存储文件路径
+        stop_words (set[str] | None): 构造 Document 时使用的停用词表
+
+    Returns:
+        CorpusStore: 只读存储
+    """
+    return CorpusStore(path, stop_words)
+
+
+def build_corpus(path, paths, workers=None):
+    """
+    读取并分词一批文件，追加到语料库存储（已有同名文档的文件跳过）
+
+    Args:
+        path (str): 存储文件路径
+        paths (list[str]): 文件路径列表
+        workers (int | None): 并行分词的进程数
+
+    Returns:
+        tuple[int, int]: (新增文档数, 跳过的文件数)
+    """
+    from file_handler import FileHandler
+    from parallel import load_documents
+
+    writer = CorpusWriter(path)
+    todo = [name for name in dict.fromkeys(paths) if name not in writer]
+    skipped = len(paths) - len(todo)
+    file_handler = FileHandler()
+    for start in range(0, len(todo), BUILD_BATCH_SIZE):
+        batch = todo[start:start + BUILD_BATCH_SIZE]
+        if workers is not None and workers > 1:
+            for name, document in zip(batch, load_documents(batch, workers)):
+                writer.add_document(name, document)
+        else:
+            for name in batch:
+                writer.add(name, file_handler.read_file(name))
+        writer.commit()
+    return len(todo), skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='构建和查看语料库存储')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='读取并分词论文，追加到存储文件')
+    build_parser.add_argument('store', help='存储文件路径，不存在时创建')
+    build_parser.add_argument('corpus', nargs='+', help='论文所在目录或通配符')
+    build_parser.add_argument('--workers', type=int, default=None, help='并行分词的进程数，默认单进程')
+    info_parser = subparsers.add_parser('info', help='显示存储信息')
+    info_parser.add_argument('store', help='存储文件路径')
+    args = parser.parse_args(argv)
+
+    if args.command == 'info':
+        with CorpusStore(args.store) as store:
+            print(
+                f"文档数: {len(store)}，词表大小: {len(store.vocabulary)}，"
+                f"文件大小: {os.path.getsize(args.store)} 字节"
+            )
+        return
+
+    from file_handler import FileHandler
+
+    file_handler = FileHandler()
+    paths = []
+    for pattern in args.corpus:
+        paths.extend(file_handler.collect_files(pattern))
+    added, skipped = build_corpus(args.store, paths, args.workers)
+    print(f"已向 {args.store} 追加 {added} 篇文档，跳过已有的 {skipped} 篇")
+
+
+if __name__ == "__main__":
+    main()
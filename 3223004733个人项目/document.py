@@ -0,0 +1,311 @@
+"""
+文档模块
+
+该模块提供 Document 对象：每篇文本只用 jieba 分词一次，
+清洗后的文本、词语列表、去停用词后的词语以及 bigram（字符串集合或驻留后的整数数组）均按需计算并缓存，
+供 TextProcessor 和 SimilarityCalculator 的各项指标共享。
+"""
+
+import hashlib
+import os
+import re
+from functools import cached_property
+
+from interning import get_vocabulary, pack_bigrams
+from jieba_dict import get_tokenizer
+from token_cache import TokenCache
+from tokenization import JiebaTokenizer, get_default_tokenizer
+
+# 基础中文停用词
+DEFAULT_STOP_WORDS = frozenset({
+    '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '一个',
+    '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没有', '看', '好',
+    '自己', '这个', '那', '他', '她', '它', '我们', '他们', '这', '那', '就', '也',
+    '还', '又', '都', '很', '让', '给', '把', '被', '吗', '呢', '啊', '呀', '哦'
+})
+
+# TextProcessor 使用的清洗规则：去除标点符号和特殊字符
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+# SimilarityCalculator 使用的清洗规则：标点替换为空格，保留中文字符
+CLEANUP_PATTERN = re.compile(r'[^\w\s\u4e00-\u9fff]')
+# jieba 切分时不会跨越的连续片段（jieba.re_han_default），片段之外的字符逐个成词
+JIEBA_BLOCK_PATTERN = re.compile(r'[\u4E00-\u9FD5a-zA-Z0-9+#&\._%\-]+')
+# 出现在 jieba 片段内部、又会被 CLEANUP_PATTERN 替换为空格的字符：先清洗再分词时片段的切分随之改变
+_BLOCK_PUNCTUATION = re.compile(r'[+#&.%\-]')
+
+# split_segments 的切分单位
+UNITS = ('paragraph', 'sentence')
+
+_SEGMENT_PATTERNS = {
+    'paragraph': re.compile(r'[^\n]+'),
+    'sentence': re.compile(r'[^\n。！？!?；;]+[。！？!?；;]*'),
+}
+
+
+def split_segments(text, unit='paragraph'):
+    """
+    将文本切分为段落或句子
+
+    Args:
+        text (str): 输入文本
+        unit (str): 'paragraph'（按换行切分）或 'sentence'（按换行和句末标点切分）
+
+    Returns:
+        list[tuple[int, int]]: 各片段去除首尾空白后的 (起始偏移, 结束偏移)，跳过空白片段
+    """
+    if unit not in UNITS:
+        raise ValueError(f"不支持的切分单位: {unit}")
+    segments = []
+    for match in _SEGMENT_PATTERNS[unit].finditer(text):
+        piece = match.group()
+        stripped = piece.strip()
+        if not stripped:
+            continue
+        start = match.start() + (len(piece) - len(piece.lstrip()))
+        segments.append((start, start + len(stripped)))
+    return segments
+
+
+# 短文本分词很快，不值得读写磁盘缓存
+MIN_CACHED_LENGTH = 512
+
+_token_cache = None
+
+
+def tokenizer_config(tokenizer=None):
+    """
+    分词配置指纹：分词器（jieba 时为其版本）、清洗规则和停用词表，任何一项变化都会使分词缓存失效
+
+    Args:
+        tokenizer (Tokenizer | None): 分词器，默认使用 get_default_tokenizer()
+    """
+    tokenizer = tokenizer or get_default_tokenizer()
+    return '\0'.join([
+        tokenizer.config(),
+        PUNCTUATION_PATTERN.pattern,
+        CLEANUP_PATTERN.pattern,
+        ' '.join(sorted(DEFAULT_STOP_WORDS)),
+    ])
+
+
+def get_token_cache():
+    """
+    获取默认的分词缓存
+
+    设置环境变量 PAPER_CHECK_TOKEN_CACHE=0 可关闭缓存。
+
+    Returns:
+        TokenCache | None: 缓存对象，关闭时返回 None
+    """
+    global _token_cache
+    if os.environ.get('PAPER_CHECK_TOKEN_CACHE', '1') == '0':
+        return None
+    if _token_cache is None:
+        # 分词缓存只保存 jieba 的分词结果
+        _token_cache = TokenCache(config=tokenizer_config(JiebaTokenizer()))
+    return _token_cache
+
+
+def set_token_cache(cache):
+    """
+    替换默认的分词缓存
+
+    Args:
+        cache (TokenCache | None): 新的缓存对象，None 表示恢复默认缓存
+    """
+    global _token_cache
+    _token_cache = cache
+
+
+def segment(text):
+    """
+    对文本进行分词，较长文本优先读取磁盘缓存
+
+    Args:
+        text (str): 输入文本
+
+    Returns:
+        list[str]: jieba 分词结果（保留空白和标点）
+    """
+    cache = get_token_cache() if len(text) >= MIN_CACHED_LENGTH else None
+    if cache is not None:
+        tokens = cache.get(text)
+        if tokens is not None:
+            return tokens
+
+    # 缓存未命中时才导入 jieba 并加载词典
+    tokens = get_tokenizer().lcut(text)
+    if cache is not None:
+        cache.put(text, tokens)
+    return tokens
+
+
+class Document:
+    """只分词一次的文档对象，各种派生表示按需计算并缓存"""
+
+    def __init__(self, text, stop_words=None, tokens=None, tokenizer=None, vocabulary=None):
+        """
+        Args:
+            text (str): 文档原文
+            stop_words (set[str] | None): 停用词表，默认使用 DEFAULT_STOP_WORDS
+            tokens (list[str] | None): 已有的分词结果，提供时不再分词
+            tokenizer (Tokenizer | None): 分词器，默认使用 get_default_tokenizer()（jieba）
+            vocabulary (Vocabulary | None): token_ids 使用的词表，默认使用 interning.get_vocabulary()
+        """
+        self.text = text or ""
+        self.stop_words = DEFAULT_STOP_WORDS if stop_words is None else stop_words
+        self.tokenizer = tokenizer or get_default_tokenizer()
+        self.vocabulary = get_vocabulary() if vocabulary is None else vocabulary
+        if tokens is not None:
+            self.tokens = list(tokens)
+
+    def __len__(self):
+        return len(self.text)
+
+    def __repr__(self):
+        return f"Document(len={len(self)})"
+
+    @property
+    def tokenized(self):
+        """分词结果是否已就绪（读取 tokens 不需要再调用分词器）"""
+        return 'tokens' in self.__dict__
+
+    @cached_property
+    def digest(self):
+        """原文的 SHA-256（十六进制），结果缓存按内容寻址时使用"""
+        return hashlib.sha256(self.text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    @cached_property
+    def tokens(self):
+        """分词结果（默认为 jieba 分词，保留空白和标点），整篇文档唯一一次分词"""
+        if not self.text:
+            return []
+        return self.tokenizer.tokenize(self.text)
+
+    @cached_property
+    def words(self):
+        """按原文分词后逐词去除标点的非空词语"""
+        words = (PUNCTUATION_PATTERN.sub('', token).strip() for token in self.tokens)
+        return [word for word in words if word]
+
+    @cached_property
+    def processed_text(self):
+        """词语用空格拼接的文本"""
+        return ' '.join(self.words)
+
+    @cached_property
+    def terms(self):
+        """
+        去停用词、去单字后的词语，保留词序（TF-IDF 的输入）
+
+        与最初的实现一致，等价于先把标点替换为空格再分词：jieba 的切分不跨越 JIEBA_BLOCK_PATTERN 片段，
+        只有内部含 +#&.%- 的片段清洗后切分不同，这些片段单独重新分词，其余片段直接复用 tokens。
+        """
+        terms = []
+        for token in self._cleaned_tokens():
+            for term in CLEANUP_PATTERN.sub(' ', token).split():
+                if term not in self.stop_words and len(term) > 1:
+                    terms.append(term)
+        return terms
+
+    def _cleaned_tokens(self):
+        """按先清洗再分词的切分给出词语（其中可能仍含标点，由调用方清洗）"""
+        text = self.text
+        if not isinstance(self.tokenizer, JiebaTokenizer) or not _BLOCK_PUNCTUATION.search(text):
+            return self.tokens
+        blocks = [
+            match.span() for match in JIEBA_BLOCK_PATTERN.finditer(text) if _BLOCK_PUNCTUATION.search(match.group())
+        ]
+        tokens = []
+        position = 0
+        block = 0
+        for token in self.tokens:
+            start = position
+            position += len(token)
+            # jieba 的词语不跨越片段边界，整个片段在其首个词语处一次重新分词
+            while block < len(blocks) and blocks[block][1] <= start:
+                block += 1
+            if block < len(blocks) and blocks[block][0] <= start:
+                if start == blocks[block][0]:
+                    block_start, block_end = blocks[block]
+                    tokens.extend(self.tokenizer.tokenize(CLEANUP_PATTERN.sub(' ', text[block_start:block_end])))
+                continue
+            tokens.append(token)
+        return tokens
+
+    @cached_property
+    def terms_text(self):
+        """terms 用空格拼接的文本"""
+        return ' '.join(self.terms)
+
+    @cached_property
+    def filtered_tokens(self):
+        """去停用词和空白后的词语（保留标点，Jaccard 相似度的输入）"""
+        return [token for token in self.tokens if token.strip() and token not in self.stop_words]
+
+    @cached_property
+    def bigrams(self):
+        """相邻词语组成的 bigram 集合（字符串形式，跨进程稳定，供 LSH 索引使用）"""
+        tokens = self.filtered_tokens
+        return {' '.join(tokens[i:i + 2]) for i in range(len(tokens) - 1)}
+
+    @cached_property
+    def token_ids(self):
+        """filtered_tokens 在文档词表（vocabulary）中的 id 数组（array('I')）"""
+        return self.vocabulary.intern(self.filtered_tokens)
+
+    @cached_property
+    def bigram_ids(self):
+        """bigrams 的整数形式：相邻词语 id 打包成的 64 位整数，有序且无重复（array('Q')）"""
+        return pack_bigrams(self.token_ids)
+
+    def bigram_ids_in(self, vocabulary):
+        """
+        bigram_ids 在指定词表中的形式（与另一词表中的文档比较时使用，只缓存最近一次的结果）
+
+        Args:
+            vocabulary (Vocabulary): 词表
+
+        Returns:
+            array: 类型为 'Q' 的有序、无重复 bigram 数组
+        """
+        if vocabulary is self.vocabulary:
+            return self.bigram_ids
+        cached = self.__dict__.get('_foreign_bigram_ids')
+        if cached is None or cached[0] is not vocabulary:
+            cached = self._foreign_bigram_ids = (vocabulary, pack_bigrams(vocabulary.intern(self.filtered_tokens)))
+        return cached[1]
+
+
+def shared_bigram_ids(doc1, doc2):
+    """
+    两篇文档在同一词表中的 bigram_ids
+
+    词表不同时（如语料库存储中的文档与新读入的文档），把一方的词语驻留到较大的词表中：
+    语料库存储的词表通常更大，其中的文档不必还原为字符串，另一方只需驻留一篇文档的词语。
+
+    Returns:
+        tuple[array, array]: 两篇文档的 bigram 数组
+    """
+    if doc1.vocabulary is doc2.vocabulary:
+        return doc1.bigram_ids, doc2.bigram_ids
+    if len(doc1.vocabulary) >= len(doc2.vocabulary):
+        return doc1.bigram_ids, doc2.bigram_ids_in(doc1.vocabulary)
+    return doc1.bigram_ids_in(doc2.vocabulary), doc2.bigram_ids
+
+
+def as_document(value, stop_words=None, tokenizer=None):
+    """
+    将字符串包装为 Document，已是 Document 时原样返回
+
+    Args:
+        value (str | Document): 文本或文档对象
+        stop_words (set[str] | None): 包装字符串时使用的停用词表
+        tokenizer (Tokenizer | None): 包装字符串时使用的分词器
+
+    Returns:
+        Document: 文档对象
+    """
+    if isinstance(value, Document):
+        return value
+    return Document(value, stop_words, tokenizer=tokenizer)
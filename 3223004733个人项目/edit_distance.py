@@ -0,0 +1,208 @@
+"""
+编辑距离模块
+
+该模块提供基于 Myers/Hyyrö 位并行算法的 Levenshtein 编辑距离计算，
+支持字符级与词语级（任意可哈希元素序列）两种输入，以及最大距离截断。
+"""
+
+from collections import Counter
+
+
+def _strip_common_affix(seq1, seq2):
+    """去除两个序列的公共前缀和公共后缀（不影响编辑距离）"""
+    start = 0
+    limit = min(len(seq1), len(seq2))
+    while start < limit and seq1[start] == seq2[start]:
+        start += 1
+
+    end1, end2 = len(seq1), len(seq2)
+    while end1 > start and end2 > start and seq1[end1 - 1] == seq2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+
+    return seq1[start:end1], seq2[start:end2]
+
+
+def _bit_parallel_distance(pattern, text, max_distance):
+    """
+    Myers/Hyyrö 位并行编辑距离
+
+    pattern 的每个位置对应位向量中的一位。位向量使用 Python 的任意精度整数，
+    加法进位在内部的机器字之间自动传播，相当于多字（64位分块）版本的算法，
+    每处理 text 中的一个元素只需常数次整数运算。
+
+    Args:
+        pattern (Sequence): 较短的序列
+        text (Sequence): 较长的序列
+        max_distance (int | None): 距离上限，超过时提前返回 max_distance + 1
+
+    Returns:
+        int: 编辑距离
+    """
+    m = len(pattern)
+    n = len(text)
+    if m == 0:
+        return n
+
+    # 每个元素在 pattern 中出现位置的位掩码
+    peq = {}
+    for i, item in enumerate(pattern):
+        peq[item] = peq.get(item, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp = mask
+    vn = 0
+    score = m
+
+    for j, item in enumerate(text):
+        eq = peq.get(item, 0)
+        xv = eq | vn
+        xh = ((((eq & vp) + vp) & mask) ^ vp) | eq
+        hp = (vn | ~(xh | vp)) & mask
+        hn = vp & xh
+
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+
+        # 每处理一列最后一行的值最多减少 1，剩余列数不足以把距离降回上限内时提前退出
+        if max_distance is not None and score - (n - j - 1) > max_distance:
+            return max_distance + 1
+
+        hp = (hp << 1) | 1
+        hn = hn << 1
+        vp = (hn | ~(xv | hp)) & mask
+        vn = hp & xv
+
+    return score
+
+
+def levenshtein(seq1, seq2, max_distance=None):
+    """
+    计算两个序列的 Levenshtein 编辑距离
+
+    Args:
+        seq1 (str | Sequence): 第一个序列，字符串按字符比较，列表/元组按元素比较
+        seq2 (str | Sequence): 第二个序列
+        max_distance (int | None): 距离上限，若真实距离超过上限则返回 max_distance + 1
+
+    Returns:
+        int: 编辑距离
+    """
+    if max_distance is not None:
+        if max_distance < 0:
+            raise ValueError("max_distance 不能为负数")
+        # 长度差是编辑距离的下界
+        if abs(len(seq1) - len(seq2)) > max_distance:
+            return max_distance + 1
+
+    seq1, seq2 = _strip_common_affix(seq1, seq2)
+    if len(seq1) > len(seq2):
+        seq1, seq2 = seq2, seq1
+
+    distance = _bit_parallel_distance(seq1, seq2, max_distance)
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
+
+def edit_similarity(seq1, seq2, min_similarity=None):
+    """
+    计算基于编辑距离的相似度：1 - 距离 / 较长序列长度
+
+    Args:
+        seq1 (str | Sequence): 第一个序列
+        seq2 (str | Sequence): 第二个序列
+        min_similarity (float | None): 相似度下限，确定无法达到时提前返回 0.0
+
+    Returns:
+        float: 0 到 1 之间的相似度
+    """
+    if not seq1 and not seq2:
+        return 1.0
+    elif not seq1 or not seq2:
+        return 0.0
+
+    max_len = max(len(seq1), len(seq2))
+    max_distance = None
+    if min_similarity is not None:
+        # 加上微小容差，避免浮点误差把恰好等于下限的距离截掉
+        max_distance = int((1.0 - min_similarity) * max_len + 1e-9)
+
+    distance = levenshtein(seq1, seq2, max_distance)
+    if max_distance is not None and distance > max_distance:
+        return 0.0
+    return 1.0 - distance / max_len
+
+
+def edit_similarity_upper_bound(seq1, seq2):
+    """
+    不计算编辑距离，由两个序列的共有元素给出编辑相似度的上界（线性时间）
+
+    - 对齐中匹配的位置只能使用两边共有的元素：距离 ≥ 较长长度 - 共有元素数（多重集交集）
+    - q-gram 引理：每次编辑最多破坏 2 个相邻二元组：距离 ≥ (较长长度 - 1 - 共有二元组数) / 2
+
+    Args:
+        seq1 (str | Sequence): 第一个序列
+        seq2 (str | Sequence): 第二个序列
+
+    Returns:
+        float: 不小于 edit_similarity(seq1, seq2) 的值
+    """
+    if not seq1 and not seq2:
+        return 1.0
+    elif not seq1 or not seq2:
+        return 0.0
+
+    max_len = max(len(seq1), len(seq2))
+    common = sum((Counter(seq1) & Counter(seq2)).values())
+    common_bigrams = sum((Counter(zip(seq1, seq1[1:])) & Counter(zip(seq2, seq2[1:]))).values())
+
+    min_distance = max(max_len - common, -(-(max_len - 1 - common_bigrams) // 2))
+    return 1.0 - min_distance / max_len
+
+
+def token_edit_similarity(tokens1, tokens2, min_similarity=None):
+    """
+    计算词语级编辑距离相似度
+
+    Args:
+        tokens1 (Sequence[str]): 第一个词语序列
+        tokens2 (Sequence[str]): 第二个词语序列
+        min_similarity (float | None): 相似度下限
+
+    Returns:
+        float: 0 到 1 之间的相似度
+    """
+    return edit_similarity(list(tokens1), list(tokens2), min_similarity)
+
+
+def reference_edit_distance(s1, s2):
+    """
+    朴素的 O(n·m) 动态规划编辑距离，仅用于测试与基准对比
+
+    Args:
+        s1 (str | Sequence): 第一个序列
+        s2 (str | Sequence): 第二个序列
+
+    Returns:
+        int: 编辑距离
+    """
+    if len(s1) < len(s2):
+        return reference_edit_distance(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+
+    previous_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+
+    return previous_row[-1]
@@ -4,7 +4,28 @@
 该模块负责文件的读写操作，支持多种编码格式的自动检测和处理。
 """
 
-import chardet
+import codecs
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+
+# 编码检测最多读取的前缀字节数
+DETECTION_PREFIX_BYTES = 64 * 1024
+# 流式读取默认的块大小（字符数）
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# 检测失败或检测结果无法解码时依次尝试的编码
+FALLBACK_ENCODINGS = ['gbk', 'gb2312', 'utf-16']
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
 
 
 class FileHandler:
@@ -16,38 +37,149 @@ class FileHandler:
         
         Args:
             file_path (str): 文件路径
-            
+        
         Returns:
             str: 文件内容
-            
+        
         Raises:
             FileNotFoundError: 当文件不存在时
             UnicodeDecodeError: 当文件编码无法识别时
             IOError: 当文件读取失败时
         """
         try:
-            # 检测文件编码
+            # 只读取一次文件，后续解码都在内存中完成
             with open(file_path, 'rb') as file:
                 raw_data = file.read()
-                encoding = chardet.detect(raw_data)['encoding']
-                
-            # 使用检测到的编码读取文件
-            with open(file_path, 'r', encoding=encoding or 'utf-8') as file:
-                return file.read()
-                
         except FileNotFoundError as e:
             raise FileNotFoundError(f"文件未找到: {file_path}") from e
-        except UnicodeDecodeError as e:
-            # 尝试使用其他常见编码
-            for encoding in ['gbk', 'gb2312', 'utf-16']:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as file:
-                        return file.read()
-                except UnicodeDecodeError:
-                    continue
-            raise UnicodeDecodeError(f"无法解码文件 {file_path}，尝试了多种编码") from e
         except IOError as e:
             raise IOError(f"文件读取错误: {file_path}") from e
+        
+        for encoding in self._candidate_encodings(raw_data):
+            try:
+                text = raw_data.decode(encoding)
+            except (UnicodeDecodeError, LookupError):
+                continue
+            # 与文本模式读取一致：统一换行符为 \n
+            return text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        raise UnicodeDecodeError(
+            'unknown', raw_data[:1], 0, 1, f"无法解码文件 {file_path}，尝试了多种编码"
+        )
+    
+    def iter_chunks(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        流式读取文件，按块产出解码后的文本
+        
+        编码先根据文件前缀确定，之后使用增量解码器逐块解码，内存中只保留当前块。
+        前缀之后才出现的字节无法用该编码解码时（如前 64KB 是 ASCII、之后是 GBK），
+        与 read_file 一样依次换用后续的候选编码，从头重新解码并跳过已产出的部分，
+        产出的文本与 read_file 的结果一致；已产出的部分在新编码下解码结果不同时无法撤回，抛出 UnicodeDecodeError。
+        
+        Args:
+            file_path (str): 文件路径
+            chunk_size (int): 每块的最大字符数
+        
+        Yields:
+            str: 解码后的文本块（换行符统一为 \n）
+        
+        Raises:
+            FileNotFoundError: 当文件不存在时
+            UnicodeDecodeError: 当文件编码无法识别时
+            IOError: 当文件读取失败时
+        """
+        try:
+            binary = open(file_path, 'rb')
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"文件未找到: {file_path}") from e
+        except IOError as e:
+            raise IOError(f"文件读取错误: {file_path}") from e
+        
+        with binary:
+            prefix = binary.read(DETECTION_PREFIX_BYTES)
+            # 已产出的字符数及其摘要，换用编码时用来核对重新解码的结果
+            produced = 0
+            digest = hashlib.sha256()
+            for encoding in self._stream_encodings(prefix):
+                binary.seek(0)
+                # TextIOWrapper 内部使用增量解码器，并负责跨块的多字节字符和 \r\n
+                reader = io.TextIOWrapper(binary, encoding=encoding, newline=None)
+                try:
+                    if produced and not self._skip_produced(reader, produced, digest.digest(), chunk_size):
+                        break
+                    while True:
+                        chunk = reader.read(chunk_size)
+                        if not chunk:
+                            return
+                        digest.update(chunk.encode('utf-8', 'surrogatepass'))
+                        produced += len(chunk)
+                        yield chunk
+                except UnicodeError:
+                    # 包括 UTF-16 解码器在缺少 BOM 时抛出的 UnicodeError
+                    continue
+                finally:
+                    # 不让 TextIOWrapper 关闭底层文件
+                    reader.detach()
+            
+            raise UnicodeDecodeError(
+                'unknown', prefix[:1], 0, 1, f"无法解码文件 {file_path}，尝试了多种编码"
+            )
+    
+    @staticmethod
+    def _skip_produced(reader, count, expected_digest, chunk_size):
+        """读过已产出的 count 个字符，返回其摘要是否与已产出的部分一致"""
+        digest = hashlib.sha256()
+        while count:
+            piece = reader.read(min(count, chunk_size))
+            if not piece:
+                return False
+            digest.update(piece.encode('utf-8', 'surrogatepass'))
+            count -= len(piece)
+        return digest.digest() == expected_digest
+    
+    def _candidate_encodings(self, raw_data):
+        """按优先级产出候选编码：BOM、严格 UTF-8、前缀检测结果、常见中文编码"""
+        for bom, encoding in _BOMS:
+            if raw_data.startswith(bom):
+                yield encoding
+                break
+        
+        yield 'utf-8'
+        
+        detected = self._detect_encoding(raw_data)
+        if detected:
+            yield detected
+        
+        yield from FALLBACK_ENCODINGS
+    
+    def _stream_encodings(self, prefix):
+        """按 _candidate_encodings 的顺序产出能解码文件前缀的编码（同一编码只产出一次）"""
+        tried = set()
+        for encoding in self._candidate_encodings(prefix):
+            try:
+                name = codecs.lookup(encoding).name
+                if name in tried:
+                    continue
+                tried.add(name)
+                # 前缀末尾可能截断多字节字符，用增量解码器且不标记结束
+                codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+            except (UnicodeError, LookupError):
+                continue
+            yield encoding
+    
+    def _detect_encoding(self, raw_data):
+        """用增量检测器在有限长度的前缀上检测编码"""
+        # chardet 只在文件不是 UTF-8 时才需要，按需导入以缩短启动时间
+        import chardet
+        
+        detector = chardet.UniversalDetector()
+        prefix = memoryview(raw_data)[:DETECTION_PREFIX_BYTES]
+        for start in range(0, len(prefix), 4096):
+            detector.feed(bytes(prefix[start:start + 4096]))
+            if detector.done:
+                break
+        detector.close()
+        return detector.result.get('encoding')
     
     def write_file(self, file_path, content):
         """
@@ -56,7 +188,7 @@ class FileHandler:
         Args:
             file_path (str): 文件路径
             content (str): 要写入的内容
-            
+        
         Raises:
             IOError: 当文件写入失败时
             PermissionError: 当没有写入权限时
@@ -68,19 +200,85 @@ class FileHandler:
             raise IOError(f"文件写入错误: {file_path}") from e
         except PermissionError as e:
             raise PermissionError(f"没有写入权限: {file_path}") from e
+    
+    def collect_files(self, pattern):
+        """
+        收集目录下的全部文件或匹配通配符的文件
+        
+        Args:
+            pattern (str): 目录路径或通配符（如 submissions/*.txt，支持 **）
+        
+        Returns:
+            list[str]: 按路径排序的文件列表
+        
+        Raises:
+            FileNotFoundError: 当没有匹配到任何文件时
+        """
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            paths = glob.glob(pattern, recursive=True)
+        
+        files = sorted(path for path in paths if os.path.isfile(path))
+        if not files:
+            raise FileNotFoundError(f"没有匹配的文件: {pattern}")
+        return files
+    
+    def write_records(self, file_path, records, fmt=None):
+        """
+        将结果记录写入 CSV 或 JSONL 文件
+        
+        Args:
+            file_path (str): 文件路径
+            records (list[dict]): 结果记录，各记录字段相同
+            fmt (str | None): 'csv' 或 'jsonl'，默认按扩展名判断（.jsonl/.json 为 JSONL，其余为 CSV）
+        
+        Raises:
+            ValueError: 当输出格式不受支持时
+            IOError: 当文件写入失败时
+        """
+        if fmt is None:
+            fmt = 'jsonl' if file_path.lower().endswith(('.jsonl', '.json')) else 'csv'
+        if fmt not in ('csv', 'jsonl'):
+            raise ValueError(f"不支持的输出格式: {fmt}")
+        
+        try:
+            with open(file_path, 'w', encoding='utf-8', newline='') as file:
+                if fmt == 'jsonl':
+                    for record in records:
+                        file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                elif records:
+                    writer = csv.DictWriter(file, fieldnames=list(records[0]))
+                    writer.writeheader()
+                    writer.writerows(records)
+        except IOError as e:
+            raise IOError(f"文件写入错误: {file_path}") from e
 
 
 # 创建全局实例
 file_handler = FileHandler()
 
 # 提供函数接口
+def read_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    流式读取文件的函数接口
+    
+    Args:
+        file_path (str): 文件路径
+        chunk_size (int): 每块的最大字符数
+    
+    Returns:
+        Iterator[str]: 解码后的文本块
+    """
+    return file_handler.iter_chunks(file_path, chunk_size)
+
 def read_file(file_path):
     """
     读取文件内容的函数接口
     
     Args:
         file_path (str): 文件路径
-        
+    
     Returns:
         str: 文件内容
     """
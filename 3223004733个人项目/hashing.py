@@ -0,0 +1,258 @@
+"""
+哈希特征模块
+
+基于词表的 TF-IDF 需要在内存中保存完整词表，并且拟合前要拿到全部文档，无法处理数 GB 的文档归档。
+该模块把 unigram 和 bigram 特征哈希到固定宽度的特征空间（默认 2^20 维），不保存词表：
+文件按块流式读取、逐块分词并累加到稀疏向量中，内存占用只取决于特征空间宽度，与文档大小无关。
+
+哈希使用 CRC32（跨进程稳定，不受 PYTHONHASHSEED 影响），低位取模得到特征下标，
+最高位决定符号（alternate sign），使哈希冲突在点积中相互抵消而不是系统性地抬高相似度。
+权重为词频，不使用 IDF，向量做 L2 归一化。
+
+与现有 TF-IDF 余弦相似度在样例文件上的对比（orig.txt 与各改写版本，benchmarks/bench_hashing.py 可复现）：
+    样例                 TF-IDF   TF-IDF(不限词表)   哈希 2^20   哈希 2^16
+    orig_0.8_add.txt     0.9672   0.6996             0.8117      0.8122
+    orig_0.8_del.txt     0.9474   0.6954             0.8031      0.8017
+    orig_0.8_dis_1.txt   0.9867   0.9204             0.9542      0.9542
+    orig_0.8_dis_10.txt  0.9049   0.7534             0.8461      0.8455
+    orig_0.8_dis_15.txt  0.8747   0.4739             0.6205      0.6185
+现有 TF-IDF 只保留两篇文档中词频最高的 1000 个特征（多为共有词），得分明显偏高；
+不限词表时两篇文档上的 IDF 又放大了各自独有的特征。哈希特征不使用 IDF，得分介于两者之间，
+五个样例中有三个与现有得分的排序一致（dis_10 排到 add、del 之前）。
+哈希冲突带来的误差：与不哈希的词频余弦相似度相比，2^20 维最大差 2e-4，2^16 维约 2e-3，2^12 维约 0.03。
+流式分块计算与整篇计算的结果一致（差异在 1e-13 以内）。
+流式计算 8.9 MB 文件耗时约 21 秒（基本都是 jieba 分词），内存峰值约 7 MB（块大小 1M 字符时约 100 MB）。
+"""
+
+import hashlib
+import math
+import re
+import zlib
+from collections import Counter
+
+from document import DEFAULT_STOP_WORDS, Document
+from tokenization import get_default_tokenizer
+
+# 默认特征空间宽度
+DEFAULT_N_FEATURES = 2 ** 20
+# 流式读取的块大小（字符数）：jieba 分词的中间结果约为文本的上百倍，块越小内存峰值越低，速度基本不变
+STREAM_CHUNK_SIZE = 64 * 1024
+# 匹配到块内最后一个切分点：jieba 只在汉字、字母、数字等组成的连续片段内分词（与 jieba.re_han_default 一致），
+# 在片段之外的标点和空白处切开，逐块分词的结果与整篇分词相同
+_LAST_BREAK = re.compile(r'.*[^\u4E00-\u9FD5a-zA-Z0-9+#&\._%\-]', re.DOTALL)
+
+_default_hasher = None
+
+
+class TermHasher:
+    """把词语特征哈希到固定宽度的稀疏向量"""
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, alternate_sign=True, stop_words=None):
+        """
+        Args:
+            n_features (int): 特征空间宽度
+            alternate_sign (bool): 是否按哈希值为特征赋予正负号以抵消冲突
+            stop_words (set[str] | None): 停用词表，默认使用 DEFAULT_STOP_WORDS
+        """
+        if n_features < 1:
+            raise ValueError("n_features 必须为正整数")
+        self.n_features = n_features
+        self.alternate_sign = alternate_sign
+        self.stop_words = DEFAULT_STOP_WORDS if stop_words is None else stop_words
+
+    def __repr__(self):
+        return f"TermHasher(n_features={self.n_features})"
+
+    @property
+    def fingerprint(self):
+        """特征器配置的摘要，用作结果缓存配置指纹的一部分"""
+        config = f"{self.n_features}\0{self.alternate_sign}\0{' '.join(sorted(self.stop_words))}"
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()
+
+    def _add_terms(self, counts, terms, previous=None):
+        """
+        将词语序列的 unigram 和 bigram 特征累加到 counts
+
+        Args:
+            counts (dict[int, float]): 特征下标到带符号词频的映射
+            terms (list[str]): 词语序列
+            previous (str | None): 上一块的最后一个词语，用于补上跨块的 bigram
+        """
+        features = list(terms)
+        if previous is not None and terms:
+            features.append(f"{previous} {terms[0]}")
+        features.extend(f"{terms[i]} {terms[i + 1]}" for i in range(len(terms) - 1))
+        self._add_features(counts, features)
+
+    def _add_features(self, counts, features, weight=1):
+        """
+        将特征字符串累加到 counts
+
+        Args:
+            counts (dict[int, float]): 特征下标到带符号词频的映射
+            features (Iterable[str]): 特征（unigram 或以空格连接的 bigram）
+            weight (int): 每次出现累加的词频，为 -1 时从 counts 中减去这些特征
+        """
+        n_features = self.n_features
+        for feature, count in Counter(features).items():
+            value = zlib.crc32(feature.encode('utf-8'))
+            index = value % n_features
+            count *= weight
+            if self.alternate_sign and value & 0x80000000:
+                count = -count
+            counts[index] = counts.get(index, 0) + count
+
+    @staticmethod
+    def _normalize(counts):
+        norm = math.sqrt(sum(value * value for value in counts.values()))
+        if norm == 0:
+            return {}
+        return {index: value / norm for index, value in counts.items() if value}
+
+    def vector(self, document):
+        """
+        计算文档的 L2 归一化哈希特征向量
+
+        Args:
+            document (Document): 文档
+
+        Returns:
+            dict[int, float]: 特征下标到权重的映射，没有特征时为空
+        """
+        counts = {}
+        self._add_terms(counts, document.terms)
+        return self._normalize(counts)
+
+    def iter_pieces(self, chunks):
+        """
+        将文本块重新切分为不截断词语的片段
+
+        每块在最后一个标点或空白处切开，之后的部分并入下一块，
+        使逐块分词的结果与整篇分词一致。块内没有标点和空白时在块尾直接切开。
+
+        Args:
+            chunks (Iterable[str]): 文本块
+
+        Yields:
+            str: 文本片段
+        """
+        carry = ''
+        for chunk in chunks:
+            text = carry + chunk
+            match = _LAST_BREAK.match(text)
+            if match is None:
+                carry = ''
+                yield text
+            else:
+                carry = text[match.end():]
+                yield text[:match.end()]
+        if carry:
+            yield carry
+
+    def vector_from_chunks(self, chunks):
+        """
+        流式计算文本的哈希特征向量，内存中只保留当前块和稀疏向量
+
+        Args:
+            chunks (Iterable[str]): 文本块，如 FileHandler.iter_chunks 的输出
+
+        Returns:
+            dict[int, float]: 与整篇文本调用 vector 的结果一致（块内没有标点和空白时可能有少量差异）
+        """
+        tokenizer = get_default_tokenizer()
+        counts = {}
+        previous = None
+        for piece in self.iter_pieces(chunks):
+            # 直接分词，不写入分词缓存，避免大文件的分块结果挤占缓存
+            tokens = tokenizer.tokenize(piece, use_cache=False)
+            terms = Document(piece, self.stop_words, tokens=tokens, tokenizer=tokenizer).terms
+            self._add_terms(counts, terms, previous)
+            if terms:
+                previous = terms[-1]
+        return self._normalize(counts)
+
+    def vector_from_file(self, file_path, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        流式读取文件并计算哈希特征向量
+
+        Args:
+            file_path (str): 文件路径
+            chunk_size (int): 每块的最大字符数
+
+        Returns:
+            dict[int, float]: 哈希特征向量
+        """
+        from file_handler import FileHandler
+
+        return self.vector_from_chunks(FileHandler().iter_chunks(file_path, chunk_size))
+
+    def cosine(self, vector1, vector2):
+        """两个已归一化稀疏向量的余弦相似度"""
+        if len(vector1) > len(vector2):
+            vector1, vector2 = vector2, vector1
+        return sum(weight * vector2.get(index, 0.0) for index, weight in vector1.items())
+
+    def transform(self, documents):
+        """
+        将一批文档变换为哈希特征稀疏矩阵
+
+        Args:
+            documents (list[Document]): 文档列表
+
+        Returns:
+            scipy.sparse.csr_matrix: 形状为 (文档数, n_features)，行向量已 L2 归一化
+        """
+        from scipy.sparse import csr_matrix
+
+        indices = []
+        data = []
+        indptr = [0]
+        for document in documents:
+            for index, weight in sorted(self.vector(document).items()):
+                indices.append(index)
+                data.append(weight)
+            indptr.append(len(indices))
+        return csr_matrix((data, indices, indptr), shape=(len(documents), self.n_features))
+
+
+def get_hasher():
+    """
+    获取默认的哈希特征器
+
+    Returns:
+        TermHasher | None: 启用哈希特征模式时的特征器，否则为 None
+    """
+    return _default_hasher
+
+
+def set_hasher(hasher):
+    """
+    设置默认的哈希特征器
+
+    Args:
+        hasher (TermHasher | None): 特征器，None 表示使用 TF-IDF
+    """
+    global _default_hasher
+    _default_hasher = hasher
+
+
+def hashed_file_similarity(path1, path2, hasher=None):
+    """
+    流式计算两个文件的哈希特征余弦相似度
+
+    超大文件无法计算编辑距离，因此不做高相似度时的编辑距离修正。
+
+    Args:
+        path1 (str): 第一个文件路径
+        path2 (str): 第二个文件路径
+        hasher (TermHasher | None): 特征器，默认使用 get_hasher()，未设置时使用默认宽度
+
+    Returns:
+        float: 保留4位小数的余弦相似度
+    """
+    hasher = hasher or get_hasher() or TermHasher()
+    vector1 = hasher.vector_from_file(path1)
+    vector2 = hasher.vector_from_file(path2)
+    if not vector1 and not vector2:
+        return 1.0
+    return round(max(0.0, min(1.0, hasher.cosine(vector1, vector2))), 4)
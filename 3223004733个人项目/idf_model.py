@@ -0,0 +1,349 @@
+"""
+IDF 模型模块
+
+默认情况下余弦相似度每次只在待比较的两篇文档上拟合 TF-IDF：只有两篇文档时 IDF 几乎没有意义
+（共有词的权重被压低，独有词的权重被抬高），而且每次比较都要重新拟合。
+该模块在参考语料上一次性统计 unigram 和 bigram 的文档频率，保存为紧凑的模型文件，
+之后每对文档只需把词频乘以固定的 IDF 并做 L2 归一化（稀疏变换），得分不再依赖同批输入的其他文档。
+
+特征与 SimilarityCalculator 的 TfidfVectorizer 一致：Document.terms 的 unigram 和相邻 bigram，
+IDF 使用 sklearn 默认的平滑公式 ln((1 + n) / (1 + df)) + 1。
+参考语料中没有出现的特征按 df = 0 计算（即最大 IDF），两篇论文共有的罕见词仍然是强信号。
+
+模型文件格式（小端）：
+    MAGIC | 头部长度、词表长度、IDF 长度（3 个 uint32）| JSON 头部 | zlib(换行分隔的特征) | zlib(float64 IDF 数组)
+
+用法:
+    python idf_model.py fit model.idf 语料目录或通配符... [--min-df 2] [--max-features N]
+    python idf_model.py info model.idf
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from collections import Counter
+from functools import cached_property
+
+from document import as_document, tokenizer_config
+
+MAGIC = b'PCIDF\0'
+# 模型文件格式版本，格式变化时递增
+MODEL_FORMAT_VERSION = 1
+NGRAM_RANGE = (1, 2)
+
+_HEADER = struct.Struct('<III')
+
+_default_model = None
+_default_loaded = False
+_loaded_models = {}
+
+
+def model_config():
+    """特征配置指纹：分词配置和 n-gram 范围，与拟合时不一致的模型不能使用"""
+    config = f"{tokenizer_config()}\0ngram={NGRAM_RANGE[0]},{NGRAM_RANGE[1]}"
+    return hashlib.sha256(config.encode('utf-8')).hexdigest()
+
+
+def iter_features(terms):
+    """产出词语序列的 unigram 和 bigram 特征（bigram 以空格连接，与 TfidfVectorizer 一致）"""
+    yield from terms
+    for i in range(len(terms) - 1):
+        yield f"{terms[i]} {terms[i + 1]}"
+
+
+class IdfModel:
+    """在参考语料上拟合的固定 IDF"""
+
+    def __init__(self, idf, document_count):
+        """
+        Args:
+            idf (dict[str, float]): 特征到 IDF 的映射
+            document_count (int): 参考语料的文档数
+        """
+        self.idf = idf
+        self.document_count = document_count
+        # 未登录特征的 IDF（df = 0）
+        self.default_idf = math.log(1 + document_count) + 1.0
+
+    def __len__(self):
+        return len(self.idf)
+
+    def __repr__(self):
+        return f"IdfModel(features={len(self.idf)}, documents={self.document_count})"
+
+    @cached_property
+    def fingerprint(self):
+        """模型内容的摘要（特征、IDF 和文档数），用作结果缓存配置指纹的一部分"""
+        digest = hashlib.sha256(f"{self.document_count}\0".encode('utf-8'))
+        digest.update('\n'.join(self.idf).encode('utf-8'))
+        digest.update(array('d', self.idf.values()).tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def fit(cls, documents, min_df=2, max_features=None, stop_words=None):
+        """
+        在参考语料上统计文档频率
+
+        语料逐篇处理，只保留特征计数，可以传入生成器以流式处理大语料。
+
+        Args:
+            documents (Iterable[str | Document]): 参考语料
+            min_df (int): 保留的特征至少出现在多少篇文档中（低于该值的特征按未登录处理，模型更小）
+            max_features (int | None): 按语料总词频保留的最大特征数
+            stop_words (set[str] | None): 包装字符串时使用的停用词表
+
+        Returns:
+            IdfModel: 拟合好的模型
+        """
+        document_freq = Counter()
+        term_freq = Counter()
+        count = 0
+        for document in documents:
+            features = Counter(iter_features(as_document(document, stop_words).terms))
+            document_freq.update(features.keys())
+            term_freq.update(features)
+            count += 1
+
+        kept = [feature for feature, df in document_freq.items() if df >= min_df]
+        if max_features is not None and len(kept) > max_features:
+            # 总词频相同时按特征排序，保证结果稳定
+            kept.sort(key=lambda feature: (-term_freq[feature], feature))
+            kept = kept[:max_features]
+
+        idf = {
+            feature: math.log((1 + count) / (1 + document_freq[feature])) + 1.0
+            for feature in sorted(kept)
+        }
+        return cls(idf, count)
+
+    def vector(self, document):
+        """
+        计算文档的 L2 归一化 TF-IDF 稀疏向量
+
+        Args:
+            document (Document): 文档
+
+        Returns:
+            dict[str, float]: 特征到权重的映射，没有特征时为空
+        """
+        counts = Counter(iter_features(document.terms))
+        weights = {
+            feature: count * self.idf.get(feature, self.default_idf)
+            for feature, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if norm == 0:
+            return {}
+        return {feature: weight / norm for feature, weight in weights.items()}
+
+    def cosine(self, vector1, vector2):
+        """两个已归一化稀疏向量的余弦相似度"""
+        if len(vector1) > len(vector2):
+            vector1, vector2 = vector2, vector1
+        return sum(weight * vector2.get(feature, 0.0) for feature, weight in vector1.items())
+
+    def transform(self, documents):
+        """
+        将一批文档变换为 TF-IDF 稀疏矩阵
+
+        Args:
+            documents (list[Document]): 文档列表
+
+        Returns:
+            scipy.sparse.csr_matrix: 行向量已 L2 归一化，列为这批文档中出现的特征
+        """
+        from scipy.sparse import csr_matrix
+
+        columns = {}
+        indices = []
+        data = []
+        indptr = [0]
+        for document in documents:
+            for feature, weight in self.vector(document).items():
+                indices.append(columns.setdefault(feature, len(columns)))
+                data.append(weight)
+            indptr.append(len(indices))
+        return csr_matrix((data, indices, indptr), shape=(len(documents), len(columns)))
+
+    def save(self, path):
+        """
+        保存模型文件
+
+        Args:
+            path (str): 输出文件路径
+        """
+        features = list(self.idf)
+        header = json.dumps({
+            'format': MODEL_FORMAT_VERSION,
+            'config': model_config(),
+            'documents': self.document_count,
+            'features': len(features),
+        }).encode('utf-8')
+        feature_data = zlib.compress('\n'.join(features).encode('utf-8'))
+        values = array('d', (self.idf[feature] for feature in features))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        idf_data = zlib.compress(values.tobytes())
+
+        # 先写临时文件再原子替换，避免读到不完整的模型
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(MAGIC)
+                file.write(_HEADER.pack(len(header), len(feature_data), len(idf_data)))
+                file.write(header)
+                file.write(feature_data)
+                file.write(idf_data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """
+        读取模型文件
+
+        Args:
+            path (str): 模型文件路径
+
+        Returns:
+            IdfModel: 模型
+
+        Raises:
+            ValueError: 文件格式错误，或模型的分词配置与当前不一致
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        if not data.startswith(MAGIC) or len(data) < len(MAGIC) + _HEADER.size:
+            raise ValueError(f"不是 IDF 模型文件: {path}")
+
+        offset = len(MAGIC)
+        header_size, feature_size, idf_size = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        try:
+            header = json.loads(data[offset:offset + header_size])
+            offset += header_size
+            features = zlib.decompress(data[offset:offset + feature_size]).decode('utf-8')
+            offset += feature_size
+            values = array('d')
+            values.frombytes(zlib.decompress(data[offset:offset + idf_size]))
+        except (ValueError, zlib.error) as e:
+            raise ValueError(f"IDF 模型文件已损坏: {path}") from e
+
+        if header.get('format') != MODEL_FORMAT_VERSION:
+            raise ValueError(f"不支持的 IDF 模型格式版本: {header.get('format')}")
+        if header.get('config') != model_config():
+            raise ValueError("IDF 模型的分词配置与当前不一致，请重新拟合")
+        if sys.byteorder == 'big':
+            values.byteswap()
+        features = features.split('\n') if features else []
+        if len(features) != len(values) or len(features) != header.get('features'):
+            raise ValueError(f"IDF 模型文件已损坏: {path}")
+        return cls(dict(zip(features, values)), header['documents'])
+
+
+def load_idf_model(path):
+    """
+    读取模型文件，同一文件未修改时复用已加载的模型（常驻服务中重复指定同一模型不必重新读取）
+
+    复用的键包含当前的特征配置指纹：常驻服务切换分词器后重新读取并检查配置，不会沿用按其他分词器拟合的模型。
+
+    Args:
+        path (str): 模型文件路径
+
+    Returns:
+        IdfModel: 模型
+
+    Raises:
+        ValueError: 文件格式错误，或模型的分词配置与当前不一致
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, model_config())
+    model = _loaded_models.get(key)
+    if model is None:
+        model = IdfModel.load(path)
+        _loaded_models.clear()
+        _loaded_models[key] = model
+    return model
+
+
+def get_idf_model():
+    """
+    获取默认的 IDF 模型
+
+    未通过 set_idf_model 指定时，读取环境变量 PAPER_CHECK_IDF_MODEL 指向的模型文件。
+
+    Returns:
+        IdfModel | None: 模型，未配置时返回 None（在输入文档上拟合 TF-IDF）
+    """
+    global _default_model, _default_loaded
+    if not _default_loaded:
+        path = os.environ.get('PAPER_CHECK_IDF_MODEL')
+        _default_model = load_idf_model(path) if path else None
+        _default_loaded = True
+    return _default_model
+
+
+def set_idf_model(model):
+    """
+    替换默认的 IDF 模型
+
+    Args:
+        model (IdfModel | None): 新的模型，None 表示恢复默认（环境变量指定的模型或不使用模型）
+    """
+    global _default_model, _default_loaded
+    _default_model = model
+    _default_loaded = model is not None
+
+
+def _iter_corpus(paths):
+    """逐篇读取语料，避免整个语料同时驻留内存；无法解码的文件跳过"""
+    from file_handler import FileHandler
+
+    file_handler = FileHandler()
+    for path in paths:
+        try:
+            yield file_handler.read_file(path)
+        except UnicodeDecodeError:
+            print(f"跳过无法解码的文件: {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='拟合并保存 IDF 模型')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    fit_parser = subparsers.add_parser('fit', help='在参考语料上拟合模型')
+    fit_parser.add_argument('output', help='模型输出文件路径')
+    fit_parser.add_argument('corpus', nargs='+', help='参考语料所在目录或通配符')
+    fit_parser.add_argument('--min-df', type=int, default=2, help='特征至少出现的文档数，默认 2')
+    fit_parser.add_argument('--max-features', type=int, default=None, help='保留的最大特征数')
+    info_parser = subparsers.add_parser('info', help='显示模型信息')
+    info_parser.add_argument('model', help='模型文件路径')
+    args = parser.parse_args(argv)
+
+    if args.command == 'info':
+        model = IdfModel.load(args.model)
+        print(f"文档数: {model.document_count}，特征数: {len(model)}，文件大小: {os.path.getsize(args.model)} 字节")
+        return
+
+    from file_handler import FileHandler
+
+    file_handler = FileHandler()
+    paths = []
+    for pattern in args.corpus:
+        paths.extend(file_handler.collect_files(pattern))
+    model = IdfModel.fit(_iter_corpus(paths), min_df=args.min_df, max_features=args.max_features)
+    model.save(args.output)
+    print(f"已在 {model.document_count} 篇文档上拟合 {len(model)} 个特征，模型已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
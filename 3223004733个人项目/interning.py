@@ -0,0 +1,145 @@
+"""
+词语驻留模块
+
+把词语映射为整数 id，文档表示为紧凑的 array('I')；相邻词语的 bigram 打包为 64 位整数
+（高 32 位为前一个词的 id，低 32 位为后一个词的 id），排序去重后存为 array('Q')。
+与字符串 bigram 集合相比，每个 bigram 只占 8 字节，集合运算也不再需要逐个比较字符串。
+
+默认词表是进程级的：同一进程内的 id 保持一致，但不同进程、不同运行之间的 id 不同，
+因此 id 不能持久化（需要跨进程稳定的特征请使用字符串 bigram，如 LSH 索引）。
+词表大小只与出现过的不同词语数有关，不随文档数量增长，但只增不减；
+常驻服务中 main.run 每条命令开始时调用 set_vocabulary(None) 换用新的空词表。
+每个 Document 记住创建时的词表，之前创建的文档仍按各自的词表比较，旧词表随最后一篇使用它的文档释放。
+
+集合运算在元素较多时用 numpy 对有序数组做向量化查找，元素较少时直接使用 Python 集合，
+短文本的比较不必导入 numpy。
+"""
+
+from array import array
+
+# 元素数达到该值时使用 numpy 计算（低于该值时 numpy 的调用开销超过收益）
+NUMPY_MIN_SIZE = 512
+
+_vocabulary = None
+
+
+class Vocabulary:
+    """词语到整数 id 的映射"""
+
+    def __init__(self):
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def intern(self, tokens):
+        """
+        将词语序列转换为 id 数组，新词语分配新的 id
+
+        Args:
+            tokens (Iterable[str]): 词语序列
+
+        Returns:
+            array: 类型为 'I' 的 id 数组
+        """
+        ids = self._ids
+        tokens = tokens if isinstance(tokens, list) else list(tokens)
+        # 查找交给 map 在 C 层完成；词表预热后通常没有新词语，不必先求差集
+        try:
+            return array('I', map(ids.__getitem__, tokens))
+        except KeyError:
+            pass
+        for token in set(tokens).difference(ids):
+            ids[token] = len(ids)
+        return array('I', map(ids.__getitem__, tokens))
+
+
+def get_vocabulary():
+    """获取进程级的默认词表"""
+    global _vocabulary
+    if _vocabulary is None:
+        _vocabulary = Vocabulary()
+    return _vocabulary
+
+
+def set_vocabulary(vocabulary):
+    """
+    替换进程级的默认词表（之后创建的 Document 使用新词表）
+
+    Args:
+        vocabulary (Vocabulary | None): 新的词表，None 表示下次使用时新建空词表
+    """
+    global _vocabulary
+    _vocabulary = vocabulary
+
+
+def pack_bigrams(ids):
+    """
+    将相邻 id 打包为 64 位整数，排序去重
+
+    Args:
+        ids (array): 类型为 'I' 的 id 数组
+
+    Returns:
+        array: 类型为 'Q' 的有序、无重复 bigram 数组
+    """
+    if len(ids) < 2:
+        return array('Q')
+    if len(ids) < NUMPY_MIN_SIZE:
+        return array('Q', sorted({(first << 32) | second for first, second in zip(ids, ids[1:])}))
+
+    import numpy as np
+
+    values = np.frombuffer(ids, dtype=np.uint32).astype(np.uint64)
+    packed = np.sort((values[:-1] << np.uint64(32)) | values[1:])
+    # 有序数组去重：保留与前一个元素不同的元素（比 np.unique 快得多）
+    keep = np.empty(len(packed), dtype=bool)
+    keep[0] = True
+    np.not_equal(packed[1:], packed[:-1], out=keep[1:])
+    return array('Q', packed[keep].tobytes())
+
+
+def intersection_size(sorted1, sorted2):
+    """
+    计算两个有序、无重复数组的交集大小
+
+    Args:
+        sorted1 (array): 有序、无重复的数组
+        sorted2 (array): 有序、无重复的数组
+
+    Returns:
+        int: 交集元素个数
+    """
+    if len(sorted1) > len(sorted2):
+        sorted1, sorted2 = sorted2, sorted1
+    if not sorted1:
+        return 0
+    if len(sorted2) < NUMPY_MIN_SIZE:
+        return len(set(sorted1).intersection(sorted2))
+
+    import numpy as np
+
+    small = np.frombuffer(sorted1, dtype=np.uint64)
+    large = np.frombuffer(sorted2, dtype=np.uint64)
+    # 在较大的数组中二分查找较小数组的每个元素
+    positions = np.searchsorted(large, small)
+    positions[positions == len(large)] = 0
+    return int(np.count_nonzero(large[positions] == small))
+
+
+def jaccard(sorted1, sorted2):
+    """
+    两个有序、无重复数组的 Jaccard 相似度
+
+    Args:
+        sorted1 (array): 有序、无重复的数组
+        sorted2 (array): 有序、无重复的数组
+
+    Returns:
+        float: 交集大小除以并集大小，两者都为空时为 1.0
+    """
+    if not sorted1 and not sorted2:
+        return 1.0
+    intersection = intersection_size(sorted1, sorted2)
+    union = len(sorted1) + len(sorted2) - intersection
+    return intersection / union if union > 0 else 0.0
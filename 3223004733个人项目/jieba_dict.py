@@ -0,0 +1,165 @@
+"""
+jieba 词典缓存模块
+
+jieba 首次分词前要构建约 50 万条的前缀词典。它自带的缓存（临时目录下的 jieba.cache）
+用 marshal.load 从文件对象分段读取，加载要 1 秒以上，且缓存不随 jieba 版本失效。
+该模块把前缀词典预编译为带版本的缓存文件：文件名由格式版本、marshal 版本、jieba 版本以及词典文件的大小和修改时间共同决定，
+加载时一次性读入内存再用 marshal.loads 解析，然后直接装入 jieba 的默认分词器。
+
+jieba 本身的导入也要约 0.2 秒，因此该模块只在真正需要分词时才导入 jieba。
+
+用法:
+    python jieba_dict.py build    # 预先生成缓存（首次分词时也会自动生成）
+"""
+
+import argparse
+import functools
+import hashlib
+import importlib.util
+import marshal
+import os
+import tempfile
+
+from token_cache import cache_root
+
+# 缓存格式版本，格式变化时递增使旧缓存失效
+DICT_CACHE_FORMAT_VERSION = 1
+
+
+@functools.lru_cache(maxsize=None)
+def jieba_version():
+    """不导入 jieba 获取其版本号（读取包元数据约需 0.5 毫秒，进程内只读取一次）"""
+    from importlib import metadata
+
+    try:
+        return metadata.version('jieba')
+    except metadata.PackageNotFoundError:
+        import jieba
+        return jieba.__version__
+
+
+def default_dictionary_path():
+    """不导入 jieba 获取其默认词典文件路径"""
+    spec = importlib.util.find_spec('jieba')
+    return os.path.join(os.path.dirname(spec.origin), 'dict.txt')
+
+
+def default_dict_cache_dir():
+    """默认词典缓存目录"""
+    return os.path.join(cache_root(), 'jieba')
+
+
+def cache_path(cache_dir=None):
+    """
+    当前 jieba 版本和默认词典对应的缓存文件路径
+
+    Args:
+        cache_dir (str | None): 缓存目录，默认使用 default_dict_cache_dir()
+
+    Returns:
+        str: 缓存文件路径
+    """
+    stat = os.stat(default_dictionary_path())
+    version = f"{DICT_CACHE_FORMAT_VERSION}\0{marshal.version}\0{jieba_version()}\0{stat.st_size}\0{stat.st_mtime_ns}"
+    digest = hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir or default_dict_cache_dir(), f"prefix-{digest}.marshal")
+
+
+def _build_prefix_dict(tokenizer):
+    """用 jieba 自身的算法从词典文件构建前缀词典"""
+    return tokenizer.gen_pfdict(tokenizer.get_dict_file())
+
+
+def _write_cache(path, data):
+    """先写临时文件再原子替换，写入失败时忽略（下次启动重新构建）"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        pass
+
+
+def build_cache(cache_dir=None):
+    """
+    构建默认词典的缓存文件
+
+    Args:
+        cache_dir (str | None): 缓存目录
+
+    Returns:
+        str: 缓存文件路径
+    """
+    import jieba
+
+    path = cache_path(cache_dir)
+    freq, total = _build_prefix_dict(jieba.Tokenizer())
+    _write_cache(path, marshal.dumps((freq, total)))
+    return path
+
+
+def _load_prefix_dict(tokenizer, cache_dir=None):
+    """读取缓存的前缀词典，缓存不存在或已损坏时重新构建并写回"""
+    path = cache_path(cache_dir)
+    try:
+        with open(path, 'rb') as file:
+            # 一次性读入再解析，比 marshal.load 逐段读取文件快数倍
+            freq, total = marshal.loads(file.read())
+        return freq, total
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    freq, total = _build_prefix_dict(tokenizer)
+    _write_cache(path, marshal.dumps((freq, total)))
+    return freq, total
+
+
+def get_tokenizer(cache_dir=None):
+    """
+    返回词典已加载的 jieba 默认分词器
+
+    使用默认词典时从本模块的缓存加载；通过 jieba.set_dictionary 指定了自定义词典时交给 jieba 自行初始化。
+
+    Args:
+        cache_dir (str | None): 缓存目录
+
+    Returns:
+        jieba.Tokenizer: jieba 默认分词器（jieba.dt）
+    """
+    import jieba
+
+    tokenizer = jieba.dt
+    if tokenizer.initialized:
+        return tokenizer
+    if tokenizer.dictionary != jieba.DEFAULT_DICT:
+        tokenizer.initialize()
+        return tokenizer
+
+    freq, total = _load_prefix_dict(tokenizer, cache_dir)
+    with tokenizer.lock:
+        if not tokenizer.initialized:
+            tokenizer.FREQ, tokenizer.total = freq, total
+            tokenizer.initialized = True
+    return tokenizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='jieba 词典缓存工具')
+    parser.add_argument('command', choices=['build', 'path'], help='build：生成缓存；path：输出缓存文件路径')
+    parser.add_argument('--cache-dir', default=None, help='缓存目录，默认为 PAPER_CHECK_CACHE_DIR/jieba')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(f"词典缓存已生成: {build_cache(args.cache_dir)}")
+    else:
+        print(cache_path(args.cache_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+MinHash + LSH 候选索引模块
+
+该模块在 Document 的词语 bigram 集合（与 Jaccard 相似度相同的特征）上计算 MinHash 签名，
+按 band 划分写入 LSH 哈希表，用于在大规模论文库中快速找出估计 Jaccard 相似度
+超过阈值的候选文档，候选文档再交给 SimilarityCalculator 精确打分。
+
+每个 band 的行值合成一个 64 位哈希；索引文件中按 band 保存排好序的哈希数组和对应的文档位置，
+加载时直接读入数组，不必逐篇重建哈希表，查询在每个 band 上二分查找，耗时与论文库规模近似无关。
+
+Jaccard 相似度为 s 的文档成为候选的概率为 1 - (1 - s^rows)^bands（S 曲线）。
+建索引时按设计阈值选择 band 划分：在召回率不低于 MIN_RECALL 的划分中取每个 band 行数最多的一种。
+128 维签名、阈值 0.3 时为 64 个 band、每个 band 2 行，s = 0.3 的召回率约 99.8%；
+若固定为 32 个 band、每个 band 4 行，S 曲线的拐点约在 0.42，s = 0.3 的召回率只有约 23%。
+查询阈值低于建索引时的设计阈值时召回率随之下降，可用 recall() 查看。
+内容为空（没有 bigram）的文档只记录标识，不写入 band 表，也不会成为任何查询的候选。
+
+用法:
+    python lsh_index.py build <论文目录或通配符> <索引文件.npz> [--threshold 0.3]
+    python lsh_index.py query <待查论文> <索引文件.npz> <结果输出文件> [--threshold 0.3]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from document import as_document
+from file_handler import FileHandler
+from similarity_calculator import SimilarityCalculator
+
+# 2^31 - 1，保证 a * x + b 在 uint64 范围内不会溢出
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+# 空文档的签名值；非空文档的签名值都小于 MERSENNE_PRIME
+MAX_HASH = np.uint64((1 << 31) - 1)
+# 默认的设计阈值（估计 Jaccard 相似度下限）
+DEFAULT_THRESHOLD = 0.3
+# 选择 band 划分时，相似度等于设计阈值的文档至少以该概率成为候选
+MIN_RECALL = 0.95
+
+
+def _hash_shingle(shingle):
+    """稳定的 32 位哈希（不受 PYTHONHASHSEED 影响）"""
+    digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def candidate_probability(similarity, bands, rows):
+    """Jaccard 相似度为 similarity 的文档至少有一个 band 完全相同（成为候选）的概率"""
+    return 1.0 - (1.0 - similarity ** rows) ** bands
+
+
+def choose_bands(num_perm, threshold=DEFAULT_THRESHOLD, min_recall=MIN_RECALL):
+    """
+    按设计阈值选择 band 数量
+
+    Args:
+        num_perm (int): MinHash 签名长度
+        threshold (float): 设计阈值
+        min_recall (float): 相似度等于 threshold 的文档成为候选的最低概率
+
+    Returns:
+        int: 整除 num_perm 的 band 数量；满足召回率的划分中每个 band 行数最多（候选最少）的一种
+    """
+    for rows in range(num_perm, 0, -1):
+        if num_perm % rows == 0 and candidate_probability(threshold, num_perm // rows, rows) >= min_recall:
+            return num_perm // rows
+    return num_perm
+
+
+class MinHashLSHIndex:
+    """基于 MinHash 签名和 band 划分的局部敏感哈希索引"""
+
+    def __init__(self, num_perm=128, bands=None, seed=1, threshold=DEFAULT_THRESHOLD):
+        """
+        Args:
+            num_perm (int): MinHash 签名长度
+            bands (int | None): band 数量，必须整除 num_perm；默认按 threshold 由 choose_bands 选择
+            seed (int): 生成哈希置换参数的随机种子
+            threshold (float): 设计阈值，查询阈值不低于它时召回率不低于 MIN_RECALL
+        """
+        if bands is None:
+            bands = choose_bands(num_perm, threshold)
+        if num_perm % bands != 0:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.seed = seed
+        self.threshold = threshold
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        # 把一个 band 的行值合成 64 位哈希的乘数（奇数，按 2^64 取模）
+        self._band_weights = rng.randint(1, 1 << 62, size=self.rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+        self.keys = []
+        # 加载的签名矩阵及每个 band 排好序的哈希和文档位置；加载之后新加入的文档放在 _signatures 和 _tables 中
+        self._matrix = np.empty((0, num_perm), dtype=np.uint64)
+        self._sorted_hashes = np.empty((bands, 0), dtype=np.uint64)
+        self._sorted_positions = np.empty((bands, 0), dtype=np.uint32)
+        self._signatures = []
+        self._tables = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def recall(self, similarity):
+        """
+        Jaccard 相似度为 similarity 的文档成为候选的概率
+
+        Args:
+            similarity (float): Jaccard 相似度
+
+        Returns:
+            float: 概率
+        """
+        return candidate_probability(similarity, self.bands, self.rows)
+
+    def signature(self, document):
+        """
+        计算文档的 MinHash 签名
+
+        Args:
+            document (str | Document | Iterable[str]): 文本、文档对象或 shingle 集合
+
+        Returns:
+            numpy.ndarray: 长度为 num_perm 的 uint64 签名
+        """
+        if isinstance(document, (set, frozenset, list, tuple)):
+            shingles = document
+        else:
+            shingles = as_document(document).bigrams
+
+        if not shingles:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+
+        hashes = np.fromiter((_hash_shingle(s) for s in shingles), dtype=np.uint64, count=len(shingles))
+        hashes %= MERSENNE_PRIME
+        # (a * x + b) mod p 对每个置换取最小值，分块计算以限制长文档的内存占用
+        result = np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(hashes), 4096):
+            permuted = (np.outer(hashes[start:start + 4096], self._a) + self._b) % MERSENNE_PRIME
+            np.minimum(result, permuted.min(axis=0), out=result)
+        return result
+
+    def _band_hashes(self, signatures):
+        """
+        签名矩阵每个 band 的 64 位哈希
+
+        Args:
+            signatures (numpy.ndarray): 形状为 (n, num_perm) 的签名矩阵
+
+        Returns:
+            numpy.ndarray: 形状为 (n, bands) 的 uint64 数组
+        """
+        bands = signatures.reshape(len(signatures), self.bands, self.rows)
+        # uint64 乘法和求和按 2^64 取模回绕
+        return (bands * self._band_weights).sum(axis=2, dtype=np.uint64)
+
+    @property
+    def signatures(self):
+        """全部文档的签名矩阵，形状为 (文档数, num_perm)"""
+        if self._signatures:
+            return np.vstack([self._matrix, np.array(self._signatures, dtype=np.uint64)])
+        return self._matrix
+
+    def add(self, key, document):
+        """
+        将文档加入索引
+
+        Args:
+            key (str): 文档标识（通常为文件路径）
+            document (str | Document | Iterable[str]): 文档内容
+
+        Returns:
+            bool: 是否写入了 band 表（内容为空的文档只记录标识）
+        """
+        signature = self.signature(document)
+        position = len(self.keys)
+        self.keys.append(key)
+        self._signatures.append(signature)
+        if signature[0] == MAX_HASH:
+            return False
+        for table, band_hash in zip(self._tables, self._band_hashes(signature[np.newaxis])[0].tolist()):
+            table.setdefault(band_hash, []).append(position)
+        return True
+
+    def query(self, document, threshold=DEFAULT_THRESHOLD):
+        """
+        查询估计 Jaccard 相似度不低于阈值的候选文档
+
+        只检查与查询文档至少有一个 band 完全相同的文档，每个 band 上二分查找，查询耗时与索引规模近似无关。
+        相似度为 s 的文档被找到的概率为 recall(s)；threshold 低于建索引时的设计阈值时部分文档会被漏掉。
+
+        Args:
+            document (str | Document | Iterable[str]): 待查文档
+            threshold (float): 估计 Jaccard 相似度下限
+
+        Returns:
+            list[tuple[str, float]]: (文档标识, 估计 Jaccard 相似度)，按相似度降序排列；待查文档为空时为空列表
+        """
+        signature = self.signature(document)
+        if signature[0] == MAX_HASH:
+            return []
+        band_hashes = self._band_hashes(signature[np.newaxis])[0]
+        positions = set()
+        for band, band_hash in enumerate(band_hashes):
+            hashes = self._sorted_hashes[band]
+            start = np.searchsorted(hashes, band_hash, side='left')
+            end = np.searchsorted(hashes, band_hash, side='right')
+            positions.update(self._sorted_positions[band][start:end].tolist())
+            positions.update(self._tables[band].get(int(band_hash), ()))
+        if not positions:
+            return []
+
+        positions = sorted(positions)
+        loaded = len(self._matrix)
+        candidates = np.array([
+            self._matrix[position] if position < loaded else self._signatures[position - loaded]
+            for position in positions
+        ], dtype=np.uint64)
+        estimates = (candidates == signature).mean(axis=1)
+        results = [
+            (self.keys[position], float(estimate))
+            for position, estimate in zip(positions, estimates)
+            if estimate >= threshold
+        ]
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
+
+    def save(self, file_path):
+        """
+        将索引保存到磁盘（签名矩阵、参数和每个 band 排好序的哈希表）
+
+        Args:
+            file_path (str): 索引文件路径（.npz）
+        """
+        signatures = self.signatures
+        nonempty = np.flatnonzero(signatures[:, 0] != MAX_HASH).astype(np.uint32)
+        band_hashes = self._band_hashes(signatures[nonempty]).T
+        order = np.argsort(band_hashes, axis=1, kind='stable')
+        meta = {
+            'num_perm': self.num_perm, 'bands': self.bands, 'seed': self.seed, 'threshold': self.threshold,
+            'keys': self.keys,
+        }
+        with open(file_path, 'wb') as file:
+            np.savez_compressed(
+                file,
+                signatures=signatures,
+                band_hashes=np.take_along_axis(band_hashes, order, axis=1),
+                band_positions=nonempty[order],
+                meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            )
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        从磁盘加载索引（直接读入保存的 band 哈希表，不逐篇重建）
+
+        Args:
+            file_path (str): 索引文件路径
+
+        Returns:
+            MinHashLSHIndex: 索引对象
+        """
+        with np.load(file_path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            signatures = data['signatures']
+            sorted_hashes = data['band_hashes'] if 'band_hashes' in data else None
+            sorted_positions = data['band_positions'] if 'band_positions' in data else None
+        # 旧格式的索引没有设计阈值，取 S 曲线的拐点
+        threshold = meta.get('threshold', (1.0 / meta['bands']) ** (meta['bands'] / meta['num_perm']))
+        index = cls(num_perm=meta['num_perm'], bands=meta['bands'], seed=meta['seed'], threshold=threshold)
+        index.keys = list(meta['keys'])
+        index._matrix = signatures.reshape(len(index.keys), index.num_perm)
+        if sorted_hashes is None:
+            # 旧格式的索引只保存了签名，向量化地计算一次 band 哈希
+            nonempty = np.flatnonzero(index._matrix[:, 0] != MAX_HASH).astype(np.uint32)
+            band_hashes = index._band_hashes(index._matrix[nonempty]).T
+            order = np.argsort(band_hashes, axis=1, kind='stable')
+            sorted_hashes = np.take_along_axis(band_hashes, order, axis=1)
+            sorted_positions = nonempty[order]
+        index._sorted_hashes = sorted_hashes
+        index._sorted_positions = sorted_positions
+        return index
+
+
+def build_index(corpus_pattern, index_path, num_perm=128, bands=None, threshold=DEFAULT_THRESHOLD):
+    """
+    为论文库建立索引，索引文件已存在时只追加新文件
+
+    Args:
+        corpus_pattern (str): 论文所在目录或通配符
+        index_path (str): 索引文件路径
+        num_perm (int): MinHash 签名长度（仅新建索引时使用）
+        bands (int | None): band 数量，默认按 threshold 选择（仅新建索引时使用）
+        threshold (float): 设计阈值（仅新建索引时使用）
+
+    Returns:
+        MinHashLSHIndex: 更新后的索引
+    """
+    file_handler = FileHandler()
+    if os.path.exists(index_path):
+        index = MinHashLSHIndex.load(index_path)
+    else:
+        index = MinHashLSHIndex(num_perm=num_perm, bands=bands, threshold=threshold)
+
+    existing = set(index.keys)
+    for path in file_handler.collect_files(corpus_pattern):
+        key = os.path.abspath(path)
+        if key not in existing:
+            index.add(key, file_handler.read_file(path))
+            existing.add(key)
+
+    index.save(index_path)
+    return index
+
+
+def query_index(submission_path, index_path, output_path, threshold=DEFAULT_THRESHOLD, output_format=None):
+    """
+    用索引筛选候选论文，再对候选论文计算余弦相似度并保存排序结果
+
+    Args:
+        submission_path (str): 待查论文文件路径
+        index_path (str): 索引文件路径
+        output_path (str): 结果输出文件路径（CSV 或 JSONL）
+        threshold (float): 候选筛选的估计 Jaccard 相似度下限
+        output_format (str | None): 'csv' 或 'jsonl'，默认按扩展名判断
+
+    Returns:
+        list[dict]: 排序后的结果记录
+    """
+    file_handler = FileHandler()
+    calculator = SimilarityCalculator()
+    index = MinHashLSHIndex.load(index_path)
+
+    submission = as_document(file_handler.read_file(submission_path), calculator.stop_words)
+    submission_key = os.path.abspath(submission_path)
+    candidates = [(key, estimate) for key, estimate in index.query(submission, threshold) if key != submission_key]
+
+    candidate_docs = [as_document(file_handler.read_file(key), calculator.stop_words) for key, _ in candidates]
+    similarities = calculator.calculate_one_to_many_similarity(submission, candidate_docs)
+
+    ranked = sorted(
+        zip(candidates, similarities), key=lambda item: (-item[1], item[0][0])
+    )
+    records = [
+        {'rank': rank, 'file': key, 'estimated_jaccard': round(estimate, 4), 'similarity': similarity}
+        for rank, ((key, estimate), similarity) in enumerate(ranked, start=1)
+    ]
+    file_handler.write_records(output_path, records, output_format)
+    return records
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='论文库 MinHash/LSH 候选索引')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='建立或追加索引')
+    build_parser.add_argument('corpus', help='论文目录或通配符')
+    build_parser.add_argument('index_file', help='索引文件路径（.npz）')
+    build_parser.add_argument('--num-perm', type=int, default=128, help='MinHash 签名长度')
+    build_parser.add_argument('--bands', type=int, default=None, help='LSH band 数量，默认按 --threshold 选择')
+    build_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                              help=f'设计阈值：估计 Jaccard 相似度不低于该值的文档至少以 {MIN_RECALL:.0%} 的概率成为候选')
+
+    query_parser = subparsers.add_parser('query', help='查询候选论文并精确打分')
+    query_parser.add_argument('submission', help='待查论文文件路径')
+    query_parser.add_argument('index_file', help='索引文件路径（.npz）')
+    query_parser.add_argument('output_file', help='结果输出文件路径')
+    query_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                              help='估计 Jaccard 相似度下限，低于建索引时的设计阈值时召回率下降')
+    query_parser.add_argument('--format', choices=['csv', 'jsonl'], help='输出格式')
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'build':
+            index = build_index(args.corpus, args.index_file, args.num_perm, args.bands, args.threshold)
+            print(f"索引完成！共 {len(index)} 篇论文")
+        else:
+            records = query_index(args.submission, args.index_file, args.output_file, args.threshold, args.format)
+            print(f"查询完成！共 {len(records)} 篇候选论文，结果已保存到 {args.output_file}")
+    except FileNotFoundError as e:
+        print(f"错误：文件未找到 - {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"错误：处理过程中发生未知错误 - {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
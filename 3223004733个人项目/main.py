@@ -6,22 +6,179 @@
 """
 
 import argparse
+import os
 import sys
+from boilerplate import (
+    DEFAULT_MIN_DOCUMENTS, DEFAULT_MIN_FRACTION, DEFAULT_MIN_LENGTH, open_paragraph_store, set_paragraph_store,
+)
+from corpus_store import CorpusStore, is_corpus_store
 from file_handler import FileHandler
-from similarity_calculator import SimilarityCalculator
+from hashing import DEFAULT_N_FEATURES, TermHasher, hashed_file_similarity, set_hasher
+from idf_model import load_idf_model, set_idf_model
+from interning import set_vocabulary
+from parallel import ParallelScorer
+from profiling import Profiler, profiled, stage
+from result_cache import open_result_cache, set_result_cache
+from segments import UNITS, SegmentComparer
+from similarity_calculator import METRICS, SimilarityCalculator
 from text_processor import TextProcessor
+from tokenization import TOKENIZERS, create_tokenizer, set_default_tokenizer
 
 
 def setup_argument_parser():
     """设置和配置命令行参数解析器"""
     parser = argparse.ArgumentParser(description='论文查重系统')
-    parser.add_argument('original_file', help='原始论文文件路径')
-    parser.add_argument('comparison_file', help='待比较论文文件路径')
-    parser.add_argument('output_file', help='结果输出文件路径')
+    parser.add_argument('original_file', help='原始论文文件路径（--all-pairs 模式下为论文目录、通配符或语料库存储文件）')
+    parser.add_argument('comparison_file',
+                        help='待比较论文文件路径（--batch 模式下为目录、通配符或语料库存储文件，--all-pairs 模式下为结果输出文件路径）')
+    parser.add_argument('output_file', nargs='?', help='结果输出文件路径')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--batch', action='store_true',
+                      help='一对多模式：将原文与目录或通配符匹配的全部文件比较，输出排序结果')
+    mode.add_argument('--all-pairs', action='store_true',
+                      help='两两比较模式：比较目录或通配符匹配的全部论文之间的相似度')
+    parser.add_argument('--format', choices=['csv', 'jsonl'],
+                        help='--batch/--all-pairs 模式的输出格式，默认按输出文件扩展名判断')
+    parser.add_argument('--top-k', type=int, default=None,
+                        help='--all-pairs 模式下每篇论文保留的最相似邻居数')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='--all-pairs 模式下只输出相似度不低于该值的论文对；'
+                             '单篇比较时只判断综合相似度是否不低于该值，结论确定后提前结束计算')
+    parser.add_argument('--spans', action='store_true',
+                        help='单篇比较时在结果文件中附上 winnowing 指纹匹配出的重复片段位置')
+    parser.add_argument('--segments', choices=UNITS, default=None,
+                        help='单篇比较时按段落或句子分段比较，输出文档得分和逐段报告')
+    parser.add_argument('--segment-metric', choices=METRICS, default='edit',
+                        help='--segments 模式下段落对使用的相似度指标，默认 edit')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='--batch/--all-pairs 模式下并行分词、--segments 模式下并行计算段落对的进程数，默认单进程')
+    parser.add_argument('--idf-model', default=None,
+                        help='使用 idf_model.py fit 预先拟合的 IDF 模型计算余弦相似度（只做稀疏变换，不在输入文档上拟合）')
+    parser.add_argument('--tokenizer', choices=TOKENIZERS, default='jieba',
+                        help='分词器，默认 jieba；char2/char3 为不需要词典的汉字 n-gram 分词，'
+                             '速度快得多但得分略低，适合大批量粗筛（不支持语料库存储）')
+    parser.add_argument('--hashing', action='store_true',
+                        help='余弦相似度使用固定宽度的哈希特征，不保存词表；单篇比较时流式读取文件，内存占用与文件大小无关')
+    parser.add_argument('--hash-features', type=int, default=DEFAULT_N_FEATURES,
+                        help=f'--hashing 模式的特征空间宽度，默认 {DEFAULT_N_FEATURES}')
+    parser.add_argument('--result-cache', action='store_true',
+                        help='缓存相似度结果（内存 LRU 和 SQLite 两级），相同文档对和配置再次查重时直接返回')
+    parser.add_argument('--result-cache-path', default=None,
+                        help='--result-cache 的 SQLite 数据库路径，默认为 PAPER_CHECK_CACHE_DIR/results.sqlite')
+    parser.add_argument('--paragraph-store', default=None,
+                        help='使用 boilerplate.py build 统计的段落库，计算相似度之前删除模板段落（作业模板、题目、参考文献格式等）')
+    parser.add_argument('--boilerplate-min-documents', type=int, default=DEFAULT_MIN_DOCUMENTS,
+                        help=f'至少出现在多少篇文档中的段落视为模板段落，默认 {DEFAULT_MIN_DOCUMENTS}')
+    parser.add_argument('--boilerplate-min-fraction', type=float, default=DEFAULT_MIN_FRACTION,
+                        help=f'至少出现在段落库全部文档的多大比例中的段落视为模板段落，默认 {DEFAULT_MIN_FRACTION}')
+    parser.add_argument('--boilerplate-min-length', type=int, default=DEFAULT_MIN_LENGTH,
+                        help=f'去除标点和空白后短于该字符数的段落不视为模板段落，默认 {DEFAULT_MIN_LENGTH}')
+    parser.add_argument('--profile', metavar='OUT_JSON', default=None,
+                        help='将各阶段的耗时、CPU 时间、内存峰值、输入大小和计算分支写入 JSON 文件')
+    parser.add_argument('--no-memory-profile', action='store_true',
+                        help='--profile 时不统计内存峰值（tracemalloc 会使耗时成倍增加）')
     return parser
 
 
-def calculate_similarity(original_path, comparison_path, output_path):
+@profiled('load_documents')
+def load_documents(paths, workers=None):
+    """
+    读取并分词一批论文
+    
+    Args:
+        paths (list[str]): 论文文件路径列表
+        workers (int | None): 进程数，大于 1 时使用多进程并行分词
+    
+    Returns:
+        list[Document]: 与 paths 顺序一致的文档
+    """
+    if workers is not None and workers > 1:
+        with ParallelScorer(workers) as scorer:
+            return scorer.load_documents(paths)
+    
+    file_handler = FileHandler()
+    text_processor = TextProcessor()
+    return [text_processor.to_document(file_handler.read_file(path)) for path in paths]
+
+
+def load_corpus(pattern, workers=None, exclude=None):
+    """
+    读取一批论文：pattern 为语料库存储文件时直接取出已分词的文档，否则收集匹配的文件并分词
+    
+    Args:
+        pattern (str): 论文所在目录、通配符或 corpus_store.py 构建的存储文件
+        workers (int | None): 并行分词的进程数（从存储读取时不需要分词）
+        exclude (str | None): 要排除的论文路径（如一对多模式中的原文）
+    
+    Returns:
+        tuple[list[str], list[Document]]: (论文路径或存储中的文档名称, 对应的文档)
+    """
+    def keep(name):
+        return exclude is None or os.path.abspath(name) != os.path.abspath(exclude)
+    
+    if is_corpus_store(pattern):
+        # 文档持有存储的引用，原文和分词结果在指标需要时才从映射中还原，存储随最后一篇文档释放
+        with stage('load_corpus_store'):
+            store = CorpusStore(pattern)
+            indices = [index for index, name in enumerate(store.names) if keep(name)]
+            return [store.metadata(index)['name'] for index in indices], [store.document(index) for index in indices]
+    
+    paths = [path for path in FileHandler().collect_files(pattern) if keep(path)]
+    return paths, load_documents(paths, workers)
+
+
+def format_spans(report, original_text, comparison_text, excerpt_length=20):
+    """
+    将 winnowing 比较结果格式化为文本报告
+    
+    Args:
+        report (dict): Winnower.compare 的返回值
+        original_text (str): 原文
+        comparison_text (str): 待比较文本
+        excerpt_length (int): 每个片段摘录的最大字符数
+    
+    Returns:
+        str: 每行一个重复片段的报告
+    """
+    lines = [f"指纹重合度: {report['score']:.2%}", f"重复片段: {len(report['spans'])}"]
+    for span in report['spans']:
+        excerpt = comparison_text[span['comparison_start']:span['comparison_end']]
+        excerpt = ' '.join(excerpt.split())
+        if len(excerpt) > excerpt_length:
+            excerpt = excerpt[:excerpt_length] + '…'
+        lines.append(
+            f"原文[{span['original_start']}:{span['original_end']}] "
+            f"<-> 比较文本[{span['comparison_start']}:{span['comparison_end']}] {excerpt}"
+        )
+    return '\n'.join(lines)
+
+
+def format_segments(report, unit):
+    """
+    将分段比较结果格式化为文本报告
+    
+    Args:
+        report (dict): SegmentComparer.compare 的返回值
+        unit (str): 切分单位
+    
+    Returns:
+        str: 第一行为文档得分，之后每行一个原文段落的匹配结果
+    """
+    name = '段落' if unit == 'paragraph' else '句子'
+    lines = [f"相似度: {report['score']:.2%}（按{name}比较，计算 {report['candidate_pairs']} 对候选{name}）"]
+    for segment in report['segments']:
+        original = f"原文{name} {segment['original_index']} [{segment['original_start']}:{segment['original_end']}]"
+        if segment['comparison_index'] is None:
+            lines.append(f"{original} 未找到相似{name}")
+        else:
+            lines.append(
+                f"{original} <-> 比较文本{name} {segment['comparison_index']} "
+                f"[{segment['comparison_start']}:{segment['comparison_end']}] 相似度 {segment['similarity']:.2%}"
+            )
+    return '\n'.join(lines)
+
+
+def calculate_similarity(original_path, comparison_path, output_path, report_spans=False):
     """
     计算两篇论文的相似度并保存结果
     
@@ -29,6 +186,7 @@ def calculate_similarity(original_path, comparison_path, output_path):
         original_path (str): 原始论文文件路径
         comparison_path (str): 待比较论文文件路径
         output_path (str): 结果输出文件路径
+        report_spans (bool): 是否在结果文件中附上重复片段位置
     
     Returns:
         float: 相似度百分比
@@ -36,27 +194,229 @@ def calculate_similarity(original_path, comparison_path, output_path):
     try:
         # 读取文件内容
         file_handler = FileHandler()
-        original_text = file_handler.read_file(original_path)
-        comparison_text = file_handler.read_file(comparison_path)
+        with stage('read_file') as record:
+            original_text = file_handler.read_file(original_path)
+            comparison_text = file_handler.read_file(comparison_path)
+            if record is not None:
+                record['input_bytes'] = [os.path.getsize(original_path), os.path.getsize(comparison_path)]
+                record['input_sizes'] = [len(original_text), len(comparison_text)]
         
-        # 文本处理
+        # 文本处理：每篇文档只分词一次，各项指标共享分词结果
         text_processor = TextProcessor()
-        processed_original = text_processor.process(original_text)
-        processed_comparison = text_processor.process(comparison_text)
+        original_doc = text_processor.to_document(original_text)
+        comparison_doc = text_processor.to_document(comparison_text)
+        with stage('segment', input_sizes=[len(original_doc), len(comparison_doc)]) as record:
+            if record is not None:
+                # 分词本是按需进行的，剖析时在此处提前完成，使耗时归入本阶段
+                record['tokens'] = [len(original_doc.tokens), len(comparison_doc.tokens)]
         
         # 计算相似度
         calculator = SimilarityCalculator()
         similarity = calculator.calculate_cosine_similarity(
-            processed_original, processed_comparison
+            original_doc, comparison_doc
         )
         
         # 保存结果
         result_text = f"相似度: {similarity:.2%}"
-        file_handler.write_file(output_path, result_text)
+        if report_spans:
+            with stage('spans', input_sizes=[len(original_text), len(comparison_text)]):
+                # winnowing 依赖 numpy，只在需要重复片段时导入
+                from winnowing import Winnower
+                report = Winnower().compare(original_text, comparison_text)
+                result_text += '\n' + format_spans(report, original_text, comparison_text)
+        with stage('write_file'):
+            file_handler.write_file(output_path, result_text)
+        
+        print(f"查重完成！相似度: {similarity:.2%}")
+        return similarity
+    
+    except FileNotFoundError as e:
+        print(f"错误：文件未找到 - {e}")
+        sys.exit(1)
+    except PermissionError as e:
+        print(f"错误：文件权限不足 - {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"错误：处理过程中发生未知错误 - {e}")
+        sys.exit(1)
+
+
+def calculate_streaming_similarity(original_path, comparison_path, output_path):
+    """
+    流式计算两篇论文的哈希特征余弦相似度并保存结果
+    
+    文件按块读取和分词，适合无法整体读入内存的超大文件；不做编辑距离修正。
+    
+    Args:
+        original_path (str): 原始论文文件路径
+        comparison_path (str): 待比较论文文件路径
+        output_path (str): 结果输出文件路径
+    
+    Returns:
+        float: 相似度
+    """
+    try:
+        with stage('hashed_cosine', input_bytes=[os.path.getsize(original_path), os.path.getsize(comparison_path)]):
+            similarity = hashed_file_similarity(original_path, comparison_path)
+        
+        # 保存结果
+        with stage('write_file'):
+            FileHandler().write_file(output_path, f"相似度: {similarity:.2%}")
         
         print(f"查重完成！相似度: {similarity:.2%}")
         return similarity
+    
+    except FileNotFoundError as e:
+        print(f"错误：文件未找到 - {e}")
+        sys.exit(1)
+    except PermissionError as e:
+        print(f"错误：文件权限不足 - {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"错误：处理过程中发生未知错误 - {e}")
+        sys.exit(1)
+
+
+def check_similarity_threshold(original_path, comparison_path, output_path, threshold):
+    """
+    判断两篇论文的综合相似度是否不低于阈值并保存结论
+    
+    按长度、字符重叠、余弦相似度、编辑距离的顺序逐级收紧上下界，结论确定时立即返回，
+    多数明显低于或高于阈值的论文对不需要计算完整的编辑距离。
+    
+    Args:
+        original_path (str): 原始论文文件路径
+        comparison_path (str): 待比较论文文件路径
+        output_path (str): 结果输出文件路径
+        threshold (float): 综合相似度阈值
+    
+    Returns:
+        dict: SimilarityCalculator.check_threshold 的判定结果
+    """
+    try:
+        # 读取文件内容
+        file_handler = FileHandler()
+        original_text = file_handler.read_file(original_path)
+        comparison_text = file_handler.read_file(comparison_path)
+        
+        # 文本处理：分词推迟到需要计算余弦相似度时
+        text_processor = TextProcessor()
+        original_doc = text_processor.to_document(original_text)
+        comparison_doc = text_processor.to_document(comparison_text)
+        
+        # 判断是否达到阈值
+        calculator = SimilarityCalculator()
+        verdict = calculator.check_threshold(original_doc, comparison_doc, threshold)
+        
+        # 保存结果
+        conclusion = "不低于" if verdict['above'] else "低于"
+        result_text = (
+            f"相似度{conclusion}阈值 {threshold:.2%}"
+            f"（判定阶段: {verdict['decided_by']}，"
+            f"综合相似度范围: {verdict['lower_bound']:.2%} ~ {verdict['upper_bound']:.2%}）"
+        )
+        file_handler.write_file(output_path, result_text)
+        
+        print(f"查重完成！{result_text}")
+        return verdict
+    
+    except FileNotFoundError as e:
+        print(f"错误：文件未找到 - {e}")
+        sys.exit(1)
+    except PermissionError as e:
+        print(f"错误：文件权限不足 - {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"错误：处理过程中发生未知错误 - {e}")
+        sys.exit(1)
+
+
+def calculate_segment_similarity(original_path, comparison_path, output_path, unit='paragraph', metric='edit',
+                                 workers=None):
+    """
+    分段比较两篇论文并保存文档得分和逐段报告
+    
+    Args:
+        original_path (str): 原始论文文件路径
+        comparison_path (str): 待比较论文文件路径
+        output_path (str): 结果输出文件路径
+        unit (str): 切分单位，'paragraph' 或 'sentence'
+        metric (str): 段落对使用的相似度指标
+        workers (int | None): 并行计算段落对的进程数
+    
+    Returns:
+        dict: SegmentComparer.compare 的返回值
+    """
+    try:
+        # 读取文件内容
+        file_handler = FileHandler()
+        original_text = file_handler.read_file(original_path)
+        comparison_text = file_handler.read_file(comparison_path)
+        
+        # 分段比较
+        comparer = SegmentComparer(unit=unit, metric=metric, workers=workers)
+        report = comparer.compare(original_text, comparison_text)
+        
+        # 保存结果
+        file_handler.write_file(output_path, format_segments(report, unit))
+        
+        print(f"查重完成！相似度: {report['score']:.2%}")
+        return report
+    
+    except FileNotFoundError as e:
+        print(f"错误：文件未找到 - {e}")
+        sys.exit(1)
+    except PermissionError as e:
+        print(f"错误：文件权限不足 - {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"错误：处理过程中发生未知错误 - {e}")
+        sys.exit(1)
+
+
+def calculate_batch_similarity(original_path, candidates_pattern, output_path, output_format=None, workers=None):
+    """
+    计算一篇原文与一批候选论文的相似度，按相似度降序保存结果
+    
+    TF-IDF 在整批文档上只拟合一次，所有候选的得分由一次稀疏矩阵-向量乘法得到。
+    
+    Args:
+        original_path (str): 原始论文文件路径
+        candidates_pattern (str): 候选论文所在目录、通配符或语料库存储文件
+        output_path (str): 结果输出文件路径（CSV 或 JSONL）
+        output_format (str | None): 'csv' 或 'jsonl'，默认按扩展名判断
+        workers (int | None): 并行分词的进程数
+    
+    Returns:
+        list[dict]: 排序后的结果记录，包含 rank、file、similarity
+    """
+    try:
+        # 读取文件内容（原文本身不参与比较）
+        file_handler = FileHandler()
+        original_text = file_handler.read_file(original_path)
+        
+        # 文本处理
+        text_processor = TextProcessor()
+        original_doc = text_processor.to_document(original_text)
+        candidate_paths, candidate_docs = load_corpus(candidates_pattern, workers, exclude=original_path)
+        
+        # 计算相似度
+        calculator = SimilarityCalculator()
+        similarities = calculator.calculate_one_to_many_similarity(original_doc, candidate_docs)
+        
+        # 按相似度降序排序，得分相同时按路径排序保证结果稳定
+        ranked = sorted(zip(candidate_paths, similarities), key=lambda item: (-item[1], item[0]))
+        records = [
+            {'rank': rank, 'file': path, 'similarity': round(similarity, 4)}
+            for rank, (path, similarity) in enumerate(ranked, start=1)
+        ]
+        
+        # 保存结果
+        file_handler.write_records(output_path, records, output_format)
         
+        print(f"查重完成！共比较 {len(records)} 篇论文，结果已保存到 {output_path}")
+        return records
+    
     except FileNotFoundError as e:
         print(f"错误：文件未找到 - {e}")
         sys.exit(1)
@@ -68,12 +428,158 @@ def calculate_similarity(original_path, comparison_path, output_path):
         sys.exit(1)
 
 
-def main():
-    """主函数，程序入口点"""
+def calculate_all_pairs_similarity(corpus_pattern, output_path, top_k=None, threshold=None, output_format=None,
+                                   workers=None):
+    """
+    计算一批论文两两之间的相似度并保存结果
+    
+    Args:
+        corpus_pattern (str): 论文所在目录、通配符或语料库存储文件
+        output_path (str): 结果输出文件路径（CSV 或 JSONL）
+        top_k (int | None): 每篇论文保留的最相似邻居数
+        threshold (float | None): 只保留相似度不低于该值的论文对
+        output_format (str | None): 'csv' 或 'jsonl'，默认按扩展名判断
+        workers (int | None): 并行分词的进程数
+    
+    Returns:
+        list[dict]: 排序后的结果记录，包含 rank、file1、file2、similarity
+    """
+    try:
+        # 读取文件内容
+        file_handler = FileHandler()
+        
+        # 文本处理
+        paths, docs = load_corpus(corpus_pattern, workers)
+        
+        # 计算相似度
+        calculator = SimilarityCalculator()
+        pairs = calculator.calculate_pairwise_similarity(docs, top_k=top_k, threshold=threshold)
+        records = [
+            {'rank': rank, 'file1': paths[i], 'file2': paths[j], 'similarity': similarity}
+            for rank, (i, j, similarity) in enumerate(pairs, start=1)
+        ]
+        
+        # 保存结果
+        file_handler.write_records(output_path, records, output_format)
+        
+        print(f"查重完成！共 {len(paths)} 篇论文，输出 {len(records)} 对结果到 {output_path}")
+        return records
+    
+    except FileNotFoundError as e:
+        print(f"错误：文件未找到 - {e}")
+        sys.exit(1)
+    except PermissionError as e:
+        print(f"错误：文件权限不足 - {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"错误：处理过程中发生未知错误 - {e}")
+        sys.exit(1)
+
+
+def check_mode_options(parser, args):
+    """
+    拒绝当前查重模式不支持的选项，不静默忽略
+    
+    Args:
+        parser (argparse.ArgumentParser): 参数解析器，用于报告参数错误
+        args (argparse.Namespace): 解析后的命令行参数
+    """
+    if args.all_pairs:
+        mode, unsupported = '--all-pairs', ['spans', 'segments']
+    elif args.batch:
+        mode, unsupported = '--batch', ['top_k', 'threshold', 'spans', 'segments']
+    elif args.segments is not None:
+        mode, unsupported = '--segments', ['top_k', 'threshold', 'spans', 'format']
+    elif args.threshold is not None:
+        mode, unsupported = '--threshold', ['top_k', 'spans', 'format', 'workers']
+    else:
+        mode, unsupported = '单篇比较', ['top_k', 'format', 'workers']
+    
+    for name in unsupported:
+        if getattr(args, name) not in (None, False):
+            parser.error(f"--{name.replace('_', '-')} 不能用于{mode}模式")
+    if args.segments is None and args.segment_metric != parser.get_default('segment_metric'):
+        parser.error('--segment-metric 只能与 --segments 一起使用')
+
+
+def run(parser, args):
+    """
+    按命令行参数执行对应的查重模式
+    
+    Args:
+        parser (argparse.ArgumentParser): 参数解析器，用于报告参数错误
+        args (argparse.Namespace): 解析后的命令行参数
+    """
+    check_mode_options(parser, args)
+    # 每次运行都重新设置，常驻服务中上一条命令指定的分词器和模型不会影响下一条，词表也不会无限增长
+    set_default_tokenizer(create_tokenizer(args.tokenizer))
+    set_vocabulary(None)
+    try:
+        set_idf_model(load_idf_model(args.idf_model) if args.idf_model else None)
+    except (OSError, ValueError) as e:
+        parser.error(f"无法加载 IDF 模型: {e}")
+    if args.hash_features < 1:
+        parser.error('--hash-features 必须为正整数')
+    set_hasher(TermHasher(args.hash_features) if args.hashing else None)
+    set_result_cache(open_result_cache(args.result_cache_path) if args.result_cache else None)
+    paragraph_store = None
+    if args.paragraph_store:
+        try:
+            paragraph_store = open_paragraph_store(
+                args.paragraph_store, args.boilerplate_min_documents, args.boilerplate_min_fraction,
+                args.boilerplate_min_length,
+            )
+        except (OSError, ValueError) as e:
+            parser.error(f"无法打开段落库: {e}")
+    set_paragraph_store(paragraph_store)
+    
+    if args.all_pairs:
+        if args.output_file is not None:
+            parser.error('--all-pairs 模式只需要论文目录和结果输出文件两个参数')
+        calculate_all_pairs_similarity(
+            args.original_file, args.comparison_file, args.top_k, args.threshold, args.format, args.workers
+        )
+        return
+    
+    if args.output_file is None:
+        parser.error('缺少结果输出文件路径')
+    if args.batch:
+        calculate_batch_similarity(
+            args.original_file, args.comparison_file, args.output_file, args.format, args.workers
+        )
+    elif args.segments is not None:
+        calculate_segment_similarity(
+            args.original_file, args.comparison_file, args.output_file, args.segments, args.segment_metric, args.workers
+        )
+    elif args.threshold is not None:
+        check_similarity_threshold(args.original_file, args.comparison_file, args.output_file, args.threshold)
+    # 流式计算不切分段落，启用段落库时读入整篇文本后再删除模板段落
+    elif args.hashing and not args.spans and paragraph_store is None:
+        calculate_streaming_similarity(args.original_file, args.comparison_file, args.output_file)
+    else:
+        calculate_similarity(args.original_file, args.comparison_file, args.output_file, args.spans)
+
+
+def main(argv=None):
+    """
+    主函数，程序入口点
+    
+    Args:
+        argv (list[str] | None): 命令行参数，默认读取 sys.argv（常驻服务转发客户端参数时传入）
+    """
     parser = setup_argument_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    if args.profile is None:
+        run(parser, args)
+        return
     
-    calculate_similarity(args.original_file, args.comparison_file, args.output_file)
+    # 出错退出时也保存已记录的阶段，便于分析失败的运行
+    with Profiler(track_memory=not args.no_memory_profile) as profiler:
+        try:
+            run(parser, args)
+        finally:
+            profiler.save(args.profile)
 
 
 if __name__ == "__main__":
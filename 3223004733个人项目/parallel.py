@@ -0,0 +1,262 @@
+"""
+多进程并行模块
+
+jieba 分词和相似度计算中的纯 Python 循环都受 GIL 限制，该模块用进程池把批量任务分摊到多个 CPU 核心。
+每个工作进程只在启动时加载一次 jieba 词典和 SimilarityCalculator；
+文件任务以路径的形式发送，由工作进程读取；内存中的文档只发送一次原文和紧凑的词长数组，
+工作进程按词长从原文中切出分词结果，避免在进程间重复传递词语字符串。
+无论进程数多少，结果顺序都与输入顺序一致。
+"""
+
+import os
+from array import array
+from collections import OrderedDict
+
+from boilerplate import get_paragraph_store, set_paragraph_store
+from document import Document
+from file_handler import FileHandler
+from hashing import get_hasher, set_hasher
+from idf_model import get_idf_model, set_idf_model
+from result_cache import get_result_cache, set_result_cache
+from similarity_calculator import METRICS, SimilarityCalculator
+from token_cache import split_by_lengths
+from tokenization import get_default_tokenizer, set_default_tokenizer
+
+# 工作进程中缓存的文档数量（同一原文与多篇论文比较时只需分词一次）
+WORKER_DOCUMENT_CACHE_SIZE = 32
+
+_file_handler = None
+_calculator = None
+_documents = OrderedDict()
+
+
+def _init_worker(idf_model=None, hasher=None, result_cache=None, tokenizer=None, paragraph_store=None):
+    """工作进程初始化：使用与主进程相同的分词器、IDF 模型、哈希特征器、结果缓存和段落库，加载 jieba 词典并创建计算器"""
+    global _file_handler, _calculator
+    set_default_tokenizer(tokenizer)
+    get_default_tokenizer().prepare()
+    set_idf_model(idf_model)
+    set_hasher(hasher)
+    set_result_cache(result_cache)
+    set_paragraph_store(paragraph_store)
+    _file_handler = FileHandler()
+    _calculator = SimilarityCalculator()
+    _documents.clear()
+
+
+def _load_document(path):
+    """在工作进程中读取并缓存文档"""
+    doc = _documents.get(path)
+    if doc is None:
+        doc = Document(_file_handler.read_file(path), _calculator.stop_words)
+        _documents[path] = doc
+        if len(_documents) > WORKER_DOCUMENT_CACHE_SIZE:
+            _documents.popitem(last=False)
+    else:
+        _documents.move_to_end(path)
+    return doc
+
+
+def _score_pair(task):
+    """工作进程任务：计算一对文件的相似度"""
+    path1, path2, metric = task
+    return _calculator.calculate_similarity(_load_document(path1), _load_document(path2), metric)
+
+
+def _token_lengths(tokens):
+    """词长数组的字节串"""
+    return array('I', (len(token) for token in tokens)).tobytes()
+
+
+def _document_payload(doc):
+    """
+    主进程：发送给工作进程的 (原文, 词长数组字节串, 分词器)
+
+    尚未分词的文档交给工作进程分词；分词结果拼接后不等于原文的分词器（如字符 n-gram）无法用词长还原，
+    本身也足够快，同样由工作进程用文档的分词器重新分词，此时词长为 None。
+    """
+    if not doc.tokenized or not doc.tokenizer.reversible:
+        return doc.text, None, doc.tokenizer
+    return doc.text, _token_lengths(doc.tokens), doc.tokenizer
+
+
+def _restore_document(text, data, stop_words, tokenizer=None):
+    """按原文和词长数组字节串重建分词结果已就绪的 Document（词长为 None 时按需分词）"""
+    if data is None:
+        return Document(text, stop_words, tokenizer=tokenizer)
+    lengths = array('I')
+    lengths.frombytes(data)
+    return Document(text, stop_words, tokens=split_by_lengths(text, lengths), tokenizer=tokenizer)
+
+
+def _score_texts(task):
+    """工作进程任务：计算一对已分词文本的相似度"""
+    text1, lengths1, tokenizer1, text2, lengths2, tokenizer2, metric = task
+    doc1 = _restore_document(text1, lengths1, _calculator.stop_words, tokenizer1)
+    doc2 = _restore_document(text2, lengths2, _calculator.stop_words, tokenizer2)
+    return _calculator.calculate_similarity(doc1, doc2, metric)
+
+
+def _segment_file(path):
+    """工作进程任务：读取文件并分词，返回原文和词长数组的字节串（主进程不再读取和检测编码）"""
+    text = _file_handler.read_file(path)
+    return text, _token_lengths(get_default_tokenizer().tokenize(text))
+
+
+class ParallelScorer:
+    """基于进程池的批量分词与相似度计算"""
+
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers (int | None): 工作进程数，默认为 CPU 核心数
+        """
+        if workers is not None and workers < 1:
+            raise ValueError("workers 必须为正整数")
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_executor(self):
+        if self._executor is None:
+            # 单进程运行时不需要进程池，按需导入
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(
+                    get_idf_model(), get_hasher(), get_result_cache(), get_default_tokenizer(), get_paragraph_store(),
+                ),
+            )
+        return self._executor
+
+    def close(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _chunksize(self, count):
+        # 每个进程分到若干批任务，兼顾负载均衡与进程间通信开销
+        return max(1, count // (self.workers * 4))
+
+    def score_pairs(self, pairs, metric='cosine'):
+        """
+        并行计算多对文件的相似度
+
+        同一原文与多篇论文比较时，应让相同的原文路径相邻，以便命中工作进程的文档缓存。
+
+        Args:
+            pairs (list[tuple[str, str]]): (原文路径, 待比较论文路径) 列表
+            metric (str): 'cosine'、'jaccard'、'edit' 或 'comprehensive'
+
+        Returns:
+            list[float]: 与 pairs 顺序一致的相似度
+        """
+        if metric not in METRICS:
+            raise ValueError(f"不支持的相似度指标: {metric}")
+        tasks = [(path1, path2, metric) for path1, path2 in pairs]
+        if not tasks:
+            return []
+        executor = self._get_executor()
+        return list(executor.map(_score_pair, tasks, chunksize=self._chunksize(len(tasks))))
+
+    def score_documents(self, pairs, metric='cosine'):
+        """
+        并行计算多对内存中文档的相似度
+
+        每篇文档只发送原文和词长数组，工作进程由此还原分词结果而不再重复分词，适合段落等较短的文本。
+
+        Args:
+            pairs (list[tuple[Document, Document]]): 文档对列表
+            metric (str): 相似度指标
+
+        Returns:
+            list[float]: 与 pairs 顺序一致的相似度
+        """
+        if metric not in METRICS:
+            raise ValueError(f"不支持的相似度指标: {metric}")
+        tasks = [(*_document_payload(doc1), *_document_payload(doc2), metric) for doc1, doc2 in pairs]
+        if not tasks:
+            return []
+        executor = self._get_executor()
+        return list(executor.map(_score_texts, tasks, chunksize=self._chunksize(len(tasks))))
+
+    def submit_pair(self, path1, path2, metric='cosine'):
+        """
+        提交一对文件的相似度计算任务
+
+        文件由工作进程读取并按路径缓存，同一原文与多篇论文比较时只读取、分词一次。
+
+        Args:
+            path1 (str): 原文路径
+            path2 (str): 待比较论文路径
+            metric (str): 相似度指标
+
+        Returns:
+            concurrent.futures.Future: 结果为相似度；文件读取失败时为对应的异常
+        """
+        if metric not in METRICS:
+            raise ValueError(f"不支持的相似度指标: {metric}")
+        return self._get_executor().submit(_score_pair, (path1, path2, metric))
+
+    def load_documents(self, paths, stop_words=None):
+        """
+        并行分词，返回分词结果已就绪的 Document
+
+        工作进程读取文件并分词，返回原文和词长数组，由主进程从原文中切出词语，每个文件只读取、解码一次。
+        分词结果拼接后不等于原文的分词器（如字符 n-gram）无法用词长数组还原，且本身足够快，直接在主进程中分词。
+
+        Args:
+            paths (list[str]): 文件路径列表
+            stop_words (set[str] | None): 停用词表
+
+        Returns:
+            list[Document]: 与 paths 顺序一致的文档
+        """
+        if not paths:
+            return []
+        if not get_default_tokenizer().reversible:
+            file_handler = FileHandler()
+            return [Document(file_handler.read_file(path), stop_words) for path in paths]
+        executor = self._get_executor()
+        results = executor.map(_segment_file, paths, chunksize=self._chunksize(len(paths)))
+
+        return [_restore_document(text, data, stop_words) for text, data in results]
+
+
+def score_pairs(pairs, metric='cosine', workers=None):
+    """
+    并行计算多对文件相似度的函数接口
+
+    Args:
+        pairs (list[tuple[str, str]]): (原文路径, 待比较论文路径) 列表
+        metric (str): 相似度指标
+        workers (int | None): 工作进程数
+
+    Returns:
+        list[float]: 与 pairs 顺序一致的相似度
+    """
+    with ParallelScorer(workers) as scorer:
+        return scorer.score_pairs(pairs, metric)
+
+
+def load_documents(paths, workers=None, stop_words=None):
+    """
+    并行分词的函数接口
+
+    Args:
+        paths (list[str]): 文件路径列表
+        workers (int | None): 工作进程数
+        stop_words (set[str] | None): 停用词表
+
+    Returns:
+        list[Document]: 与 paths 顺序一致的文档
+    """
+    with ParallelScorer(workers) as scorer:
+        return scorer.load_documents(paths, stop_words)
@@ -0,0 +1,204 @@
+"""
+性能剖析模块
+
+为查重流程的各个阶段记录墙钟时间、CPU 时间、内存峰值和输入大小，以及实际走了哪条计算分支
+（余弦相似度、Jaccard 备用方法、高相似度时的编辑距离修正等），用于定位慢查询的瓶颈。
+
+未启用时每个阶段只多一次全局变量判断，开销可以忽略。启用方式：
+    with Profiler() as profiler:          # 收集全部阶段记录，可保存为 JSON
+        ...
+    add_hook(callback)                    # 每个阶段结束时以记录字典调用 callback
+
+内存峰值通过 tracemalloc 统计，只在 Profiler(track_memory=True) 时开启（会使运行变慢）；
+嵌套阶段各自的峰值互不干扰。阶段栈是进程级状态，不支持多线程同时剖析。
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+from collections.abc import Sized
+
+_profiler = None
+_hooks = []
+_stack = []
+
+
+def _enabled():
+    return _profiler is not None or bool(_hooks)
+
+
+def add_hook(callback):
+    """
+    注册阶段结束回调
+
+    Args:
+        callback (Callable[[dict], None]): 以阶段记录字典为参数的回调
+    """
+    _hooks.append(callback)
+
+
+def remove_hook(callback):
+    """注销阶段结束回调"""
+    _hooks.remove(callback)
+
+
+def note(key, value):
+    """在当前最内层阶段的记录中写入一项信息（如计算分支），未启用或不在任何阶段内时忽略"""
+    if _stack:
+        _stack[-1].record[key] = value
+
+
+class _Frame:
+    """一个正在进行的阶段"""
+
+    __slots__ = ('record', 'wall_start', 'cpu_start', 'memory_start', 'peak_seen')
+
+    def __init__(self, record):
+        self.record = record
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.memory_start = None
+        self.peak_seen = 0
+
+
+class _Stage:
+    """阶段上下文管理器"""
+
+    __slots__ = ('name', 'info', 'frame')
+
+    def __init__(self, name, info):
+        self.name = name
+        self.info = info
+        self.frame = None
+
+    def __enter__(self):
+        record = {'name': self.name, 'depth': len(_stack)}
+        record.update(self.info)
+        frame = _Frame(record)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # 外层阶段先吸收当前峰值，再重置峰值以便单独统计本阶段
+            for outer in _stack:
+                outer.peak_seen = max(outer.peak_seen, peak)
+            tracemalloc.reset_peak()
+            frame.memory_start = current
+            frame.peak_seen = current
+        if _profiler is not None:
+            _profiler.records.append(record)
+        _stack.append(frame)
+        self.frame = frame
+        return record
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        frame = self.frame
+        _stack.pop()
+        record = frame.record
+        record['wall_seconds'] = time.perf_counter() - frame.wall_start
+        record['cpu_seconds'] = time.process_time() - frame.cpu_start
+        if frame.memory_start is not None and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            frame.peak_seen = max(frame.peak_seen, peak)
+            for outer in _stack:
+                outer.peak_seen = max(outer.peak_seen, peak)
+            record['peak_memory_bytes'] = frame.peak_seen - frame.memory_start
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        for callback in list(_hooks):
+            callback(record)
+        return False
+
+
+class _NullStage:
+    """未启用剖析时使用的空上下文管理器"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name, **info):
+    """
+    记录一个阶段
+
+    Args:
+        name (str): 阶段名
+        **info: 写入记录的附加信息，如输入大小
+
+    Returns:
+        上下文管理器，进入时返回阶段记录字典（未启用时为 None）
+    """
+    if not _enabled():
+        return _NULL_STAGE
+    return _Stage(name, info)
+
+
+def profiled(name):
+    """
+    将函数或方法的每次调用记录为一个阶段，输入大小为各位置参数的长度（文本和 Document 为字符数）
+
+    Args:
+        name (str): 阶段名
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled():
+                return func(*args, **kwargs)
+            sizes = [len(arg) for arg in args if isinstance(arg, Sized) and not isinstance(arg, dict)]
+            with _Stage(name, {'input_sizes': sizes}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Profiler:
+    """收集全部阶段记录的剖析器，同一时间只能启用一个"""
+
+    def __init__(self, track_memory=True):
+        """
+        Args:
+            track_memory (bool): 是否用 tracemalloc 统计内存峰值
+        """
+        self.track_memory = track_memory
+        self.records = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        global _profiler
+        if _profiler is not None:
+            raise RuntimeError("已有剖析器正在运行")
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _profiler
+        _profiler = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def to_dict(self):
+        """返回可序列化为 JSON 的剖析结果"""
+        return {'stages': self.records}
+
+    def save(self, path):
+        """
+        将剖析结果保存为 JSON 文件
+
+        Args:
+            path (str): 输出文件路径
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
@@ -0,0 +1,242 @@
+"""
+相似度结果缓存模块
+
+重复提交和重新运行时，相同的文档对会被反复计算。该模块按
+“两篇文本的内容摘要 + 指标名 + 评分配置指纹”缓存相似度结果，分为两级：
+    内存  进程内的 LRU，命中时只需计算文本摘要和一次字典查找（常驻服务中重复请求约数十微秒）
+    磁盘  SQLite 数据库，跨进程、跨运行共享，命中后提升到内存层
+
+评分配置指纹由 SimilarityCalculator.config_fingerprint 给出，涵盖分词配置、停用词、n-gram 范围、
+加权系数、结构相似度以及 IDF 模型或哈希特征器。配置变化后键随之变化，旧结果不会再被命中，
+按最久未使用的顺序逐渐淘汰。
+
+默认不启用：命令行使用 --result-cache，或设置环境变量 PAPER_CHECK_RESULT_CACHE=1。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from token_cache import cache_root
+
+# 缓存格式版本，格式或结果的含义变化时递增使旧缓存失效
+RESULT_FORMAT_VERSION = 1
+# 内存层保留的结果数
+DEFAULT_MEMORY_SIZE = 4096
+# 磁盘层保留的结果数上限，超出后删除最久未使用的结果
+DEFAULT_MAX_ROWS = 1_000_000
+# 每写入多少条结果检查一次磁盘层大小
+_EVICT_CHECK_INTERVAL = 1024
+
+_default_cache = None
+_default_loaded = False
+_opened_caches = {}
+
+
+def default_result_cache_path():
+    """默认的结果缓存数据库路径"""
+    return os.path.join(cache_root(), 'results.sqlite')
+
+
+class ResultCache:
+    """内存 LRU 与 SQLite 两级相似度结果缓存"""
+
+    def __init__(self, path=None, memory_size=DEFAULT_MEMORY_SIZE, max_rows=DEFAULT_MAX_ROWS):
+        """
+        Args:
+            path (str | None): SQLite 数据库路径，默认使用 default_result_cache_path()；
+                               为 ':memory:' 时只使用内存层
+            memory_size (int): 内存层保留的结果数
+            max_rows (int): 磁盘层保留的结果数上限
+        """
+        self.path = path or default_result_cache_path()
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._disk_failed = self.path == ':memory:'
+        self._puts = 0
+
+    def __reduce__(self):
+        # 传给工作进程时只传递路径和参数，工作进程打开自己的数据库连接
+        return type(self), (self.path, self.memory_size, self.max_rows)
+
+    def __repr__(self):
+        return f"ResultCache(path={self.path!r})"
+
+    @staticmethod
+    def key(digest1, digest2, metric, config):
+        """
+        计算缓存键
+
+        Args:
+            digest1 (str): 第一篇文本的内容摘要
+            digest2 (str): 第二篇文本的内容摘要
+            metric (str): 指标名（含影响结果的参数，如阈值）
+            config (str): 评分配置指纹
+
+        Returns:
+            str: 十六进制的 SHA-256
+        """
+        text = f"{RESULT_FORMAT_VERSION}\0{config}\0{metric}\0{digest1}\0{digest2}"
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        """打开数据库，失败时退化为只使用内存层"""
+        if self._connection is None and not self._disk_failed:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS results '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)'
+                )
+                connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+                self._connection = connection
+            except (OSError, sqlite3.Error):
+                self._disk_failed = True
+        return self._connection
+
+    def _remember(self, key, value):
+        memory = self._memory
+        memory[key] = value
+        memory.move_to_end(key)
+        if len(memory) > self.memory_size:
+            memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        读取缓存的结果
+
+        Args:
+            key (str): 缓存键
+
+        Returns:
+            float | dict | None: 结果，未命中时返回 None
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return json.loads(value)
+
+            connection = self._connect()
+            if connection is None:
+                return None
+            try:
+                row = connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                connection.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+            except sqlite3.Error:
+                return None
+            self._remember(key, row[0])
+            return json.loads(row[0])
+
+    def put(self, key, value):
+        """
+        写入结果
+
+        Args:
+            key (str): 缓存键
+            value (float | dict): 可以序列化为 JSON 的结果
+        """
+        data = json.dumps(value)
+        with self._lock:
+            self._remember(key, data)
+            connection = self._connect()
+            if connection is None:
+                return
+            try:
+                connection.execute(
+                    'INSERT OR REPLACE INTO results (key, value, accessed) VALUES (?, ?, ?)',
+                    (key, data, time.time()),
+                )
+                self._puts += 1
+                if self._puts % _EVICT_CHECK_INTERVAL == 0:
+                    self._evict(connection)
+            except sqlite3.Error:
+                pass
+
+    def _evict(self, connection):
+        """磁盘层超出上限时删除最久未使用的结果，保留上限的 80%"""
+        count = connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        if count > self.max_rows:
+            connection.execute(
+                'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed LIMIT ?)',
+                (count - int(self.max_rows * 0.8),),
+            )
+
+    def clear(self):
+        """清空两级缓存"""
+        with self._lock:
+            self._memory.clear()
+            connection = self._connect()
+            if connection is not None:
+                try:
+                    connection.execute('DELETE FROM results')
+                except sqlite3.Error:
+                    pass
+
+    def close(self):
+        """关闭数据库连接（内存层保留）"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def open_result_cache(path=None):
+    """
+    打开结果缓存，同一路径复用同一对象（常驻服务中每条命令重新指定缓存时内存层不会丢失）
+
+    Args:
+        path (str | None): SQLite 数据库路径，默认使用 default_result_cache_path()
+
+    Returns:
+        ResultCache: 缓存对象
+    """
+    path = os.path.abspath(path or default_result_cache_path())
+    cache = _opened_caches.get(path)
+    if cache is None:
+        cache = _opened_caches[path] = ResultCache(path)
+    return cache
+
+
+def get_result_cache():
+    """
+    获取默认的结果缓存
+
+    未通过 set_result_cache 指定时，环境变量 PAPER_CHECK_RESULT_CACHE 为 1 时使用默认路径的缓存，
+    为其他非空值时视为数据库路径。
+
+    Returns:
+        ResultCache | None: 缓存对象，未启用时返回 None
+    """
+    global _default_cache, _default_loaded
+    if not _default_loaded:
+        setting = os.environ.get('PAPER_CHECK_RESULT_CACHE', '')
+        if setting in ('', '0'):
+            _default_cache = None
+        else:
+            _default_cache = open_result_cache(None if setting == '1' else setting)
+        _default_loaded = True
+    return _default_cache
+
+
+def set_result_cache(cache):
+    """
+    替换默认的结果缓存
+
+    Args:
+        cache (ResultCache | None): 新的缓存对象，None 表示恢复默认（由环境变量决定）
+    """
+    global _default_cache, _default_loaded
+    _default_cache = cache
+    _default_loaded = cache is not None
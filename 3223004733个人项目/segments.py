@@ -0,0 +1,166 @@
+"""
+分段比较模块
+
+整篇比较会掩盖局部抄袭，且编辑距离的代价随文档长度平方增长。
+该模块把两篇文档切分为段落（或句子），用共有词语的倒排索引为每个原文段落挑选少量候选段落，
+只对候选段落对计算相似度（可多进程并行），一个大的二次复杂度任务由此变为许多相互独立的小任务。
+每个原文段落取最相似的候选作为匹配，按段落长度加权合成文档得分，并给出逐段报告。
+"""
+
+import heapq
+from collections import Counter, defaultdict
+
+from document import UNITS, Document, split_segments
+from parallel import ParallelScorer
+from similarity_calculator import METRICS, SimilarityCalculator
+
+
+class SegmentComparer:
+    """基于倒排索引候选筛选的分段比较"""
+
+    def __init__(self, unit='paragraph', metric='edit', max_candidates=3, min_shared_terms=2,
+                 max_term_ratio=0.5, workers=None):
+        """
+        Args:
+            unit (str): 切分单位，'paragraph' 或 'sentence'
+            metric (str): 段落对使用的相似度指标，默认为编辑相似度（段落较短，代价很低且能反映局部改写）
+            max_candidates (int): 每个原文段落最多比较的候选段落数
+            min_shared_terms (int): 成为候选所需的最少共有词语数（原文段落词语更少时按其词语数）
+            max_term_ratio (float): 出现在超过该比例比较段落中的高频词语不参与候选筛选
+            workers (int | None): 并行计算段落对相似度的进程数，默认单进程
+        """
+        if unit not in UNITS:
+            raise ValueError(f"不支持的切分单位: {unit}")
+        if metric not in METRICS:
+            raise ValueError(f"不支持的相似度指标: {metric}")
+        if max_candidates < 1:
+            raise ValueError("max_candidates 必须为正整数")
+        self.unit = unit
+        self.metric = metric
+        self.max_candidates = max_candidates
+        self.min_shared_terms = min_shared_terms
+        self.max_term_ratio = max_term_ratio
+        self.workers = workers
+        self.calculator = SimilarityCalculator()
+
+    def split(self, text):
+        """切分文本，返回 [(起始偏移, 结束偏移, Document)]；启用段落库时跳过模板段落中的片段"""
+        store = self.calculator.paragraph_store
+        boilerplate = store.boilerplate_spans(text) if store is not None else []
+        segments = []
+        index = 0
+        for start, end in split_segments(text, self.unit):
+            while index < len(boilerplate) and boilerplate[index][1] <= start:
+                index += 1
+            if index < len(boilerplate) and boilerplate[index][0] <= start:
+                continue
+            segments.append((start, end, Document(text[start:end], self.calculator.stop_words)))
+        return segments
+
+    def candidate_pairs(self, original_docs, comparison_docs):
+        """
+        用共有词语的倒排索引筛选候选段落对
+
+        Args:
+            original_docs (list[Document]): 原文段落
+            comparison_docs (list[Document]): 比较文本段落
+
+        Returns:
+            list[tuple[int, int]]: (原文段落序号, 比较段落序号)，每个原文段落按共有词语数从多到少
+        """
+        index = defaultdict(list)
+        for j, doc in enumerate(comparison_docs):
+            for term in set(doc.terms):
+                index[term].append(j)
+
+        # 段落较少时不剔除高频词，否则少数段落的文档几乎找不到候选
+        if len(comparison_docs) >= 10:
+            max_postings = max(1, int(len(comparison_docs) * self.max_term_ratio))
+        else:
+            max_postings = len(comparison_docs)
+
+        pairs = []
+        for i, doc in enumerate(original_docs):
+            terms = set(doc.terms)
+            shared = Counter()
+            for term in terms:
+                postings = index.get(term)
+                if postings and len(postings) <= max_postings:
+                    shared.update(postings)
+            required = max(1, min(self.min_shared_terms, len(terms)))
+            # 共有词语数相同时按段落序号，保证结果稳定
+            best = heapq.nsmallest(self.max_candidates, shared.items(), key=lambda item: (-item[1], item[0]))
+            pairs.extend((i, j) for j, count in best if count >= required)
+        return pairs
+
+    def _score(self, doc_pairs):
+        if self.workers and self.workers > 1 and len(doc_pairs) > 1:
+            with ParallelScorer(self.workers) as scorer:
+                return scorer.score_documents(doc_pairs, self.metric)
+        return [self.calculator.calculate_similarity(doc1, doc2, self.metric) for doc1, doc2 in doc_pairs]
+
+    def compare(self, original, comparison):
+        """
+        分段比较两篇文本
+
+        Args:
+            original (str): 原文
+            comparison (str): 待比较文本
+
+        Returns:
+            dict: score 为按原文段落长度加权的文档得分；candidate_pairs 为实际计算的段落对数；
+                  segments 为逐个原文段落的匹配结果，包含 original_index、original_start、original_end、
+                  comparison_index、comparison_start、comparison_end（未找到候选时为 None）和 similarity
+        """
+        original_segments = self.split(original)
+        comparison_segments = self.split(comparison)
+        pairs = self.candidate_pairs(
+            [doc for _, _, doc in original_segments], [doc for _, _, doc in comparison_segments]
+        )
+        scores = self._score([(original_segments[i][2], comparison_segments[j][2]) for i, j in pairs])
+
+        best = {}
+        for (i, j), score in zip(pairs, scores):
+            if i not in best or score > best[i][1]:
+                best[i] = (j, score)
+
+        records = []
+        weighted = 0.0
+        total_length = 0
+        for i, (start, end, _) in enumerate(original_segments):
+            j, score = best.get(i, (None, 0.0))
+            record = {
+                'original_index': i,
+                'original_start': start,
+                'original_end': end,
+                'comparison_index': j,
+                'comparison_start': None if j is None else comparison_segments[j][0],
+                'comparison_end': None if j is None else comparison_segments[j][1],
+                'similarity': score,
+            }
+            records.append(record)
+            weighted += score * (end - start)
+            total_length += end - start
+
+        return {
+            'score': round(weighted / total_length, 4) if total_length else 0.0,
+            'candidate_pairs': len(pairs),
+            'segments': records,
+        }
+
+
+def compare_segments(original, comparison, unit='paragraph', metric='edit', workers=None):
+    """
+    分段比较的函数接口
+
+    Args:
+        original (str): 原文
+        comparison (str): 待比较文本
+        unit (str): 切分单位
+        metric (str): 段落对使用的相似度指标
+        workers (int | None): 并行进程数
+
+    Returns:
+        dict: SegmentComparer.compare 的返回值
+    """
+    return SegmentComparer(unit=unit, metric=metric, workers=workers).compare(original, comparison)
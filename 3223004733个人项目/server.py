@@ -0,0 +1,187 @@
+"""
+常驻查重服务模块
+
+单次运行 main.py 的大部分耗时在于导入 sklearn、numpy 和加载 jieba 词典，而不是比较本身。
+该模块启动一个常驻进程，预先完成这些初始化，之后通过本机 Unix 套接字（或 127.0.0.1 上的 TCP 端口）
+接收 client.py 转发的命令行参数，在进程内执行 main.py 的逻辑并返回输出和退出码。
+
+协议为按行分隔的 JSON，一个连接上可以连续发送多个请求：
+    请求: {"argv": ["orig.txt", "copy.txt", "result.txt"], "cwd": "/path/to/workdir"}
+    响应: {"exit_code": 0, "stdout": "查重完成！相似度: 85.00%\\n", "stderr": ""}
+
+服务以当前用户的权限读写请求中的任意路径：默认套接字位于仅当前用户可访问的目录中，
+套接字文件权限设为仅所有者可访问，且不会删除或复用其他用户的套接字文件；
+TCP 模式只监听本机地址，不应在多用户机器上使用。
+
+用法:
+    python server.py [--socket PATH | --port PORT]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socketserver
+import sys
+
+import main as checker
+from client import (
+    DEFAULT_TCP_ADDRESS, check_socket_owner, connect, default_address, default_socket_dir, ensure_private_dir,
+    parse_address,
+)
+from jieba_dict import get_tokenizer
+from similarity_calculator import SimilarityCalculator
+
+
+def warm_up():
+    """加载 jieba 词典并完成一次比较，使 sklearn 的延迟导入部分也提前加载"""
+    get_tokenizer()
+    SimilarityCalculator().calculate_comprehensive_similarity(
+        "论文查重系统常驻服务预热文本", "论文查重系统常驻服务启动文本"
+    )
+
+
+def _exit_code(code):
+    """将 SystemExit.code 转换为进程退出码"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    return 1
+
+
+def run_command(argv, cwd=None):
+    """
+    在当前进程中执行一次 main.py 命令行调用
+
+    stdout、stderr 和工作目录都是进程级状态，因此服务逐个处理请求，不并发执行。
+
+    Args:
+        argv (list[str]): 与 main.py 相同的命令行参数
+        cwd (str | None): 解析相对路径使用的工作目录
+
+    Returns:
+        dict: 包含 exit_code、stdout、stderr 的响应
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    previous_cwd = os.getcwd()
+    try:
+        if cwd:
+            os.chdir(cwd)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                checker.main(argv)
+            except SystemExit as e:
+                exit_code = _exit_code(e.code)
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+    except OSError as e:
+        exit_code = 1
+        stderr.write(f"错误：无法切换到工作目录 - {e}\n")
+    finally:
+        os.chdir(previous_cwd)
+    return {'exit_code': exit_code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+class CheckRequestHandler(socketserver.StreamRequestHandler):
+    """逐行读取 JSON 请求并返回 JSON 响应"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                argv = request['argv']
+                if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+                    raise ValueError("argv 必须为字符串列表")
+                response = run_command(argv, request.get('cwd'))
+            except (ValueError, KeyError, TypeError) as e:
+                response = {'exit_code': 2, 'stdout': '', 'stderr': f"错误：无效的请求 - {e}\n"}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+class UnixCheckServer(socketserver.UnixStreamServer):
+    """监听 Unix 套接字的查重服务，关闭时删除套接字文件"""
+
+    _bound = False
+
+    def server_bind(self):
+        directory = os.path.dirname(os.path.abspath(self.server_address))
+        if directory == os.path.abspath(default_socket_dir()):
+            ensure_private_dir(directory)
+        self._remove_stale_socket()
+        super().server_bind()
+        self._bound = True
+        os.chmod(self.server_address, 0o600)
+
+    def _remove_stale_socket(self):
+        """删除上次异常退出遗留的套接字文件；若已有服务在运行或文件属于其他用户则报错"""
+        if not os.path.lexists(self.server_address):
+            return
+        check_socket_owner(self.server_address)
+        try:
+            connect(self.server_address).close()
+        except OSError:
+            os.unlink(self.server_address)
+        else:
+            raise OSError(f"查重服务已在运行: {self.server_address}")
+
+    def server_close(self):
+        super().server_close()
+        # 绑定失败时套接字文件可能属于另一个正在运行的服务，不能删除
+        if self._bound:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.server_address)
+
+
+class TCPCheckServer(socketserver.TCPServer):
+    """监听本机 TCP 端口的查重服务"""
+
+    allow_reuse_address = True
+
+
+def create_server(address=None):
+    """
+    创建查重服务（不启动）
+
+    Args:
+        address (str | tuple[str, int] | None): Unix 套接字路径或 (host, port)，默认由 default_address() 决定
+
+    Returns:
+        socketserver.BaseServer: 已绑定地址的服务
+    """
+    address = address or default_address()
+    if isinstance(address, tuple):
+        return TCPCheckServer(address, CheckRequestHandler)
+    return UnixCheckServer(address, CheckRequestHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='论文查重常驻服务')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--socket', help='监听的 Unix 套接字路径，默认读取 PAPER_CHECK_SERVER 环境变量')
+    group.add_argument('--port', type=int, help=f'改为监听 {DEFAULT_TCP_ADDRESS[0]} 上的 TCP 端口')
+    args = parser.parse_args()
+
+    if args.port is not None:
+        address = (DEFAULT_TCP_ADDRESS[0], args.port)
+    elif args.socket:
+        address = parse_address(args.socket)
+    else:
+        address = default_address()
+
+    warm_up()
+    with create_server(address) as server:
+        print(f"查重服务已启动: {server.server_address}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,247 @@
-import jieba
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import re
+import functools
+import hashlib
+from functools import cached_property
+
+from boilerplate import get_paragraph_store
+from document import DEFAULT_STOP_WORDS, JIEBA_BLOCK_PATTERN, as_document, shared_bigram_ids, tokenizer_config
+from edit_distance import edit_similarity, edit_similarity_upper_bound, levenshtein
+from hashing import get_hasher
+from idf_model import NGRAM_RANGE, get_idf_model
+from interning import jaccard
+from profiling import note, profiled, stage
+from result_cache import get_result_cache
+from substring import DEFAULT_MIN_LENGTH, CommonSubstringFinder
+from tokenization import get_default_tokenizer
+
+# numpy 和 sklearn 的导入耗时远超短文本的比较本身，只在需要 TF-IDF 向量化的代码路径中按需导入
+
+# calculate_similarity 支持的相似度指标
+METRICS = ('cosine', 'jaccard', 'edit', 'substring', 'comprehensive')
+# 综合相似度和高相似度修正中可用的结构相似度
+STRUCTURES = ('edit', 'substring')
+# 综合相似度中余弦相似度、结构相似度和长度相似度的权重
+COMPREHENSIVE_WEIGHTS = (0.4, 0.5, 0.1)
+# 在输入文档上拟合 TF-IDF 时保留的最大特征数
+TFIDF_MAX_FEATURES = 1000
+
+
+def cached_result(metric):
+    """
+    按 (两篇文本的内容摘要, 指标名及其余参数, 评分配置指纹) 缓存方法的结果，未启用结果缓存时直接计算；
+    启用段落库时摘要取自删除模板段落之后的文本
+    
+    Args:
+        metric (str): 指标名
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, text1, text2, *args):
+            cache = self.result_cache
+            if cache is None:
+                return func(self, text1, text2, *args)
+            doc1 = self._to_document(text1)
+            doc2 = self._to_document(text2)
+            key = self._pair_key(cache, '\0'.join([metric, *map(repr, args)]), doc1, doc2)
+            result = cache.get(key)
+            if result is not None:
+                note('result_cache', 'hit')
+                return result
+            note('result_cache', 'miss')
+            result = func(self, doc1, doc2, *args)
+            cache.put(key, result)
+            return result
+        return wrapper
+    return decorator
+
 
 class SimilarityCalculator:
-    def __init__(self):
+    def __init__(self, idf_model=None, hasher=None, structure='edit', result_cache=None, tokenizer=None,
+                 paragraph_store=None):
+        """
+        Args:
+            idf_model (IdfModel | None): 预先拟合的 IDF 模型，默认使用 idf_model.get_idf_model()；
+                                         没有模型时在输入文档上拟合 TF-IDF
+            hasher (TermHasher | None): 哈希特征器，默认使用 hashing.get_hasher()；
+                                        提供时余弦相似度使用固定宽度的哈希特征（优先于 IDF 模型）
+            structure (str): 结构相似度：'edit' 为编辑距离相似度（O(n·m)），
+                             'substring' 为公共子串覆盖率（线性时间，适合长文本）
+            result_cache (ResultCache | None): 结果缓存，默认使用 result_cache.get_result_cache()（默认不启用）
+            tokenizer (Tokenizer | None): 包装字符串输入时使用的分词器，默认使用 tokenization.get_default_tokenizer()
+            paragraph_store (ParagraphStore | None): 段落库，默认使用 boilerplate.get_paragraph_store()（默认不启用）；
+                                                     提供时计算相似度之前先删除两篇文本中的模板段落
+        """
+        if structure not in STRUCTURES:
+            raise ValueError(f"不支持的结构相似度: {structure}")
         # 初始化停用词
         self.stop_words = self._load_stop_words()
-        # 设置TF-IDF参数
-        self.vectorizer = TfidfVectorizer(
-            tokenizer=jieba.cut,
-            ngram_range=(1, 2),  # 使用unigram和bigram
+        self._idf_model = idf_model
+        self._hasher = hasher
+        self.structure = structure
+        self._result_cache = result_cache
+        self._tokenizer = tokenizer
+        self._paragraph_store = paragraph_store
+    
+    @property
+    def idf_model(self):
+        """当前使用的 IDF 模型"""
+        if self._idf_model is not None:
+            return self._idf_model
+        return get_idf_model()
+    
+    @property
+    def hasher(self):
+        """当前使用的哈希特征器"""
+        if self._hasher is not None:
+            return self._hasher
+        return get_hasher()
+    
+    @property
+    def vector_model(self):
+        """只做变换的向量化模型：哈希特征器或 IDF 模型，都没有时为 None（在输入文档上拟合 TF-IDF）"""
+        hasher = self.hasher
+        if hasher is not None:
+            return hasher
+        return self.idf_model
+    
+    @property
+    def result_cache(self):
+        """当前使用的结果缓存，未启用时为 None"""
+        if self._result_cache is not None:
+            return self._result_cache
+        return get_result_cache()
+    
+    @property
+    def tokenizer(self):
+        """当前使用的分词器"""
+        if self._tokenizer is not None:
+            return self._tokenizer
+        return get_default_tokenizer()
+    
+    @property
+    def paragraph_store(self):
+        """当前使用的段落库，未启用时为 None"""
+        if self._paragraph_store is not None:
+            return self._paragraph_store
+        return get_paragraph_store()
+    
+    @cached_property
+    def _base_config(self):
+        """与分词器和向量化模型无关的评分配置"""
+        return '\0'.join([
+            ' '.join(sorted(self.stop_words)),
+            # 词项按 jieba 片段重新分词的规则（见 Document.terms）
+            f"terms={JIEBA_BLOCK_PATTERN.pattern}",
+            f"ngram={NGRAM_RANGE[0]},{NGRAM_RANGE[1]}",
+            f"max_features={TFIDF_MAX_FEATURES}",
+            f"weights={','.join(map(repr, COMPREHENSIVE_WEIGHTS))}",
+            f"substring_min_length={DEFAULT_MIN_LENGTH}",
+        ])
+    
+    def config_fingerprint(self):
+        """
+        评分配置指纹：分词器和分词配置、停用词、n-gram 范围、加权系数、结构相似度和向量化模型，
+        任何一项变化都会使结果缓存不再命中
+        
+        Returns:
+            str: 十六进制的 SHA-256
+        """
+        model = self.vector_model
+        model_config = 'fit' if model is None else f"{type(model).__name__}:{model.fingerprint}"
+        config = f"{tokenizer_config(self.tokenizer)}\0{self._base_config}\0structure={self.structure}\0{model_config}"
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()
+    
+    @cached_property
+    def vectorizer(self):
+        """TF-IDF向量化器，首次使用时才创建"""
+        return self._create_vectorizer()
+    
+    def _create_vectorizer(self):
+        """创建TF-IDF向量化器"""
+        # 首次调用时 sklearn 的导入耗时可达数秒，单独记录以免计入向量化阶段
+        with stage('import', module='sklearn'):
+            from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        # 输入是 Document 中已分好的词（空格拼接），按空格切分即可，不再重复调用 jieba。
+        # 最初的实现以 jieba.cut（返回生成器）作为 tokenizer，fit_transform 每次都抛出 TypeError，
+        # 余弦相似度实际上总是退回 Jaccard 相似度；这里的 TF-IDF 真正参与计算，样例得分随之改变
+        # （result_*.txt 和 tests/test_main.py 中固定的得分均为修正后的结果）
+        return TfidfVectorizer(
+            tokenizer=str.split,
+            token_pattern=None,
+            ngram_range=NGRAM_RANGE,  # 使用unigram和bigram
             min_df=1,
-            max_df=0.8,
-            max_features=1000
+            # 两篇文档时 max_df<1 会把两篇共有的词全部剪掉；查重时共有词正是信号，因此保留全部词项
+            max_df=1.0,
+            max_features=TFIDF_MAX_FEATURES
         )
     
     def _load_stop_words(self):
         """加载停用词表"""
         # 基础中文停用词
-        base_stop_words = {
-            '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '一个',
-            '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没有', '看', '好',
-            '自己', '这个', '那', '他', '她', '它', '我们', '他们', '这', '那', '就', '也',
-            '还', '又', '都', '很', '让', '给', '把', '被', '吗', '呢', '啊', '呀', '哦'
-        }
-        return base_stop_words
+        return set(DEFAULT_STOP_WORDS)
+    
+    def _to_document(self, text):
+        """将输入统一为 Document（字符串会被包装，Document 原样返回），启用段落库时删除其中的模板段落"""
+        doc = as_document(text, self.stop_words, self.tokenizer)
+        store = self.paragraph_store
+        if store is None:
+            return doc
+        return store.strip_document(doc)
+    
+    def _pair_key(self, cache, name, doc1, doc2):
+        """一对文档在结果缓存中的键"""
+        return cache.key(doc1.digest, doc2.digest, name, self.config_fingerprint())
+    
+    def _batch_cache_name(self, name, docs):
+        """
+        批量余弦相似度在结果缓存中的指标名
+        
+        有哈希特征器或 IDF 模型时每对的得分与同批的其他文档无关；否则 TF-IDF 在这批文档上拟合，
+        得分依赖整批文档，名称中加入这批文档的内容摘要，只有同一批文档再次计算时才会命中。
+        """
+        if self.vector_model is not None:
+            return name
+        digest = hashlib.sha256('\0'.join(doc.digest for doc in docs).encode('ascii')).hexdigest()
+        return f"{name}\0{digest}"
+    
+    def _tfidf_matrix(self, docs):
+        """文档的 TF-IDF 矩阵（行向量已L2归一化）：有哈希特征器或 IDF 模型时只做变换，否则在这批文档上拟合"""
+        model = self.vector_model
+        if model is not None:
+            return model.transform(docs)
+        return self._create_vectorizer().fit_transform([doc.terms_text for doc in docs])
     
+    def calculate_similarity(self, text1, text2, metric='cosine'):
+        """
+        按指标名计算相似度
+        
+        Args:
+            text1 (str | Document): 第一篇文本
+            text2 (str | Document): 第二篇文本
+            metric (str): 'cosine'、'jaccard'、'edit'、'substring' 或 'comprehensive'
+        
+        Returns:
+            float: 相似度
+        """
+        if metric == 'cosine':
+            return self.calculate_cosine_similarity(text1, text2)
+        if metric == 'jaccard':
+            return self.calculate_jaccard_similarity(text1, text2)
+        if metric == 'edit':
+            return self._calculate_edit_similarity(text1, text2)
+        if metric == 'substring':
+            return self.calculate_substring_similarity(text1, text2)
+        if metric == 'comprehensive':
+            return self.calculate_comprehensive_similarity(text1, text2)
+        raise ValueError(f"不支持的相似度指标: {metric}")
+    
+    @profiled('cosine')
+    @cached_result('cosine')
     def calculate_cosine_similarity(self, text1, text2):
         """
         计算两篇文本的余弦相似度（改进版）
+        
+        text1、text2 可以是字符串或 Document，同一 Document 的分词结果会被复用
         """
         # 处理空文本的边界情况
         if not text1 and not text2:
@@ -38,55 +249,261 @@ class SimilarityCalculator:
         elif not text1 or not text2:
             return 0.0
         
+        doc1 = self._to_document(text1)
+        doc2 = self._to_document(text2)
+        similarity, vectorized = self._uncorrected_cosine_similarity(doc1, doc2)
+        if not vectorized:
+            return similarity
+        return self._correct_high_similarity(similarity, doc1, doc2)
+    
+    def _uncorrected_cosine_similarity(self, doc1, doc2):
+        """
+        未经高相似度修正的余弦相似度
+        
+        Returns:
+            tuple[float, bool]: (相似度, 是否由向量计算得到)；退回 Jaccard 相似度时为 (Jaccard 相似度, False)，
+                                此时不再做高相似度修正
+        """
         # 预处理文本
-        processed_text1 = self._preprocess_text(text1)
-        processed_text2 = self._preprocess_text(text2)
+        processed_text1 = doc1.terms_text
+        processed_text2 = doc2.terms_text
         
         # 如果预处理后文本过短，使用Jaccard相似度
         if len(processed_text1) < 3 or len(processed_text2) < 3:
-            return self.calculate_jaccard_similarity(text1, text2)
+            note('branch', 'jaccard_fallback')
+            note('fallback_reason', 'short_text')
+            return self.calculate_jaccard_similarity(doc1, doc2), False
+        
+        model = self.vector_model
+        if model is not None:
+            # 使用哈希特征或预先拟合的 IDF，只需稀疏变换，不导入 sklearn
+            with stage('transform', terms_chars=[len(processed_text1), len(processed_text2)]):
+                vector1 = model.vector(doc1)
+                vector2 = model.vector(doc2)
+            if not vector1 or not vector2:
+                note('branch', 'jaccard_fallback')
+                note('fallback_reason', 'no_features')
+                return self.calculate_jaccard_similarity(doc1, doc2), False
+            note('branch', 'cosine')
+            # 哈希特征带正负号，冲突时点积可能略小于 0
+            return max(0.0, min(1.0, model.cosine(vector1, vector2))), True
         
         try:
             # 使用TF-IDF向量化文本
-            tfidf_matrix = self.vectorizer.fit_transform([processed_text1, processed_text2])
+            with stage('vectorize', terms_chars=[len(processed_text1), len(processed_text2)]):
+                tfidf_matrix = self.vectorizer.fit_transform([processed_text1, processed_text2])
             
             # 检查特征数量
             if tfidf_matrix.shape[1] == 0:
-                return self.calculate_jaccard_similarity(text1, text2)
+                note('branch', 'jaccard_fallback')
+                note('fallback_reason', 'no_features')
+                return self.calculate_jaccard_similarity(doc1, doc2), False
             
             # 计算余弦相似度
+            from sklearn.metrics.pairwise import cosine_similarity
             similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
-            result = float(similarity[0][0])
-            
-            # 对高相似度结果进行修正（防止乱序文本得分过高）
-            if result > 0.95:
-                # 结合编辑距离进行修正
-                edit_sim = self._calculate_edit_similarity(text1, text2)
-                # 如果编辑距离相似度较低，说明文本结构差异大，降低最终得分
-                if edit_sim < 0.8:
-                    result = result * 0.7 + edit_sim * 0.3
-            
-            return round(result, 4)
             
+            note('branch', 'cosine')
+            return float(similarity[0][0]), True
+        
         except Exception as e:
             print(f"余弦相似度计算错误: {e}, 使用备用方法")
-            return self.calculate_jaccard_similarity(text1, text2)
+            note('branch', 'jaccard_fallback')
+            note('fallback_reason', 'error')
+            return self.calculate_jaccard_similarity(doc1, doc2), False
+    
+    def _correct_high_similarity(self, result, doc1, doc2):
+        """对高相似度结果进行修正（防止乱序文本得分过高），返回保留4位小数的得分"""
+        if result > 0.95:
+            # 结合结构相似度（默认为编辑距离）进行修正
+            edit_sim = self._structure_similarity(doc1, doc2)
+            note('edit_correction', edit_sim < 0.8)
+            return self._corrected_similarity(result, edit_sim)
+        
+        return round(result, 4)
+    
+    @staticmethod
+    def _corrected_similarity(result, edit_sim):
+        """由余弦相似度（> 0.95）和结构相似度得到修正后保留4位小数的得分，对 edit_sim 单调不减"""
+        # 如果编辑距离相似度较低，说明文本结构差异大，降低最终得分
+        if edit_sim < 0.8:
+            result = result * 0.7 + edit_sim * 0.3
+        return round(result, 4)
+    
+    @profiled('one_to_many')
+    def calculate_one_to_many_similarity(self, original, candidates):
+        """
+        计算一篇原文与多篇候选文档的余弦相似度
+        
+        TF-IDF 只在原文和全部候选文档上拟合一次（有 IDF 模型时只做变换），
+        所有候选的得分由一次稀疏矩阵-向量乘法得到。
+        
+        启用结果缓存时逐对查找和保存得分：全部命中时不再向量化；有哈希特征器或 IDF 模型时只变换未命中的候选，
+        否则得分依赖整批文档（见 _batch_cache_name），仍在整批文档上拟合，但命中的候选不再做编辑距离修正。
+        
+        Args:
+            original (str | Document): 原文
+            candidates (list[str | Document] | CorpusStore): 候选文档，可以直接传入语料库存储（不再分词）
+        
+        Returns:
+            list[float]: 与 candidates 顺序一致的相似度
+        """
+        original_doc = self._to_document(original)
+        candidate_docs = [self._to_document(candidate) for candidate in candidates]
+        scores = [None] * len(candidate_docs)
+        
+        # 空文本以及预处理后过短的文本沿用单对计算的边界处理
+        vector_indices = []
+        for i, doc in enumerate(candidate_docs):
+            if not original_doc or not doc or len(original_doc.terms_text) < 3 or len(doc.terms_text) < 3:
+                scores[i] = self.calculate_cosine_similarity(original_doc, doc)
+            else:
+                vector_indices.append(i)
+        
+        if not vector_indices:
+            return scores
+        
+        cache = self.result_cache
+        keys = {}
+        todo = vector_indices
+        if cache is not None:
+            name = self._batch_cache_name(
+                'cosine_one_to_many', [original_doc] + [candidate_docs[i] for i in vector_indices]
+            )
+            todo = []
+            for i in vector_indices:
+                keys[i] = self._pair_key(cache, name, original_doc, candidate_docs[i])
+                result = cache.get(keys[i])
+                if result is None:
+                    todo.append(i)
+                else:
+                    scores[i] = result
+            note('result_cache_hits', len(vector_indices) - len(todo))
+            if not todo:
+                return scores
+            if self.vector_model is not None:
+                vector_indices = todo
+        
+        try:
+            tfidf_matrix = self._tfidf_matrix([original_doc] + [candidate_docs[i] for i in vector_indices])
+            if tfidf_matrix.shape[1] == 0:
+                similarities = None
+            else:
+                # 行向量已做L2归一化，点积即余弦相似度
+                similarities = (tfidf_matrix[1:] @ tfidf_matrix[0].T).toarray().ravel()
+        except Exception as e:
+            print(f"余弦相似度计算错误: {e}, 使用备用方法")
+            similarities = None
+        
+        positions = {i: position for position, i in enumerate(vector_indices)}
+        for i in todo:
+            if similarities is None:
+                scores[i] = self.calculate_jaccard_similarity(original_doc, candidate_docs[i])
+            else:
+                scores[i] = self._correct_high_similarity(
+                    max(0.0, float(similarities[positions[i]])), original_doc, candidate_docs[i]
+                )
+                if cache is not None:
+                    cache.put(keys[i], scores[i])
+        
+        return scores
+    
+    @profiled('pairwise')
+    def calculate_pairwise_similarity(self, documents, top_k=None, threshold=None, block_size=256):
+        """
+        计算文档集合中两两之间的余弦相似度
+        
+        在全部文档上构建一个稀疏文档-词项矩阵，按行分块与整个矩阵相乘，
+        每次只在内存中保留 block_size × N 的相似度块，并只保留需要的结果。
+        
+        启用结果缓存时逐对查找和保存选出的文档对修正后的得分（键的含义见 _batch_cache_name），
+        命中的文档对不再做编辑距离修正；按 top_k 和 threshold 选出文档对需要全部得分，稀疏矩阵乘法每次仍需计算。
+        
+        Args:
+            documents (list[str | Document] | CorpusStore): 文档集合，可以直接传入语料库存储（不再分词）
+            top_k (int | None): 每篇文档保留相似度最高的 k 个邻居
+            threshold (float | None): 只保留相似度不低于该值的文档对
+            block_size (int): 每个分块包含的行数
+        
+        Returns:
+            list[tuple[int, int, float]]: (i, j, 相似度) 列表，i < j，按相似度降序排列
+        """
+        if block_size < 1:
+            raise ValueError("block_size 必须为正整数")
+        
+        import numpy as np
+        
+        docs = [self._to_document(document) for document in documents]
+        n = len(docs)
+        if n < 2:
+            return []
+        
+        try:
+            tfidf_matrix = self._tfidf_matrix(docs).tocsr()
+        except ValueError:
+            # 全部文档都没有可用词项
+            return []
+        matrix_t = tfidf_matrix.T.tocsc()
+        
+        pairs = {}
+        for start in range(0, n, block_size):
+            end = min(start + block_size, n)
+            # 行向量已做L2归一化，点积即余弦相似度
+            block = (tfidf_matrix[start:end] @ matrix_t).toarray()
+            rows = np.arange(end - start)
+            block[rows, rows + start] = -1.0  # 排除自身
+            
+            for row in rows:
+                scores = block[row]
+                if top_k is not None and top_k < n - 1:
+                    candidates = np.argpartition(-scores, top_k)[:top_k]
+                else:
+                    candidates = np.arange(n)
+                if threshold is not None:
+                    candidates = candidates[scores[candidates] >= threshold]
+                else:
+                    candidates = candidates[scores[candidates] > 0]
+                
+                i = start + row
+                for j in candidates:
+                    j = int(j)
+                    key = (i, j) if i < j else (j, i)
+                    pairs[key] = float(scores[j])
+        
+        cache = self.result_cache
+        name = self._batch_cache_name('cosine_pairwise', docs) if cache is not None else None
+        hits = 0
+        results = []
+        for (i, j), score in pairs.items():
+            if cache is None:
+                score = self._correct_high_similarity(score, docs[i], docs[j])
+            else:
+                key = self._pair_key(cache, name, docs[i], docs[j])
+                result = cache.get(key)
+                if result is None:
+                    result = self._correct_high_similarity(score, docs[i], docs[j])
+                    cache.put(key, result)
+                else:
+                    hits += 1
+                score = result
+            # 编辑距离修正可能使得分降到阈值以下
+            if threshold is None or score >= threshold:
+                results.append((i, j, score))
+        if cache is not None:
+            note('result_cache_hits', hits)
+        results.sort(key=lambda item: (-item[2], item[0], item[1]))
+        return results
     
     def _preprocess_text(self, text):
         """文本预处理"""
         if not text:
             return ""
         
-        # 1. 去除特殊字符和标点，但保留句子结构信息
-        text = re.sub(r'[^\w\s\u4e00-\u9fff]', ' ', text)
-        
-        # 2. 分词并过滤停用词
-        words = jieba.cut(text)
-        filtered_words = [word for word in words if word.strip() and word not in self.stop_words and len(word) > 1]
-        
-        # 3. 重新组合成文本（保留词序信息）
-        return ' '.join(filtered_words)
+        # 去除标点、停用词和单字后用空格拼接（保留词序信息）
+        return self._to_document(text).terms_text
     
+    @profiled('edit')
+    @cached_result('edit')
     def _calculate_edit_similarity(self, text1, text2):
         """计算基于编辑距离的相似度（考虑文本结构）"""
         if not text1 and not text2:
@@ -94,29 +511,32 @@ class SimilarityCalculator:
         elif not text1 or not text2:
             return 0.0
         
-        # 简单的编辑距离计算（可以使用python-Levenshtein库更精确）
-        def simple_edit_distance(s1, s2):
-            if len(s1) < len(s2):
-                return simple_edit_distance(s2, s1)
-            if len(s2) == 0:
-                return len(s1)
-            
-            previous_row = range(len(s2) + 1)
-            for i, c1 in enumerate(s1):
-                current_row = [i + 1]
-                for j, c2 in enumerate(s2):
-                    insertions = previous_row[j + 1] + 1
-                    deletions = current_row[j] + 1
-                    substitutions = previous_row[j] + (c1 != c2)
-                    current_row.append(min(insertions, deletions, substitutions))
-                previous_row = current_row
-            
-            return previous_row[-1]
+        # 位并行编辑距离，结果与逐格动态规划完全一致
+        return edit_similarity(self._to_document(text1).text, self._to_document(text2).text)
+    
+    @profiled('substring')
+    @cached_result('substring')
+    def calculate_substring_similarity(self, text1, text2):
+        """
+        计算公共子串覆盖率：两篇文本中被极大公共子串（默认至少 8 个字符）覆盖的字符比例
+        
+        基于后缀自动机，线性时间，可以代替编辑距离衡量逐字照抄的程度
+        """
+        if not text1 and not text2:
+            return 1.0
+        elif not text1 or not text2:
+            return 0.0
         
-        distance = simple_edit_distance(text1, text2)
-        max_len = max(len(text1), len(text2))
-        return 1.0 - distance / max_len if max_len > 0 else 0.0
+        return CommonSubstringFinder().coverage(self._to_document(text1).text, self._to_document(text2).text)
+    
+    def _structure_similarity(self, doc1, doc2):
+        """按 structure 设置计算结构相似度"""
+        if self.structure == 'substring':
+            return self.calculate_substring_similarity(doc1, doc2)
+        return self._calculate_edit_similarity(doc1, doc2)
     
+    @profiled('comprehensive')
+    @cached_result('comprehensive')
     def calculate_comprehensive_similarity(self, text1, text2):
         """
         综合相似度计算（推荐使用）
@@ -128,21 +548,148 @@ class SimilarityCalculator:
         elif not text1 or not text2:
             return 0.0
         
+        doc1 = self._to_document(text1)
+        doc2 = self._to_document(text2)
+        
         # 1. 余弦相似度（词汇层面）
-        cosine_sim = self.calculate_cosine_similarity(text1, text2)
+        cosine_sim = self.calculate_cosine_similarity(doc1, doc2)
         
-        # 2. 编辑距离相似度（结构层面）
-        edit_sim = self._calculate_edit_similarity(text1, text2)
+        # 2. 编辑距离相似度或公共子串覆盖率（结构层面）
+        edit_sim = self._structure_similarity(doc1, doc2)
         
         # 3. 句子长度相似度
-        len_sim = 1 - abs(len(text1) - len(text2)) / max(len(text1), len(text2)) if max(len(text1), len(text2)) > 0 else 0
+        len_sim = self._length_similarity(doc1, doc2)
         
         # 加权综合
         # 对于乱序文本，编辑距离相似度更重要
-        final_similarity = 0.4 * cosine_sim + 0.5 * edit_sim + 0.1 * len_sim
+        final_similarity = self._combine(cosine_sim, edit_sim, len_sim)
         
         return round(final_similarity, 4)
     
+    def _length_similarity(self, doc1, doc2):
+        """句子长度相似度"""
+        longest = max(len(doc1), len(doc2))
+        return 1 - abs(len(doc1) - len(doc2)) / longest if longest > 0 else 0
+    
+    @staticmethod
+    def _combine(cosine_sim, edit_sim, len_sim):
+        """综合相似度的加权公式（精确得分与上下界共用，保证浮点运算顺序一致）"""
+        cosine_weight, structure_weight, length_weight = COMPREHENSIVE_WEIGHTS
+        return cosine_weight * cosine_sim + structure_weight * edit_sim + length_weight * len_sim
+    
+    def _threshold_verdict(self, bounds, len_sim, threshold, stage_name):
+        """
+        根据余弦和编辑相似度的取值范围判断综合相似度是否不低于阈值
+        
+        Args:
+            bounds (tuple[float, float, float, float]): (余弦下界, 余弦上界, 编辑下界, 编辑上界)
+        
+        Returns:
+            dict | None: 结论确定时返回判定结果，否则返回 None
+        """
+        cosine_low, cosine_high, edit_low, edit_high = bounds
+        # 加权公式对各项单调，round 也单调，因此上下界经同样的计算后仍是最终得分的上下界
+        lower = round(self._combine(cosine_low, edit_low, len_sim), 4)
+        upper = round(self._combine(cosine_high, edit_high, len_sim), 4)
+        if lower < threshold <= upper:
+            return None
+        note('decided_by', stage_name)
+        return {
+            'above': lower >= threshold,
+            'decided_by': stage_name,
+            'lower_bound': lower,
+            'upper_bound': upper,
+        }
+    
+    @profiled('threshold')
+    @cached_result('threshold')
+    def check_threshold(self, text1, text2, threshold):
+        """
+        判断综合相似度是否不低于阈值，按代价从低到高逐级收紧上下界，结论确定时立即返回
+        
+        判定结果与 calculate_comprehensive_similarity(text1, text2) >= threshold 完全一致：
+        1. length：编辑距离不小于长度差，故编辑相似度不超过长度相似度；余弦相似度在 [0, 1] 内
+        2. overlap：由共有字符和字符二元组数给出编辑相似度上界（线性时间，无需分词）
+        3. cosine：精确计算余弦相似度（需要分词）
+        4. edit：以达到阈值所需的最大编辑距离为上限计算，确定超出时提前退出
+        structure 为 'substring' 时前两级的上界不成立，在 cosine 之后直接计算公共子串覆盖率（substring）。
+        
+        Args:
+            text1 (str | Document): 第一篇文本
+            text2 (str | Document): 第二篇文本
+            threshold (float): 综合相似度阈值
+        
+        Returns:
+            dict: above（是否不低于阈值）、decided_by（作出判定的阶段）、
+                  lower_bound 和 upper_bound（判定时综合相似度的取值范围）
+        """
+        # 边界情况与 calculate_comprehensive_similarity 一致
+        if not text1 or not text2:
+            score = 1.0 if not text1 and not text2 else 0.0
+            note('decided_by', 'empty')
+            return {'above': score >= threshold, 'decided_by': 'empty', 'lower_bound': score, 'upper_bound': score}
+        
+        doc1 = self._to_document(text1)
+        doc2 = self._to_document(text2)
+        len_sim = self._length_similarity(doc1, doc2)
+        
+        if self.structure == 'substring':
+            cosine_sim = self.calculate_cosine_similarity(doc1, doc2)
+            verdict = self._threshold_verdict((cosine_sim, cosine_sim, 0.0, 1.0), len_sim, threshold, 'cosine')
+            if verdict:
+                return verdict
+            coverage = self.calculate_substring_similarity(doc1, doc2)
+            return self._threshold_verdict((cosine_sim, cosine_sim, coverage, coverage), len_sim, threshold, 'substring')
+        
+        edit_high = len_sim
+        verdict = self._threshold_verdict((0.0, 1.0, 0.0, edit_high), len_sim, threshold, 'length')
+        if verdict:
+            return verdict
+        
+        edit_high = min(edit_high, edit_similarity_upper_bound(doc1.text, doc2.text))
+        verdict = self._threshold_verdict((0.0, 1.0, 0.0, edit_high), len_sim, threshold, 'overlap')
+        if verdict:
+            return verdict
+        
+        # 余弦相似度高于 0.95 时还要用编辑相似度修正：不在此处计算编辑距离，
+        # 修正后的得分对编辑相似度单调，由编辑相似度的范围给出余弦的范围，编辑距离只在最后一级计算一次
+        raw_cosine, vectorized = self._uncorrected_cosine_similarity(doc1, doc2)
+        corrected = vectorized and raw_cosine > 0.95
+        
+        def cosine_range(edit_low, edit_high):
+            if not corrected:
+                cosine_sim = round(raw_cosine, 4) if vectorized else raw_cosine
+                return cosine_sim, cosine_sim
+            return self._corrected_similarity(raw_cosine, edit_low), self._corrected_similarity(raw_cosine, edit_high)
+        
+        verdict = self._threshold_verdict((*cosine_range(0.0, edit_high), 0.0, edit_high), len_sim, threshold, 'cosine')
+        if verdict:
+            return verdict
+        
+        # 达到阈值所需的最低编辑相似度（按余弦上界计算并留出舍入余量），换算为允许的最大编辑距离
+        max_len = max(len(doc1.text), len(doc2.text))
+        cosine_weight, structure_weight, length_weight = COMPREHENSIVE_WEIGHTS
+        cosine_high = cosine_range(0.0, edit_high)[1]
+        min_edit = (threshold - cosine_weight * cosine_high - length_weight * len_sim) / structure_weight - 1e-3
+        max_distance = max(0, int((1.0 - min_edit) * max_len))
+        with stage('edit', input_sizes=[len(doc1), len(doc2)], max_distance=max_distance):
+            distance = levenshtein(doc1.text, doc2.text, max_distance)
+        if distance > max_distance:
+            edit_high = min(edit_high, 1.0 - distance / max_len)
+            verdict = self._threshold_verdict(
+                (*cosine_range(0.0, edit_high), 0.0, edit_high), len_sim, threshold, 'edit'
+            )
+            if verdict:
+                return verdict
+            distance = levenshtein(doc1.text, doc2.text)
+        
+        edit_sim = 1.0 - distance / max_len
+        if corrected:
+            note('edit_correction', edit_sim < 0.8)
+        return self._threshold_verdict((*cosine_range(edit_sim, edit_sim), edit_sim, edit_sim), len_sim, threshold, 'edit')
+    
+    @profiled('jaccard')
+    @cached_result('jaccard')
     def calculate_jaccard_similarity(self, text1, text2):
         """
         计算Jaccard相似度（考虑词序的改进版）
@@ -153,21 +700,7 @@ class SimilarityCalculator:
         elif not text1 or not text2:
             return 0.0
         
-        # 使用bigram来捕获词序信息
-        def get_ngrams(text, n=2):
-            words = list(jieba.cut(text))
-            words = [w for w in words if w.strip() and w not in self.stop_words]
-            return [' '.join(words[i:i+n]) for i in range(len(words)-n+1)]
-        
-        ngrams1 = set(get_ngrams(text1))
-        ngrams2 = set(get_ngrams(text2))
-        
-        if not ngrams1 and not ngrams2:
-            return 1.0
-        elif not ngrams1 or not ngrams2:
-            return 0.0
-        
-        intersection = len(ngrams1.intersection(ngrams2))
-        union = len(ngrams1.union(ngrams2))
+        # 使用bigram来捕获词序信息：bigram 打包为 64 位整数的有序数组，避免构造大量字符串
+        ngrams1, ngrams2 = shared_bigram_ids(self._to_document(text1), self._to_document(text2))
         
-        return intersection / union if union > 0 else 0.0
\ No newline at end of file
+        return jaccard(ngrams1, ngrams2)
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+测试模块共用的缓存隔离
+
+分词缓存和 jieba 词典缓存默认写在 ~/.cache/paper_check 下。会创建文档的测试模块导入这里的
+setUpModule 和 tearDownModule，使 PAPER_CHECK_CACHE_DIR 在模块运行期间指向一个临时目录：
+测试不会写入开发者的缓存目录，之前运行留下的分词结果也不会掩盖分词的回归。
+环境变量同样传给测试中启动的子进程和进程池。
+
+用法（测试模块把项目根目录和测试目录加入 Python 路径之后）:
+    from cache_isolation import setUpModule, tearDownModule
+"""
+
+import os
+import tempfile
+from unittest import mock
+
+from document import set_token_cache
+
+# 嵌套运行时每个模块各自的 (临时目录, 环境变量补丁)
+_active = []
+
+
+def setUpModule():
+    cache_dir = tempfile.TemporaryDirectory()
+    environ = mock.patch.dict(os.environ, {'PAPER_CHECK_CACHE_DIR': cache_dir.name})
+    environ.start()
+    _active.append((cache_dir, environ))
+    # 默认分词缓存在首次使用时按当时的目录创建，换目录后需要重新创建
+    set_token_cache(None)
+
+
+def tearDownModule():
+    cache_dir, environ = _active.pop()
+    set_token_cache(None)
+    environ.stop()
+    cache_dir.cleanup()
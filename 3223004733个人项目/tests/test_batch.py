@@ -0,0 +1,121 @@
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+from main import calculate_all_pairs_similarity, calculate_batch_similarity
+from similarity_calculator import SimilarityCalculator
+
+VARIANT_FILES = [
+    "orig_0.8_add.txt",
+    "orig_0.8_del.txt",
+    "orig_0.8_dis_1.txt",
+    "orig_0.8_dis_10.txt",
+    "orig_0.8_dis_15.txt",
+]
+
+
+class TestBatchMode(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = SimilarityCalculator()
+        self.temp_dir = tempfile.mkdtemp()
+        for name in VARIANT_FILES:
+            shutil.copy(os.path.join(project_root, name), self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_one_to_many_scores(self):
+        """一对多得分顺序与候选一致，空文本沿用边界处理"""
+        original = "论文查重系统使用余弦相似度比较两篇文章的内容是否相似"
+        candidates = [
+            original,
+            "论文查重系统使用编辑距离比较两篇文章的结构是否相似",
+            "今天天气晴朗，适合去公园散步",
+            "",
+        ]
+        scores = self.calculator.calculate_one_to_many_similarity(original, candidates)
+        self.assertEqual(len(scores), len(candidates))
+        self.assertAlmostEqual(scores[0], 1.0, places=4)
+        self.assertGreater(scores[1], scores[2])
+        self.assertEqual(scores[3], 0.0)
+
+    def test_batch_csv_output(self):
+        """目录模式输出按相似度降序排列的 CSV"""
+        output_path = os.path.join(self.temp_dir, "ranked.csv")
+        records = calculate_batch_similarity(
+            os.path.join(project_root, "orig.txt"), self.temp_dir, output_path
+        )
+        self.assertEqual(len(records), len(VARIANT_FILES))
+
+        with open(output_path, encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([int(row['rank']) for row in rows], list(range(1, len(VARIANT_FILES) + 1)))
+        similarities = [float(row['similarity']) for row in rows]
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+
+    def test_batch_glob_jsonl_output(self):
+        """通配符模式输出 JSONL"""
+        output_path = os.path.join(self.temp_dir, "ranked.jsonl")
+        calculate_batch_similarity(
+            os.path.join(project_root, "orig.txt"),
+            os.path.join(self.temp_dir, "orig_0.8_dis_*.txt"),
+            output_path,
+        )
+        with open(output_path, encoding='utf-8') as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(0.0 <= row['similarity'] <= 1.0 for row in rows))
+
+    def test_pairwise_blocks_agree(self):
+        """不同分块大小得到相同的两两相似度"""
+        docs = [
+            "论文查重系统使用余弦相似度比较两篇文章的内容是否相似",
+            "论文查重系统使用编辑距离比较两篇文章的结构是否相似",
+            "今天天气晴朗，适合去公园散步",
+            "今天天气不错，适合去公园跑步",
+            "机器学习模型需要大量训练数据",
+        ]
+        full = self.calculator.calculate_pairwise_similarity(docs)
+        blocked = self.calculator.calculate_pairwise_similarity(docs, block_size=2)
+        self.assertEqual(full, blocked)
+        self.assertTrue(all(i < j for i, j, _ in full))
+
+        top1 = self.calculator.calculate_pairwise_similarity(docs, top_k=1)
+        neighbours = {}
+        for i, j, _ in top1:
+            neighbours.setdefault(i, set()).add(j)
+            neighbours.setdefault(j, set()).add(i)
+        self.assertIn(1, neighbours[0])
+        self.assertIn(3, neighbours[2])
+
+        thresholded = self.calculator.calculate_pairwise_similarity(docs, threshold=0.3)
+        self.assertTrue(all(score >= 0.3 for _, _, score in thresholded))
+        self.assertEqual(
+            thresholded, [pair for pair in full if pair[2] >= 0.3]
+        )
+
+    def test_all_pairs_output(self):
+        """两两比较模式输出排序后的论文对"""
+        output_path = os.path.join(self.temp_dir, "pairs.csv")
+        records = calculate_all_pairs_similarity(self.temp_dir, output_path, top_k=2)
+        self.assertGreater(len(records), 0)
+        with open(output_path, encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), len(records))
+        self.assertTrue(all(row['file1'] != row['file2'] for row in rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import batch_runner
+from batch_runner import BatchRunner, iter_manifest, load_completed
+from cache_isolation import setUpModule, tearDownModule
+from file_handler import read_file
+from similarity_calculator import SimilarityCalculator
+
+VARIANT_FILES = ["orig_0.8_add.txt", "orig_0.8_del.txt", "orig_0.8_dis_10.txt"]
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self.temp_dir.name, "manifest.csv")
+        self.output = os.path.join(self.temp_dir.name, "results.jsonl")
+        original = os.path.join(project_root, "orig.txt")
+        with open(self.manifest, 'w', encoding='utf-8') as file:
+            file.write("id,original,candidate\n")
+            for name in VARIANT_FILES:
+                file.write(f"{name},{original},{os.path.join(project_root, name)}\n")
+            file.write("missing,missing.txt,missing.txt\n")
+        self.runner = BatchRunner(workers=1)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_manifest_formats(self):
+        """带表头的 CSV、无表头的 CSV 和 JSONL 解析结果一致，相对路径相对于清单目录"""
+        headerless = os.path.join(self.temp_dir.name, "headerless.csv")
+        jsonl = os.path.join(self.temp_dir.name, "manifest.jsonl")
+        with open(headerless, 'w', encoding='utf-8') as file:
+            file.write("a.txt,b.txt\n\nc.txt,d.txt\n")
+        with open(jsonl, 'w', encoding='utf-8') as file:
+            file.write('{"original": "a.txt", "candidate": "b.txt"}\n')
+            file.write('{"original": "c.txt", "candidate": "d.txt"}\n')
+
+        expected = [
+            (1, "a.txt\tb.txt", os.path.join(self.temp_dir.name, "a.txt"), os.path.join(self.temp_dir.name, "b.txt")),
+            (2, "c.txt\td.txt", os.path.join(self.temp_dir.name, "c.txt"), os.path.join(self.temp_dir.name, "d.txt")),
+        ]
+        self.assertEqual(list(iter_manifest(headerless)), expected)
+        self.assertEqual(list(iter_manifest(jsonl)), expected)
+        self.assertEqual([item[1] for item in iter_manifest(self.manifest)], VARIANT_FILES + ["missing"])
+
+    def test_run_scores_pairs(self):
+        summary = self.runner.run(self.manifest, self.output)
+        self.assertEqual((summary['total'], summary['scored'], summary['failed']), (4, 3, 1))
+
+        records = {record['id']: record for record in read_records(self.output)}
+        calculator = SimilarityCalculator()
+        original = read_file(os.path.join(project_root, "orig.txt"))
+        for name in VARIANT_FILES:
+            expected = calculator.calculate_cosine_similarity(original, read_file(os.path.join(project_root, name)))
+            self.assertEqual(records[name]['similarity'], round(expected, 4))
+        self.assertIn('FileNotFoundError', records['missing']['error'])
+
+    def test_manifest_streamed_in_batches(self):
+        """清单在 I/O 线程中按 max_in_flight 分批读取，不在事件循环所在线程中一次性解析"""
+        calls = []
+        read_batch = batch_runner._next_batch
+
+        def next_batch(iterator, size):
+            batch = read_batch(iterator, size)
+            calls.append((threading.current_thread() is threading.main_thread(), len(batch)))
+            return batch
+
+        with mock.patch.object(batch_runner, '_next_batch', side_effect=next_batch):
+            summary = BatchRunner(workers=1, max_in_flight=3).run(self.manifest, self.output)
+        self.assertEqual(summary['total'], 4)
+        self.assertEqual(calls, [(False, 3), (False, 1), (False, 0)])
+
+    def test_invalid_arguments(self):
+        """--max-in-flight 0 不会被当作默认值"""
+        with self.assertRaises(ValueError):
+            BatchRunner(workers=1, max_in_flight=0)
+        with self.assertRaises(ValueError):
+            BatchRunner(metric='unknown')
+        self.assertEqual(BatchRunner(workers=2).max_in_flight, 8)
+
+    def test_resume_after_crash(self):
+        """续跑时跳过已完成的文档对，截掉写到一半的末行，重新计算出错的文档对"""
+        self.runner.run(self.manifest, self.output)
+        records = read_records(self.output)
+        done = [record for record in records if 'similarity' in record]
+        with open(self.output, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(done[0], ensure_ascii=False) + '\n')
+            file.write(json.dumps(done[1], ensure_ascii=False)[:20])
+
+        self.assertEqual(load_completed(self.output), {done[0]['id']})
+        summary = BatchRunner(workers=1).run(self.manifest, self.output)
+        self.assertEqual((summary['skipped'], summary['scored'], summary['failed']), (1, 2, 1))
+
+        ids = [record['id'] for record in read_records(self.output)]
+        self.assertEqual(sorted(ids), sorted(VARIANT_FILES + ["missing"]))
+
+    def test_resume_replaces_error_records(self):
+        """续跑时删除旧的错误记录：反复出错只保留一行，之后成功时只留下结果"""
+        for _ in range(3):
+            self.runner.run(self.manifest, self.output)
+        records = read_records(self.output)
+        self.assertEqual(len(records), 4)
+        self.assertEqual([record['id'] for record in records if 'error' in record], ["missing"])
+
+        with open(os.path.join(self.temp_dir.name, "missing.txt"), 'w', encoding='utf-8') as file:
+            file.write("论文查重系统")
+        summary = self.runner.run(self.manifest, self.output)
+        self.assertEqual((summary['skipped'], summary['scored'], summary['failed']), (3, 1, 0))
+        records = read_records(self.output)
+        self.assertEqual(sorted(record['id'] for record in records), sorted(VARIANT_FILES + ["missing"]))
+        self.assertTrue(all('similarity' in record for record in records))
+        self.assertFalse(os.path.exists(self.output + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import gc
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+import weakref
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import main
+from boilerplate import (
+    ParagraphStore, build_paragraph_store, get_paragraph_store, normalize_paragraph, set_paragraph_store,
+)
+from cache_isolation import setUpModule, tearDownModule
+from document import Document
+from file_handler import read_file
+from segments import SegmentComparer
+from similarity_calculator import SimilarityCalculator
+
+TEMPLATE = (
+    "课程作业：请围绕所给主题撰写不少于两千字的论文，并注明全部参考文献。\n"
+    "参考文献格式：作者．题名［文献类型标志］．出版地：出版者，出版年．\n"
+)
+BODIES = [
+    "今天天气很好，我们去公园散步，看到很多人在放风筝。",
+    "图书馆里很安静，同学们都在认真复习期末考试的内容。",
+    "食堂新推出的套餐价格实惠，味道也不错，吸引了很多学生。",
+    "运动会上各个班级积极参赛，最后我们班获得了团体第二名。",
+]
+
+
+class TestParagraphStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ParagraphStore(min_documents=3)
+        for body in BODIES:
+            self.store.add(TEMPLATE + body)
+
+    def tearDown(self):
+        set_paragraph_store(None)
+
+    def test_normalization(self):
+        """全角半角、大小写、标点和空白的差异不影响段落摘要"""
+        self.assertEqual(normalize_paragraph("Ｐython 作业，第 1 题！"), normalize_paragraph("python作业第1题"))
+
+    def test_counts_documents_once(self):
+        self.assertFalse(self.store.add(TEMPLATE + BODIES[0]))
+        self.assertEqual(self.store.document_count, len(BODIES))
+        self.assertEqual(len(self.store.boilerplate_keys()), 2)
+
+    def test_thresholds(self):
+        """出现次数达不到 min_documents 或 min_fraction 的段落，以及过短的段落，都不是模板段落"""
+        store = ParagraphStore(min_documents=5)
+        short = ParagraphStore(min_documents=2, min_length=100)
+        fraction = ParagraphStore(min_documents=1, min_fraction=0.9)
+        for body in BODIES:
+            for other in (store, short, fraction):
+                other.add(TEMPLATE + body)
+        fraction.add(BODIES[0] + "（修改稿）")
+        self.assertEqual(store.strip(TEMPLATE + BODIES[0]), TEMPLATE + BODIES[0])
+        self.assertEqual(short.strip(TEMPLATE + BODIES[0]), TEMPLATE + BODIES[0])
+        # 5 篇中的 4 篇含有模板段落，不足 90%
+        self.assertEqual(fraction.min_count(), 5)
+        self.assertEqual(fraction.strip(TEMPLATE + BODIES[0]), TEMPLATE + BODIES[0])
+
+    def test_strip(self):
+        text = "　　" + TEMPLATE.replace("课程作业：", "课程作业: ") + BODIES[1]
+        self.assertEqual(self.store.strip(text), BODIES[1])
+        self.assertEqual(self.store.strip(BODIES[1]), BODIES[1])
+
+    def test_strip_document_reuses_tokens(self):
+        document = Document(TEMPLATE + BODIES[2])
+        document.tokens
+        stripped = self.store.strip_document(document)
+        self.assertEqual(stripped.text, BODIES[2])
+        self.assertIn('tokens', stripped.__dict__)
+        self.assertEqual(stripped.tokens, Document(BODIES[2]).tokens)
+        self.assertIs(self.store.strip_document(document), stripped)
+        self.assertIs(self.store.strip_document(stripped), stripped)
+
+    def test_strip_document_does_not_keep_documents_alive(self):
+        """缓存的删除结果随文档一起释放，常驻服务中不会累积已处理的文档"""
+        document = Document(TEMPLATE + BODIES[2])
+        stripped = self.store.strip_document(document)
+        self.store.strip_document(stripped)
+        references = [weakref.ref(document), weakref.ref(stripped)]
+        del document, stripped
+        gc.collect()
+        self.assertEqual([reference() for reference in references], [None, None])
+
+    def test_strip_document_refresh(self):
+        """模板段落集合更新后重新删除"""
+        document = Document(BODIES[0] + "\n" + BODIES[1])
+        self.assertIs(self.store.strip_document(document), document)
+        for body in BODIES[1:]:
+            self.store.add(BODIES[0] + "\n" + body)
+        self.assertEqual(self.store.strip_document(document).text, BODIES[1])
+
+    def test_calculator_removes_boilerplate(self):
+        text1 = TEMPLATE + BODIES[0]
+        text2 = TEMPLATE + BODIES[3]
+        plain = SimilarityCalculator()
+        calculator = SimilarityCalculator(paragraph_store=self.store)
+        for metric in ('cosine', 'edit', 'comprehensive'):
+            self.assertEqual(
+                calculator.calculate_similarity(text1, text2, metric),
+                plain.calculate_similarity(BODIES[0], BODIES[3], metric),
+            )
+        self.assertGreater(plain.calculate_similarity(text1, text2, 'comprehensive'),
+                           calculator.calculate_similarity(text1, text2, 'comprehensive'))
+
+        set_paragraph_store(self.store)
+        self.assertEqual(SimilarityCalculator().calculate_similarity(text1, text2, 'edit'),
+                         plain.calculate_similarity(BODIES[0], BODIES[3], 'edit'))
+
+    def test_segments_skip_boilerplate(self):
+        comparer = SegmentComparer()
+        comparer.calculator = SimilarityCalculator(paragraph_store=self.store)
+        text = TEMPLATE + BODIES[0]
+        self.assertEqual([text[start:end] for start, end, _ in comparer.split(text)], [BODIES[0]])
+
+    def test_pickle_carries_boilerplate(self):
+        restored = pickle.loads(pickle.dumps(self.store))
+        self.assertEqual(restored.boilerplate_keys(), self.store.boilerplate_keys())
+        self.assertEqual(restored.strip(TEMPLATE + BODIES[0]), BODIES[0])
+
+    def test_build_and_main_option(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for index, body in enumerate(BODIES):
+                path = os.path.join(temp_dir, f"paper{index}.txt")
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(TEMPLATE + body)
+                paths.append(path)
+            store_path = os.path.join(temp_dir, 'paragraphs.sqlite')
+            self.assertEqual(build_paragraph_store(store_path, [os.path.join(temp_dir, '*.txt')]), (4, 0))
+            self.assertEqual(build_paragraph_store(store_path, [paths[0]]), (0, 1))
+
+            output = os.path.join(temp_dir, 'result.txt')
+            main.main([paths[0], paths[1], output, '--paragraph-store', store_path])
+            result = read_file(output)
+            main.main([paths[0], paths[1], output])
+            default_result = read_file(output)
+
+        expected = SimilarityCalculator().calculate_cosine_similarity(BODIES[0], BODIES[1])
+        self.assertEqual(result, f"相似度: {expected:.2%}")
+        self.assertNotEqual(result, default_result)
+        self.assertIsNone(get_paragraph_store())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import main
+from cache_isolation import setUpModule, tearDownModule
+from corpus_store import CorpusStore, CorpusWriter, build_corpus, is_corpus_store
+from document import Document
+from file_handler import read_file
+from similarity_calculator import SimilarityCalculator
+
+CORPUS_FILES = ["orig.txt", "orig_0.8_add.txt", "orig_0.8_del.txt", "orig_0.8_dis_15.txt"]
+
+
+class TestCorpusStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.temp_dir.name, 'corpus.pcc')
+        self.paths = [os.path.join(project_root, name) for name in CORPUS_FILES]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        self.assertEqual(build_corpus(self.store_path, self.paths), (len(self.paths), 0))
+
+        self.assertTrue(is_corpus_store(self.store_path))
+        self.assertFalse(is_corpus_store(self.paths[0]))
+        with CorpusStore(self.store_path) as store:
+            self.assertEqual(store.names, self.paths)
+            for index, path in enumerate(self.paths):
+                text = read_file(path)
+                doc = store[index]
+                self.assertEqual(doc.text, text)
+                self.assertEqual(doc.tokens, Document(text).tokens)
+                self.assertEqual(doc.digest, Document(text).digest)
+                self.assertEqual(store.metadata(index)['chars'], len(text))
+            ids = store.token_ids(0)
+            self.assertIsInstance(ids, memoryview)
+            self.assertEqual(ids.format, 'I')
+            self.assertEqual([store.vocabulary[i] for i in ids], store.tokens(0))
+            del ids
+
+    def test_documents_are_lazy(self):
+        """Jaccard 相似度直接使用存储中的 id 视图，不还原原文和词语字符串"""
+        build_corpus(self.store_path, self.paths)
+        calculator = SimilarityCalculator()
+        documents = [Document(read_file(path)) for path in self.paths]
+        with CorpusStore(self.store_path) as store:
+            stored = [store[index] for index in range(len(store))]
+            self.assertEqual(
+                calculator.calculate_jaccard_similarity(stored[0], stored[1]),
+                calculator.calculate_jaccard_similarity(documents[0], documents[1]),
+            )
+            self.assertEqual(
+                calculator.calculate_jaccard_similarity(documents[0], stored[2]),
+                calculator.calculate_jaccard_similarity(documents[0], documents[2]),
+            )
+            for doc in stored[:2]:
+                self.assertNotIn('tokens', doc.__dict__)
+                self.assertNotIn('text', doc.__dict__)
+                self.assertEqual(len(doc), len(documents[stored.index(doc)].text))
+            self.assertEqual(
+                [store.vocabulary[i] for i in stored[0].token_ids], documents[0].filtered_tokens
+            )
+            # 余弦相似度需要字符串时才还原
+            self.assertEqual(
+                calculator.calculate_cosine_similarity(stored[0], stored[1]),
+                calculator.calculate_cosine_similarity(documents[0], documents[1]),
+            )
+            self.assertEqual(stored[0].text, documents[0].text)
+            del stored
+
+    def test_append_only(self):
+        build_corpus(self.store_path, self.paths[:2])
+        size = os.path.getsize(self.store_path)
+        with open(self.store_path, 'rb') as file:
+            prefix = file.read(size)
+
+        with CorpusStore(self.store_path) as reader:
+            self.assertEqual(build_corpus(self.store_path, self.paths), (2, 2))
+            # 打开时的快照不受追加影响，refresh 后看到新文档
+            self.assertEqual(len(reader), 2)
+            reader.refresh()
+            self.assertEqual(len(reader), 4)
+            self.assertEqual(reader[3].text, read_file(self.paths[3]))
+        with open(self.store_path, 'rb') as file:
+            self.assertEqual(file.read(size), prefix)
+
+    def test_torn_append_is_discarded(self):
+        build_corpus(self.store_path, self.paths[:1])
+        with open(self.store_path, 'ab') as file:
+            file.write(b'\1' * 1000)
+
+        with CorpusStore(self.store_path) as store:
+            self.assertEqual(len(store), 1)
+        writer = CorpusWriter(self.store_path)
+        writer.add('short', '论文查重，测试文本。')
+        writer.commit()
+        with CorpusStore(self.store_path) as store:
+            self.assertEqual(store.names, [self.paths[0], 'short'])
+            self.assertEqual(store.text(1), '论文查重，测试文本。')
+
+    def test_writer_rejects_bad_input(self):
+        writer = CorpusWriter(self.store_path)
+        writer.add('a', '文本')
+        with self.assertRaises(ValueError):
+            writer.add('a', '文本')
+        with self.assertRaises(ValueError):
+            writer.add('b', '文本', tokens=['文'])
+        with self.assertRaises(ValueError):
+            CorpusStore(self.paths[0])
+
+    def test_calculator_accepts_store(self):
+        build_corpus(self.store_path, self.paths)
+        calculator = SimilarityCalculator()
+        documents = [Document(read_file(path)) for path in self.paths]
+        with CorpusStore(self.store_path) as store:
+            self.assertEqual(
+                calculator.calculate_one_to_many_similarity(documents[0], store),
+                calculator.calculate_one_to_many_similarity(documents[0], documents),
+            )
+            self.assertEqual(
+                calculator.calculate_pairwise_similarity(store),
+                calculator.calculate_pairwise_similarity(documents),
+            )
+
+    def test_cli(self):
+        env = dict(os.environ, PAPER_CHECK_TOKEN_CACHE='0')
+        subprocess.run(
+            [sys.executable, os.path.join(project_root, 'corpus_store.py'), 'build', self.store_path] + self.paths[1:],
+            check=True, capture_output=True, env=env,
+        )
+        batch_output = os.path.join(self.temp_dir.name, 'batch.csv')
+        expected_output = os.path.join(self.temp_dir.name, 'expected.csv')
+
+        main.main([self.paths[0], self.store_path, batch_output, '--batch'])
+        candidates = os.path.join(self.temp_dir.name, 'candidates')
+        os.mkdir(candidates)
+        for path in self.paths[1:]:
+            shutil.copy(path, candidates)
+        main.main([self.paths[0], candidates, expected_output, '--batch'])
+
+        def scores(path):
+            lines = read_file(path).splitlines()[1:]
+            return [line.rsplit(',', 1)[1] for line in lines]
+        self.assertEqual(scores(batch_output), scores(expected_output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import re
+import sys
+import unittest
+from unittest import mock
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import jieba
+
+import document
+from cache_isolation import setUpModule, tearDownModule
+from document import Document, as_document
+from file_handler import read_file
+from similarity_calculator import SimilarityCalculator
+from text_processor import TextProcessor
+
+
+class TestDocument(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = SimilarityCalculator()
+        self.processor = TextProcessor()
+
+    def test_derived_views(self):
+        """派生表示：去标点词语、TF-IDF 词项、bigram"""
+        doc = Document("我们今天学习自然语言处理，自然语言处理很有趣！")
+        self.assertNotIn('，', doc.words)
+        self.assertIn('，', doc.filtered_tokens)
+        self.assertTrue(all(len(term) > 1 for term in doc.terms))
+        self.assertNotIn('我们', doc.terms)
+        self.assertEqual(len(doc), len(doc.text))
+        self.assertTrue(all(' ' in bigram for bigram in doc.bigrams))
+
+    def test_segments_only_once(self):
+        """所有指标共享同一次分词结果"""
+        text1 = "论文查重系统使用余弦相似度比较两篇文章的内容"
+        text2 = "论文查重系统使用编辑距离比较两篇文章的结构"
+        with mock.patch.object(document, 'segment', wraps=document.segment) as segment:
+            doc1 = self.processor.to_document(text1)
+            doc2 = self.processor.to_document(text2)
+            self.processor.process(text1)
+            segment.reset_mock()
+            self.calculator.calculate_cosine_similarity(doc1, doc2)
+            self.calculator.calculate_jaccard_similarity(doc1, doc2)
+            self.calculator.calculate_comprehensive_similarity(doc1, doc2)
+            self.assertEqual(segment.call_count, 2)
+
+    def test_process_matches_original_implementation(self):
+        """TextProcessor.process 与最初的实现（先去除标点，再用 jieba 分词）逐字节一致"""
+        text = read_file(os.path.join(project_root, "orig.txt"))
+        words = jieba.lcut(re.sub(r'[^\w\s]', '', text))
+        expected = ' '.join(word.strip() for word in words if word.strip())
+        self.assertEqual(self.processor.process(text), expected)
+
+    def test_terms_match_original_preprocessing(self):
+        """TF-IDF 词项与最初的 _preprocess_text（先把标点替换为空格，再用 jieba 分词）一致"""
+        texts = [
+            read_file(os.path.join(project_root, "orig.txt")),
+            "76分。X中国c型1.%分分-",
+            "&国分",
+            "15c#]”丙国_2!。析民甲",
+            "+型丙国人乙.分国，研究-方法与C++实现",
+        ]
+        for text in texts:
+            with self.subTest(text=text[:20]):
+                words = jieba.lcut(re.sub(r'[^\w\s一-鿿]', ' ', text))
+                expected = [
+                    word for word in words
+                    if word.strip() and word not in document.DEFAULT_STOP_WORDS and len(word) > 1
+                ]
+                self.assertEqual(Document(text).terms, expected)
+
+    def test_string_and_document_inputs_agree(self):
+        """字符串输入与 Document 输入得到相同结果"""
+        text1 = "今天天气很好，我们一起去公园散步，然后去图书馆看书"
+        text2 = "今天天气不错，我们一起去公园跑步，然后去图书馆学习"
+        doc1, doc2 = Document(text1), Document(text2)
+        self.assertEqual(
+            self.calculator.calculate_jaccard_similarity(text1, text2),
+            self.calculator.calculate_jaccard_similarity(doc1, doc2),
+        )
+        self.assertEqual(
+            self.calculator.calculate_comprehensive_similarity(text1, text2),
+            self.calculator.calculate_comprehensive_similarity(doc1, doc2),
+        )
+
+    def test_prebuilt_tokens(self):
+        """提供分词结果时不再调用 jieba"""
+        with mock.patch.object(document, 'segment') as segment:
+            doc = Document("自然语言处理", tokens=['自然语言', '处理'])
+            self.assertEqual(doc.words, ['自然语言', '处理'])
+            segment.assert_not_called()
+
+    def test_as_document(self):
+        doc = Document("文本")
+        self.assertIs(as_document(doc), doc)
+        self.assertIsInstance(as_document("文本"), Document)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import random
+import sys
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+from edit_distance import (
+    edit_similarity,
+    edit_similarity_upper_bound,
+    levenshtein,
+    reference_edit_distance,
+    token_edit_similarity,
+)
+from file_handler import read_file
+from similarity_calculator import SimilarityCalculator
+
+
+class TestEditDistance(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(20240923)
+
+    def random_text(self, alphabet, max_len):
+        return ''.join(self.rng.choice(alphabet) for _ in range(self.rng.randint(0, max_len)))
+
+    def test_matches_reference_on_random_strings(self):
+        """随机字符串上与朴素动态规划结果一致"""
+        for _ in range(500):
+            s1 = self.random_text('abcd', 80)
+            s2 = self.random_text('abcd', 80)
+            self.assertEqual(levenshtein(s1, s2), reference_edit_distance(s1, s2))
+
+    def test_matches_reference_on_chinese_text(self):
+        """中文长文本（跨越多个机器字）与朴素动态规划结果一致"""
+        file_path = os.path.join(project_root, "orig.txt")
+        variant_path = os.path.join(project_root, "orig_0.8_dis_1.txt")
+        s1 = read_file(file_path)[:400]
+        s2 = read_file(variant_path)[:450]
+        self.assertEqual(levenshtein(s1, s2), reference_edit_distance(s1, s2))
+
+    def test_max_distance_cutoff(self):
+        """超过距离上限时返回 max_distance + 1，否则返回精确值"""
+        for _ in range(300):
+            s1 = self.random_text('ab', 40)
+            s2 = self.random_text('ab', 40)
+            expected = reference_edit_distance(s1, s2)
+            k = self.rng.randint(0, 30)
+            result = levenshtein(s1, s2, max_distance=k)
+            self.assertEqual(result, expected if expected <= k else k + 1)
+
+    def test_upper_bound_never_below_exact(self):
+        """字符重叠给出的上界不小于精确的编辑相似度"""
+        for _ in range(500):
+            s1 = self.random_text('abcd', 60)
+            s2 = self.random_text('abcde', 60)
+            self.assertGreaterEqual(edit_similarity_upper_bound(s1, s2) + 1e-12, edit_similarity(s1, s2))
+        self.assertEqual(edit_similarity_upper_bound("abc", "xyz"), 0.0)
+        self.assertEqual(edit_similarity_upper_bound("", ""), 1.0)
+
+    def test_negative_max_distance(self):
+        with self.assertRaises(ValueError):
+            levenshtein("abc", "abd", max_distance=-1)
+
+    def test_token_level_distance(self):
+        """词语级编辑距离按元素比较"""
+        tokens1 = ['论文', '查重', '系统', '设计']
+        tokens2 = ['论文', '系统', '设计', '实现']
+        self.assertEqual(levenshtein(tokens1, tokens2), 2)
+        self.assertAlmostEqual(token_edit_similarity(tokens1, tokens2), 0.5)
+
+    def test_edit_similarity_threshold(self):
+        """相似度下限无法达到时返回 0.0"""
+        self.assertAlmostEqual(edit_similarity("abcdefghij", "abcdefghix"), 0.9)
+        self.assertAlmostEqual(edit_similarity("abcdefghij", "abcdefghix", min_similarity=0.9), 0.9)
+        self.assertEqual(edit_similarity("abcdefghij", "xxxxxxxxxx", min_similarity=0.5), 0.0)
+
+    def test_calculator_uses_same_result(self):
+        """SimilarityCalculator 的编辑相似度与原实现一致"""
+        calculator = SimilarityCalculator()
+        s1 = "今天天气很好，我们一起去公园散步吧"
+        s2 = "今天天气不错，我们一起去公园跑步"
+        expected = 1.0 - reference_edit_distance(s1, s2) / max(len(s1), len(s2))
+        self.assertAlmostEqual(calculator._calculate_edit_similarity(s1, s2), expected)
+        self.assertEqual(calculator._calculate_edit_similarity("", ""), 1.0)
+        self.assertEqual(calculator._calculate_edit_similarity("abc", ""), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
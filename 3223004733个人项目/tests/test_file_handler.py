@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from file_handler import FileHandler, read_chunks, read_file
+
+SAMPLE_TEXT = "论文查重系统\r\n支持多种编码格式的自动检测。\r第三行\n" * 200
+
+
+class TestFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = FileHandler()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_bytes(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def expected_text(self):
+        return SAMPLE_TEXT.replace('\r\n', '\n').replace('\r', '\n')
+
+    def test_utf8_skips_detection(self):
+        """UTF-8 文件直接解码，不调用编码检测"""
+        path = self.write_bytes("utf8.txt", SAMPLE_TEXT.encode('utf-8'))
+        with mock.patch.object(FileHandler, '_detect_encoding') as detect:
+            self.assertEqual(self.handler.read_file(path), self.expected_text())
+            detect.assert_not_called()
+
+    def test_gbk_and_bom_encodings(self):
+        """GBK 与带 BOM 的文件都能正确解码"""
+        for name, data in [
+            ("gbk.txt", SAMPLE_TEXT.encode('gbk')),
+            ("utf8_bom.txt", SAMPLE_TEXT.encode('utf-8-sig')),
+            ("utf16.txt", SAMPLE_TEXT.encode('utf-16')),
+        ]:
+            with self.subTest(name=name):
+                path = self.write_bytes(name, data)
+                self.assertEqual(read_file(path), self.expected_text())
+
+    def test_iter_chunks_matches_read_file(self):
+        """流式读取拼接后与整体读取一致（包括跨块的多字节字符和换行符）"""
+        for name, data in [
+            ("utf8.txt", SAMPLE_TEXT.encode('utf-8')),
+            ("gbk.txt", SAMPLE_TEXT.encode('gbk')),
+        ]:
+            with self.subTest(name=name):
+                path = self.write_bytes(name, data)
+                chunks = list(read_chunks(path, chunk_size=7))
+                self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+                self.assertEqual(''.join(chunks), self.handler.read_file(path))
+
+    def test_iter_chunks_encoding_changes_after_prefix(self):
+        """编码检测前缀之后才出现非 UTF-8 字节时换用后备编码，结果仍与 read_file 一致"""
+        path = self.write_bytes("mixed.txt", b'a' * 70000 + SAMPLE_TEXT.encode('gbk'))
+        self.assertEqual(''.join(read_chunks(path, chunk_size=4096)), read_file(path))
+
+        # 已产出的前缀在后备编码下解码结果不同，无法撤回，抛出与 read_file 同类的错误
+        path = self.write_bytes("conflict.txt", SAMPLE_TEXT.encode('utf-8') * 20 + SAMPLE_TEXT.encode('gbk'))
+        with self.assertRaises(UnicodeDecodeError):
+            list(read_chunks(path, chunk_size=4096))
+
+    def test_fixture_files(self):
+        """样例文件流式读取与整体读取一致"""
+        path = os.path.join(project_root, "orig.txt")
+        self.assertEqual(''.join(read_chunks(path, chunk_size=1000)), read_file(path))
+
+    def test_missing_file(self):
+        missing = os.path.join(self.temp_dir.name, "missing.txt")
+        with self.assertRaises(FileNotFoundError):
+            list(read_chunks(missing))
+
+
+if __name__ == "__main__":
+    unittest.main()
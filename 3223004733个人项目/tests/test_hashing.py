@@ -0,0 +1,86 @@
+import math
+import os
+import sys
+import tempfile
+import unittest
+from collections import Counter
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import main
+from cache_isolation import setUpModule, tearDownModule
+from document import Document
+from file_handler import read_chunks, read_file
+from hashing import TermHasher, get_hasher, hashed_file_similarity, set_hasher
+from idf_model import iter_features
+from similarity_calculator import SimilarityCalculator
+
+VARIANT_FILES = ["orig_0.8_add.txt", "orig_0.8_del.txt", "orig_0.8_dis_15.txt"]
+
+
+class TestHashing(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.original_path = os.path.join(project_root, "orig.txt")
+        cls.original = Document(read_file(cls.original_path))
+        cls.variants = [Document(read_file(os.path.join(project_root, name))) for name in VARIANT_FILES]
+        cls.hasher = TermHasher()
+
+    def tearDown(self):
+        set_hasher(None)
+
+    def test_streaming_matches_whole_document(self):
+        """逐块计算的向量与整篇计算一致，包括块内没有换行的情况"""
+        expected = self.hasher.vector(self.original)
+        for chunk_size in [97, 4096]:
+            with self.subTest(chunk_size=chunk_size):
+                vector = self.hasher.vector_from_chunks(read_chunks(self.original_path, chunk_size=chunk_size))
+                self.assertEqual(vector.keys(), expected.keys())
+                for index, weight in expected.items():
+                    self.assertAlmostEqual(vector[index], weight)
+
+    def test_collisions_are_small(self):
+        """2^20 维时哈希特征的余弦相似度与不哈希的词频余弦相似度几乎相同"""
+        counts1 = Counter(iter_features(self.original.terms))
+        for variant in self.variants:
+            counts2 = Counter(iter_features(variant.terms))
+            dot = sum(count * counts2[feature] for feature, count in counts1.items())
+            exact = dot / math.sqrt(sum(c * c for c in counts1.values()) * sum(c * c for c in counts2.values()))
+            hashed = self.hasher.cosine(self.hasher.vector(self.original), self.hasher.vector(variant))
+            self.assertAlmostEqual(hashed, exact, delta=1e-3)
+
+    def test_feature_space_is_bounded(self):
+        vector = TermHasher(64).vector(self.original)
+        self.assertLessEqual(len(vector), 64)
+        self.assertTrue(all(0 <= index < 64 for index in vector))
+
+    def test_calculator_hashing_mode(self):
+        """哈希模式下逐对、一对多和两两比较的得分一致"""
+        calculator = SimilarityCalculator(hasher=self.hasher)
+        single = [calculator.calculate_cosine_similarity(self.original, doc) for doc in self.variants]
+        self.assertEqual(calculator.calculate_one_to_many_similarity(self.original, self.variants), single)
+
+        pairs = {(i, j): score for i, j, score in calculator.calculate_pairwise_similarity([self.original] + self.variants)}
+        for j, score in enumerate(single, start=1):
+            self.assertAlmostEqual(pairs[(0, j)], score, places=4)
+
+    def test_main_hashing_option(self):
+        """--hashing 流式比较两个文件，只对本次运行生效"""
+        comparison_path = os.path.join(project_root, VARIANT_FILES[0])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "result.txt")
+            main.main([self.original_path, comparison_path, output, '--hashing'])
+            result = read_file(output)
+            main.main([self.original_path, comparison_path, output])
+
+        self.assertEqual(result, f"相似度: {hashed_file_similarity(self.original_path, comparison_path):.2%}")
+        self.assertIsNone(get_hasher())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import idf_model
+import main
+from cache_isolation import setUpModule, tearDownModule
+from document import Document
+from file_handler import read_file
+from idf_model import IdfModel, get_idf_model, set_idf_model
+from parallel import ParallelScorer
+from similarity_calculator import SimilarityCalculator
+from tokenization import CharNgramTokenizer, set_default_tokenizer
+
+VARIANT_FILES = ["orig_0.8_add.txt", "orig_0.8_del.txt", "orig_0.8_dis_1.txt", "orig_0.8_dis_10.txt"]
+
+
+class TestIdfModel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.original = Document(read_file(os.path.join(project_root, "orig.txt")))
+        cls.variants = [Document(read_file(os.path.join(project_root, name))) for name in VARIANT_FILES]
+        cls.model = IdfModel.fit([cls.original] + cls.variants, min_df=1)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        set_idf_model(None)
+
+    def test_matches_sklearn(self):
+        """IDF 和余弦相似度与 TfidfVectorizer 在同一语料上拟合的结果一致"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        docs = [self.original] + self.variants
+        vectorizer = TfidfVectorizer(tokenizer=str.split, token_pattern=None, ngram_range=(1, 2))
+        matrix = vectorizer.fit_transform([doc.terms_text for doc in docs])
+        self.assertEqual(set(vectorizer.vocabulary_), set(self.model.idf))
+        for feature, column in vectorizer.vocabulary_.items():
+            self.assertAlmostEqual(self.model.idf[feature], vectorizer.idf_[column])
+
+        expected = (matrix[0] @ matrix[1].T).toarray()[0, 0]
+        vectors = [self.model.vector(doc) for doc in docs[:2]]
+        self.assertAlmostEqual(self.model.cosine(*vectors), expected)
+
+    def test_unknown_features_use_max_idf(self):
+        model = IdfModel.fit(["论文查重系统", "论文查重方法"], min_df=1)
+        self.assertGreater(model.default_idf, max(model.idf.values()))
+        doc = Document("文本相似度")
+        vector = model.vector(doc)
+        self.assertEqual(set(vector), set(doc.terms) | {' '.join(doc.terms)})
+        self.assertAlmostEqual(sum(weight * weight for weight in vector.values()), 1.0)
+
+    def test_save_and_load(self):
+        path = os.path.join(self.temp_dir.name, "model.idf")
+        self.model.save(path)
+        loaded = IdfModel.load(path)
+        self.assertEqual(loaded.idf, self.model.idf)
+        self.assertEqual(loaded.document_count, self.model.document_count)
+
+    def test_rejects_invalid_files(self):
+        path = os.path.join(self.temp_dir.name, "model.idf")
+        with open(path, 'wb') as file:
+            file.write(b'not a model')
+        with self.assertRaises(ValueError):
+            IdfModel.load(path)
+
+        self.model.save(path)
+        original_config = idf_model.model_config
+        idf_model.model_config = lambda: 'other'
+        try:
+            with self.assertRaises(ValueError):
+                IdfModel.load(path)
+        finally:
+            idf_model.model_config = original_config
+
+    def test_cached_model_checks_tokenizer(self):
+        """已加载的模型只在分词配置相同时复用，切换分词器后重新检查配置"""
+        path = os.path.join(self.temp_dir.name, "model.idf")
+        self.model.save(path)
+        model = idf_model.load_idf_model(path)
+        self.assertIs(idf_model.load_idf_model(path), model)
+        set_default_tokenizer(CharNgramTokenizer(2))
+        try:
+            with self.assertRaises(ValueError):
+                idf_model.load_idf_model(path)
+        finally:
+            set_default_tokenizer(None)
+        self.assertEqual(idf_model.load_idf_model(path).idf, model.idf)
+
+    def test_scores_independent_of_batch(self):
+        """使用模型时一对多的得分与逐对计算一致，不随同批的其他文档变化"""
+        calculator = SimilarityCalculator(self.model)
+        batch = calculator.calculate_one_to_many_similarity(self.original, self.variants)
+        single = [calculator.calculate_cosine_similarity(self.original, doc) for doc in self.variants]
+        self.assertEqual(batch, single)
+        self.assertEqual(calculator.calculate_one_to_many_similarity(self.original, self.variants[:1]), batch[:1])
+
+        pairs = {(i, j): score for i, j, score in calculator.calculate_pairwise_similarity([self.original] + self.variants)}
+        for j, score in enumerate(single, start=1):
+            self.assertAlmostEqual(pairs[(0, j)], score, places=4)
+
+    def test_workers_use_model(self):
+        set_idf_model(self.model)
+        pairs = [(self.original, doc) for doc in self.variants]
+        expected = [SimilarityCalculator().calculate_cosine_similarity(*pair) for pair in pairs]
+        with ParallelScorer(2) as scorer:
+            self.assertEqual(scorer.score_documents(pairs, 'cosine'), expected)
+
+    def test_main_option(self):
+        """--idf-model 只对本次运行生效"""
+        path = os.path.join(self.temp_dir.name, "model.idf")
+        output = os.path.join(self.temp_dir.name, "result.txt")
+        self.model.save(path)
+        files = [os.path.join(project_root, "orig.txt"), os.path.join(project_root, "orig_0.8_dis_10.txt"), output]
+
+        main.main(files + ['--idf-model', path])
+        expected = SimilarityCalculator(self.model).calculate_cosine_similarity(self.original, self.variants[3])
+        self.assertEqual(read_file(output), f"相似度: {expected:.2%}")
+
+        main.main(files)
+        self.assertIsNone(get_idf_model())
+
+
+if __name__ == "__main__":
+    unittest.main()
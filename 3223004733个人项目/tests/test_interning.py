@@ -0,0 +1,117 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from array import array
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import interning
+import main
+from cache_isolation import setUpModule, tearDownModule
+from document import Document
+from file_handler import read_file
+from interning import Vocabulary, get_vocabulary, intersection_size, jaccard, pack_bigrams, set_vocabulary
+from similarity_calculator import SimilarityCalculator
+
+VARIANT_FILES = ["orig_0.8_add.txt", "orig_0.8_del.txt", "orig_0.8_dis_15.txt"]
+
+
+def string_jaccard(document1, document2):
+    """字符串 bigram 集合的 Jaccard 相似度，作为对照"""
+    union = document1.bigrams | document2.bigrams
+    return len(document1.bigrams & document2.bigrams) / len(union) if union else 1.0
+
+
+class TestInterning(unittest.TestCase):
+
+    def test_vocabulary_ids_are_consistent(self):
+        vocabulary = Vocabulary()
+        first = vocabulary.intern(['论文', '查重', '论文'])
+        second = vocabulary.intern(['查重', '系统', '论文'])
+
+        self.assertEqual(first.typecode, 'I')
+        self.assertEqual(first[0], first[2])
+        self.assertEqual(second[0], first[1])
+        self.assertEqual(second[2], first[0])
+        self.assertEqual(len({first[0], first[1], second[1]}), 3)
+        self.assertEqual(len(vocabulary), 3)
+
+    def test_pack_bigrams_sorted_and_unique(self):
+        packed = pack_bigrams(array('I', [3, 1, 3, 1, 2]))
+
+        self.assertEqual(list(packed), sorted({(3 << 32) | 1, (1 << 32) | 3, (1 << 32) | 2}))
+        self.assertEqual(len(pack_bigrams(array('I', [7]))), 0)
+
+    def test_pack_bigrams_numpy_path_matches_python_path(self):
+        rng = random.Random(0)
+        ids = array('I', (rng.randrange(300) for _ in range(interning.NUMPY_MIN_SIZE * 4)))
+        expected = sorted({(a << 32) | b for a, b in zip(ids, ids[1:])})
+
+        self.assertEqual(list(pack_bigrams(ids)), expected)
+
+    def test_intersection_size(self):
+        rng = random.Random(1)
+        for size in (10, interning.NUMPY_MIN_SIZE * 3):
+            values1 = sorted(rng.sample(range(size * 4), size))
+            values2 = sorted(rng.sample(range(size * 4), size // 2))
+            expected = len(set(values1) & set(values2))
+            self.assertEqual(intersection_size(array('Q', values1), array('Q', values2)), expected)
+
+        self.assertEqual(intersection_size(array('Q'), array('Q', [1, 2])), 0)
+
+    def test_jaccard_empty(self):
+        self.assertEqual(jaccard(array('Q'), array('Q')), 1.0)
+        self.assertEqual(jaccard(array('Q'), array('Q', [1])), 0.0)
+
+    def test_matches_string_bigrams_on_fixtures(self):
+        original = Document(read_file(os.path.join(project_root, "orig.txt")))
+        for name in VARIANT_FILES:
+            with self.subTest(name=name):
+                variant = Document(read_file(os.path.join(project_root, name)))
+                self.assertEqual(len(variant.bigram_ids), len(variant.bigrams))
+                self.assertAlmostEqual(
+                    jaccard(original.bigram_ids, variant.bigram_ids), string_jaccard(original, variant)
+                )
+
+    def test_calculator_jaccard_uses_ids(self):
+        calculator = SimilarityCalculator()
+        text1 = "今天天气很好，我们去公园散步。"
+        text2 = "今天天气不错，我们去公园散步。"
+        expected = string_jaccard(Document(text1), Document(text2))
+
+        self.assertAlmostEqual(calculator.calculate_jaccard_similarity(text1, text2), expected, places=4)
+
+
+    def test_reset_vocabulary(self):
+        """main.run 每条命令换用新的词表，之前创建的文档仍能与新文档正确比较"""
+        calculator = SimilarityCalculator()
+        text1 = "今天天气很好，我们去公园散步。"
+        text2 = "今天天气不错，我们去公园散步。"
+        before = Document(text1)
+        before.bigram_ids
+        vocabulary = get_vocabulary()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            main.main([
+                os.path.join(project_root, "orig.txt"), os.path.join(project_root, VARIANT_FILES[0]),
+                os.path.join(temp_dir, "result.txt"),
+            ])
+        self.assertIsNot(get_vocabulary(), vocabulary)
+        self.assertIs(before.vocabulary, vocabulary)
+
+        set_vocabulary(None)
+        after = Document(text2)
+        self.assertEqual(len(get_vocabulary()), 0)
+        self.assertAlmostEqual(
+            calculator.calculate_jaccard_similarity(before, after), string_jaccard(before, after)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+from document import Document
+from file_handler import read_file
+from lsh_index import MIN_RECALL, MinHashLSHIndex, choose_bands
+from similarity_calculator import SimilarityCalculator
+
+
+class TestMinHashLSHIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.original = Document(read_file(os.path.join(project_root, "orig.txt")))
+        cls.variant = Document(read_file(os.path.join(project_root, "orig_0.8_dis_1.txt")))
+        cls.unrelated = Document("今天天气晴朗，我们一起去公园散步，然后去图书馆看书学习。" * 5)
+
+    def build_index(self):
+        index = MinHashLSHIndex(num_perm=128, bands=32)
+        index.add("original", self.original)
+        index.add("unrelated", self.unrelated)
+        return index
+
+    def test_estimate_close_to_jaccard(self):
+        """签名估计值接近真实 Jaccard 相似度"""
+        index = MinHashLSHIndex(num_perm=256, bands=64)
+        exact = SimilarityCalculator().calculate_jaccard_similarity(self.original, self.variant)
+        signature1 = index.signature(self.original)
+        signature2 = index.signature(self.variant)
+        estimate = float((signature1 == signature2).mean())
+        self.assertAlmostEqual(estimate, exact, delta=0.1)
+
+    def test_query_returns_near_duplicates(self):
+        """查询只返回估计相似度超过阈值的候选"""
+        index = self.build_index()
+        results = index.query(self.variant, threshold=0.3)
+        self.assertEqual([key for key, _ in results], ["original"])
+
+    def test_save_and_load(self):
+        """保存后加载得到相同的查询结果"""
+        index = self.build_index()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_path = os.path.join(temp_dir, "index.npz")
+            index.save(index_path)
+            loaded = MinHashLSHIndex.load(index_path)
+        self.assertEqual(loaded.keys, index.keys)
+        self.assertEqual(loaded.query(self.variant), index.query(self.variant))
+
+    def test_load_uses_saved_band_tables(self):
+        """加载时直接读入保存的 band 哈希表，加载后追加的文档同样可以查到"""
+        index = self.build_index()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_path = os.path.join(temp_dir, "index.npz")
+            index.save(index_path)
+            loaded = MinHashLSHIndex.load(index_path)
+        self.assertEqual([len(table) for table in loaded._tables], [0] * loaded.bands)
+        self.assertEqual(loaded._sorted_hashes.shape, (loaded.bands, 2))
+        loaded.add("variant", self.variant)
+        self.assertEqual([key for key, _ in loaded.query(self.original)], ["original", "variant"])
+        self.assertEqual(len(loaded.signatures), 3)
+
+    def test_bands_follow_threshold(self):
+        """默认的 band 划分保证设计阈值处的召回率"""
+        index = MinHashLSHIndex(num_perm=128)
+        self.assertEqual((index.bands, index.rows), (64, 2))
+        self.assertGreaterEqual(index.recall(0.3), MIN_RECALL)
+        # 32 个 band、每个 band 4 行时 0.3 处的召回率很低
+        self.assertLess(MinHashLSHIndex(num_perm=128, bands=32).recall(0.3), 0.3)
+        self.assertEqual(choose_bands(128, 0.8), 32)
+
+    def test_empty_documents_never_match(self):
+        """空文档的签名相同，但不写入 band 表，不会互相成为候选"""
+        index = self.build_index()
+        self.assertFalse(index.add("empty1", ""))
+        self.assertFalse(index.add("empty2", "。"))
+        self.assertEqual(index.query(""), [])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_path = os.path.join(temp_dir, "index.npz")
+            index.save(index_path)
+            loaded = MinHashLSHIndex.load(index_path)
+        self.assertEqual(loaded.keys, ["original", "unrelated", "empty1", "empty2"])
+        self.assertEqual(loaded.query(""), [])
+        self.assertEqual(loaded.query(self.variant), index.query(self.variant))
+
+    def test_invalid_bands(self):
+        with self.assertRaises(ValueError):
+            MinHashLSHIndex(num_perm=100, bands=32)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,31 @@
+import contextlib
+import io
 import os
 import sys
+import tempfile
 import unittest
 
-# 添加项目根目录到Python路径
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.insert(0, project_root)
+sys.path.append(current_dir)
 
+import main
+from cache_isolation import setUpModule, tearDownModule
 from file_handler import read_file, write_result
 from similarity_calculator import SimilarityCalculator
 from text_processor import TextProcessor
 
+# 命令行在样例上的得分（与仓库中的 result_*.txt 一致）
+FIXTURE_SCORES = {
+    "orig_0.8_add.txt": ("result_add.txt", "相似度: 96.72%"),
+    "orig_0.8_del.txt": ("result_del.txt", "相似度: 94.74%"),
+    "orig_0.8_dis_1.txt": ("result_dis1.txt", "相似度: 98.67%"),
+    "orig_0.8_dis_10.txt": ("result_dis10.txt", "相似度: 90.49%"),
+    "orig_0.8_dis_15.txt": ("result_dis15.txt", "相似度: 87.47%"),
+}
+
 
 class TestPaperCheckSystem(unittest.TestCase):
 
@@ -214,6 +229,37 @@ class TestPaperCheckSystem(unittest.TestCase):
                 self.assertLessEqual(similarity, 1.0)
                 print(f"✓ {test_file} 相似度: {similarity:.4f}")
 
+    def test_fixture_scores(self):
+        """样例的查重结果与固定的得分和仓库中的结果文件一致，防止评分被无意改变"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "result.txt")
+            for name, (result_file, expected) in FIXTURE_SCORES.items():
+                with self.subTest(name=name):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        main.main([self.get_file_path("orig.txt"), self.get_file_path(name), output])
+                    self.assertEqual(read_file(output), expected)
+                    self.assertEqual(read_file(self.get_file_path(result_file)), expected)
+
+    def test_rejects_unsupported_options(self):
+        """当前模式不支持的选项报错退出，不被静默忽略"""
+        files = [self.get_file_path("orig.txt"), self.get_file_path("orig_0.8_add.txt"), "result.txt"]
+        invalid = [
+            files + ['--batch', '--threshold', '0.5'],
+            files + ['--batch', '--top-k', '3'],
+            files[:2] + ['--all-pairs', '--spans'],
+            files[:2] + ['--all-pairs', '--segments', 'paragraph'],
+            files + ['--segments', 'paragraph', '--threshold', '0.5'],
+            files + ['--threshold', '0.5', '--spans'],
+            files + ['--format', 'csv'],
+            files + ['--workers', '2'],
+            files + ['--segment-metric', 'cosine'],
+        ]
+        for argv in invalid:
+            with self.subTest(argv=argv[2:]):
+                with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()) as stderr:
+                    main.main(argv)
+                self.assertIn("--", stderr.getvalue())
+
 
 if __name__ == "__main__":
     # 创建测试套件
@@ -0,0 +1,93 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+import parallel
+from document import Document
+from file_handler import FileHandler, read_file
+from parallel import ParallelScorer
+from similarity_calculator import SimilarityCalculator
+from tokenization import CharNgramTokenizer
+
+FILES = [
+    "orig_0.8_add.txt",
+    "orig_0.8_del.txt",
+    "orig_0.8_dis_1.txt",
+    "orig_0.8_dis_10.txt",
+    "orig_0.8_dis_15.txt",
+]
+
+
+class TestParallelScorer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.original = os.path.join(project_root, "orig.txt")
+        cls.paths = [os.path.join(project_root, name) for name in FILES]
+        cls.scorer = ParallelScorer(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scorer.close()
+
+    def test_scores_match_serial_in_order(self):
+        """并行结果与单进程结果一致且顺序与输入一致"""
+        pairs = [(self.original, path) for path in self.paths]
+        calculator = SimilarityCalculator()
+        original = Document(read_file(self.original))
+        expected = [calculator.calculate_jaccard_similarity(original, Document(read_file(path))) for path in self.paths]
+        self.assertEqual(self.scorer.score_pairs(pairs, metric='jaccard'), expected)
+
+        reversed_pairs = list(reversed(pairs))
+        self.assertEqual(self.scorer.score_pairs(reversed_pairs, metric='jaccard'), list(reversed(expected)))
+
+    def test_load_documents(self):
+        """并行分词结果与单进程分词一致"""
+        docs = self.scorer.load_documents(self.paths[:2])
+        for path, doc in zip(self.paths[:2], docs):
+            self.assertEqual(doc.tokens, Document(read_file(path)).tokens)
+
+    def test_load_documents_reads_each_file_once(self):
+        """文件只在工作进程中读取，主进程使用返回的原文"""
+        with mock.patch.object(FileHandler, 'read_file', autospec=True, side_effect=FileHandler.read_file) as read:
+            docs = self.scorer.load_documents(self.paths[:2])
+        read.assert_not_called()
+        self.assertEqual([doc.text for doc in docs], [read_file(path) for path in self.paths[:2]])
+
+    def test_score_documents_sends_token_lengths(self):
+        """内存中的文档只发送原文和词长数组，结果与单进程一致"""
+        original = Document(read_file(self.original))
+        original.tokens
+        text, lengths, _ = parallel._document_payload(original)
+        self.assertIs(text, original.text)
+        self.assertIsInstance(lengths, bytes)
+        self.assertEqual(parallel._restore_document(text, lengths, None).tokens, original.tokens)
+
+        # 未分词的文档和字符 n-gram 分词的文档由工作进程分词
+        candidates = [
+            Document(read_file(self.paths[0])),
+            Document(read_file(self.paths[1]), tokenizer=CharNgramTokenizer(2)),
+        ]
+        self.assertIsNone(parallel._document_payload(candidates[0])[1])
+        pairs = [(original, doc) for doc in candidates]
+        calculator = SimilarityCalculator()
+        expected = [calculator.calculate_jaccard_similarity(*pair) for pair in pairs]
+        self.assertEqual(self.scorer.score_documents(pairs, 'jaccard'), expected)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ParallelScorer(workers=0)
+        with self.assertRaises(ValueError):
+            self.scorer.score_pairs([(self.original, self.paths[0])], metric='unknown')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import main
+import profiling
+from cache_isolation import setUpModule, tearDownModule
+from profiling import Profiler, add_hook, note, remove_hook, stage
+from similarity_calculator import SimilarityCalculator
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_disabled_is_noop(self):
+        """未启用时阶段上下文返回 None，note 被忽略"""
+        with stage('idle') as record:
+            note('branch', 'cosine')
+        self.assertIsNone(record)
+        self.assertEqual(profiling._stack, [])
+
+    def test_nested_stages_and_memory(self):
+        """嵌套阶段记录深度，内层的内存峰值计入外层"""
+        with Profiler() as profiler:
+            with stage('outer', input_sizes=[1]):
+                with stage('inner'):
+                    data = bytearray(8 * 1024 * 1024)
+                    del data
+                note('branch', 'outer-branch')
+
+        outer, inner = profiler.records
+        self.assertEqual((outer['name'], outer['depth']), ('outer', 0))
+        self.assertEqual((inner['name'], inner['depth']), ('inner', 1))
+        self.assertEqual(outer['branch'], 'outer-branch')
+        self.assertGreaterEqual(inner['peak_memory_bytes'], 8 * 1024 * 1024)
+        self.assertGreaterEqual(outer['peak_memory_bytes'], inner['peak_memory_bytes'])
+        self.assertGreaterEqual(outer['wall_seconds'], inner['wall_seconds'])
+
+    def test_hook_receives_metric_branches(self):
+        """回调收到各指标的记录，包括 Jaccard 备用分支"""
+        records = []
+        add_hook(records.append)
+        try:
+            SimilarityCalculator().calculate_cosine_similarity("查重", "查重！")
+        finally:
+            remove_hook(records.append)
+
+        self.assertEqual([record['name'] for record in records], ['jaccard', 'cosine'])
+        self.assertEqual(records[1]['branch'], 'jaccard_fallback')
+        self.assertEqual(records[1]['fallback_reason'], 'short_text')
+        self.assertEqual(records[1]['input_sizes'], [2, 3])
+        self.assertNotIn('peak_memory_bytes', records[1])
+
+    def test_edit_correction_branch(self):
+        """高于 0.95 的余弦相似度记录编辑距离修正"""
+        text = "论文查重系统需要比较两篇文章的相似程度，并给出重复率。" * 5
+        reordered = "并给出重复率。论文查重系统需要比较两篇文章的相似程度，" * 5
+        with Profiler(track_memory=False) as profiler:
+            SimilarityCalculator().calculate_cosine_similarity(text, reordered)
+
+        cosine = next(record for record in profiler.records if record['name'] == 'cosine')
+        self.assertEqual(cosine['branch'], 'cosine')
+        self.assertIn('edit_correction', cosine)
+        self.assertIn('edit', [record['name'] for record in profiler.records])
+
+    def test_main_profile_option(self):
+        """main.py --profile 输出各阶段的 JSON"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "result.txt")
+            profile = os.path.join(temp_dir, "profile.json")
+            main.main([
+                os.path.join(project_root, "orig.txt"), os.path.join(project_root, "orig_0.8_add.txt"),
+                output, '--profile', profile,
+            ])
+            with open(profile, encoding='utf-8') as file:
+                stages = json.load(file)['stages']
+
+        names = [record['name'] for record in stages if record['depth'] == 0]
+        self.assertEqual(names, ['read_file', 'segment', 'cosine', 'write_file'])
+        for record in stages:
+            self.assertIn('wall_seconds', record)
+            self.assertIn('cpu_seconds', record)
+            self.assertIn('peak_memory_bytes', record)
+
+
+if __name__ == "__main__":
+    unittest.main()
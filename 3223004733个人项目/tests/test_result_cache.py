@@ -0,0 +1,162 @@
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import main
+import result_cache
+from cache_isolation import setUpModule, tearDownModule
+from document import Document
+from file_handler import read_file
+from idf_model import IdfModel
+from result_cache import ResultCache, get_result_cache, open_result_cache, set_result_cache
+from similarity_calculator import SimilarityCalculator
+
+TEXT1 = "今天天气很好，我们去公园散步。晚上一起去看电影吧。"
+TEXT2 = "今天天气不错，我们去公园散步。晚上一起去看电视吧。"
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'results.sqlite')
+
+    def tearDown(self):
+        set_result_cache(None)
+        self.temp_dir.cleanup()
+
+    def _key(self, calculator, metric, *args):
+        name = '\0'.join([metric, *map(repr, args)])
+        return ResultCache.key(Document(TEXT1).digest, Document(TEXT2).digest, name, calculator.config_fingerprint())
+
+    def test_calculator_reads_cache_first(self):
+        cache = ResultCache(self.path)
+        calculator = SimilarityCalculator(result_cache=cache)
+        cache.put(self._key(calculator, 'cosine'), 0.1234)
+
+        self.assertEqual(calculator.calculate_cosine_similarity(TEXT1, TEXT2), 0.1234)
+        self.assertEqual(calculator.calculate_similarity(TEXT1, TEXT2, 'cosine'), 0.1234)
+
+    def test_miss_stores_result_in_both_tiers(self):
+        calculator = SimilarityCalculator(result_cache=ResultCache(self.path))
+        expected = SimilarityCalculator().calculate_comprehensive_similarity(TEXT1, TEXT2)
+
+        self.assertEqual(calculator.calculate_comprehensive_similarity(TEXT1, TEXT2), expected)
+        # 新的缓存对象内存层为空，只能从磁盘层读到
+        fresh = ResultCache(self.path)
+        self.assertEqual(fresh.get(self._key(calculator, 'comprehensive')), expected)
+
+    def test_threshold_verdict_is_cached(self):
+        calculator = SimilarityCalculator(result_cache=ResultCache(self.path))
+        verdict = calculator.check_threshold(TEXT1, TEXT2, 0.5)
+
+        self.assertEqual(calculator.check_threshold(TEXT1, TEXT2, 0.5), verdict)
+        self.assertEqual(ResultCache(self.path).get(self._key(calculator, 'threshold', 0.5)), verdict)
+        self.assertIsNone(ResultCache(self.path).get(self._key(calculator, 'threshold', 0.6)))
+
+    def test_batch_scores_are_cached_per_pair(self):
+        """一对多和两两比较逐对查找缓存，同一批文档再次计算时不再修正得分"""
+        names = ["orig.txt", "orig_0.8_add.txt", "orig_0.8_del.txt", "orig_0.8_dis_10.txt"]
+        docs = [Document(read_file(os.path.join(project_root, name))) for name in names]
+        for model in (None, IdfModel.fit(docs, min_df=1)):
+            with self.subTest(idf_model=model is not None):
+                calculator = SimilarityCalculator(model, result_cache=ResultCache(':memory:'))
+                expected = SimilarityCalculator(model)
+                one_to_many = expected.calculate_one_to_many_similarity(docs[0], docs[1:])
+                pairwise = expected.calculate_pairwise_similarity(docs)
+
+                self.assertEqual(calculator.calculate_one_to_many_similarity(docs[0], docs[1:]), one_to_many)
+                self.assertEqual(calculator.calculate_pairwise_similarity(docs), pairwise)
+                with mock.patch.object(SimilarityCalculator, '_correct_high_similarity', side_effect=AssertionError), \
+                        mock.patch.object(SimilarityCalculator, '_tfidf_matrix', side_effect=AssertionError):
+                    self.assertEqual(calculator.calculate_one_to_many_similarity(docs[0], docs[1:]), one_to_many)
+                with mock.patch.object(SimilarityCalculator, '_correct_high_similarity', side_effect=AssertionError):
+                    self.assertEqual(calculator.calculate_pairwise_similarity(docs), pairwise)
+
+        # 没有 IDF 模型时得分依赖整批文档，换一批文档不会命中
+        calculator = SimilarityCalculator(result_cache=ResultCache(':memory:'))
+        calculator.calculate_one_to_many_similarity(docs[0], docs[1:])
+        self.assertEqual(
+            calculator.calculate_one_to_many_similarity(docs[0], docs[1:3]),
+            SimilarityCalculator().calculate_one_to_many_similarity(docs[0], docs[1:3]),
+        )
+
+    def test_config_changes_invalidate(self):
+        base = SimilarityCalculator().config_fingerprint()
+        other_stop_words = SimilarityCalculator()
+        other_stop_words.stop_words = other_stop_words.stop_words | {'天气'}
+        model = IdfModel.fit([TEXT1, TEXT2], min_df=1)
+
+        fingerprints = [
+            base,
+            SimilarityCalculator(structure='substring').config_fingerprint(),
+            other_stop_words.config_fingerprint(),
+            SimilarityCalculator(idf_model=model).config_fingerprint(),
+            SimilarityCalculator(idf_model=IdfModel.fit([TEXT1], min_df=1)).config_fingerprint(),
+        ]
+        self.assertEqual(len(set(fingerprints)), len(fingerprints))
+        self.assertEqual(SimilarityCalculator(idf_model=model).config_fingerprint(), fingerprints[3])
+        with mock.patch('similarity_calculator.COMPREHENSIVE_WEIGHTS', (0.5, 0.4, 0.1)):
+            self.assertNotEqual(SimilarityCalculator().config_fingerprint(), base)
+
+    def test_memory_tier_is_lru(self):
+        cache = ResultCache(':memory:', memory_size=2)
+        cache.put('a', 0.1)
+        cache.put('b', 0.2)
+        self.assertEqual(cache.get('a'), 0.1)
+        cache.put('c', 0.3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 0.1)
+        self.assertEqual(cache.get('c'), 0.3)
+
+    def test_disk_tier_evicts_least_recently_used(self):
+        cache = ResultCache(self.path, memory_size=1, max_rows=10)
+        with mock.patch.object(result_cache, '_EVICT_CHECK_INTERVAL', 1):
+            for i in range(11):
+                cache.put(str(i), i)
+
+        self.assertIsNone(ResultCache(self.path).get('0'))
+        self.assertEqual(ResultCache(self.path).get('10'), 10)
+
+    def test_pickle_reopens_same_database(self):
+        cache = ResultCache(self.path)
+        cache.put('key', 0.5)
+        clone = pickle.loads(pickle.dumps(cache))
+
+        self.assertEqual(clone.path, self.path)
+        self.assertEqual(clone.get('key'), 0.5)
+
+    def test_default_cache(self):
+        with mock.patch.dict(os.environ, {'PAPER_CHECK_RESULT_CACHE': self.path}):
+            set_result_cache(None)
+            self.assertIs(get_result_cache(), open_result_cache(self.path))
+        with mock.patch.dict(os.environ, {'PAPER_CHECK_RESULT_CACHE': '0'}):
+            set_result_cache(None)
+            self.assertIsNone(get_result_cache())
+            self.assertIsNone(SimilarityCalculator().result_cache)
+
+    def test_main_result_cache(self):
+        original = os.path.join(project_root, "orig.txt")
+        comparison = os.path.join(project_root, "orig_0.8_dis_10.txt")
+        output = os.path.join(self.temp_dir.name, 'result.txt')
+        args = [original, comparison, output, '--result-cache', '--result-cache-path', self.path]
+
+        main.main(args)
+        first = read_file(output)
+        with mock.patch('similarity_calculator.SimilarityCalculator._create_vectorizer', side_effect=AssertionError):
+            main.main(args)
+        self.assertEqual(read_file(output), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import sys
+import tempfile
+import unittest
+from collections import Counter
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+from document import Document
+from file_handler import read_file
+from hashing import TermHasher
+from revision import RevisionChecker, RevisionState, check_revision, load_state, split_lines
+from tokenization import CharNgramTokenizer
+
+
+def revise(text):
+    """修改、删除、挪动和插入若干段落，最后一段不带换行"""
+    lines = split_lines(text)
+    lines[3] = "这是完全改写过的一段，内容与原文不同。\n"
+    lines[10] = lines[10].replace('的', '之', 2)
+    del lines[20]
+    lines.insert(5, lines.pop(40))
+    lines.insert(30, "\n新增的一段话。\n\n")
+    return ''.join(lines) + "结尾没有换行"
+
+
+class TestRevisionState(unittest.TestCase):
+
+    def setUp(self):
+        self.original = read_file(os.path.join(project_root, "orig.txt"))
+        self.revised = revise(self.original)
+
+    def assert_matches_scratch(self, state, text, tokenizer=None):
+        document = Document(text, tokenizer=tokenizer)
+        expected = state.hasher.vector(document)
+        vector = state.vector()
+        self.assertEqual(vector.keys(), expected.keys())
+        for index, weight in expected.items():
+            self.assertAlmostEqual(vector[index], weight, places=12)
+        self.assertEqual(set(state.shingles), document.bigrams)
+        self.assertEqual(state.text, text)
+        self.assertEqual(state.document().tokens, document.tokens)
+
+    def test_split_lines(self):
+        self.assertEqual(split_lines("第一段\n\n第二段"), ["第一段\n", "\n", "第二段"])
+        self.assertEqual(split_lines(""), [])
+
+    def test_incremental_update_matches_scratch(self):
+        state = RevisionState()
+        stats = state.update(self.original)
+        self.assertEqual(stats['reused'], 0)
+        self.assert_matches_scratch(state, self.original)
+
+        stats = state.update(self.revised)
+        self.assert_matches_scratch(state, self.revised)
+        # 只有上一稿中找不到相同内容的行需要重新分词（挪动的段落直接沿用）
+        old_lines = Counter(split_lines(self.original))
+        new_lines = Counter(split_lines(self.revised))
+        self.assertEqual(stats['added'], sum((new_lines - old_lines).values()))
+        self.assertEqual(stats['removed'], sum((old_lines - new_lines).values()))
+        self.assertEqual(stats['reused'], stats['paragraphs'] - stats['added'])
+        self.assertLess(stats['added'], 10)
+
+        # 改回原稿
+        state.update(self.original)
+        self.assert_matches_scratch(state, self.original)
+
+    def test_char_ngram_tokenizer(self):
+        tokenizer = CharNgramTokenizer(2)
+        state = RevisionState(tokenizer=tokenizer)
+        state.update(self.original)
+        state.update(self.revised)
+        self.assert_matches_scratch(state, self.revised, tokenizer)
+
+    def test_save_and_load(self):
+        state = RevisionState()
+        state.update(self.original)
+        state.update(self.revised)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'paper.state')
+            state.save(path)
+            loaded = RevisionState.load(path)
+            self.assertEqual(loaded.revision, 2)
+            self.assert_matches_scratch(loaded, self.revised)
+            self.assertEqual(loaded.update(self.revised)['added'], 0)
+
+            with self.assertRaises(ValueError):
+                RevisionState.load(path, TermHasher(2 ** 16))
+            self.assertEqual(len(load_state(path, TermHasher(2 ** 16))), 0)
+            self.assertEqual(len(load_state(os.path.join(temp_dir, 'missing.state'))), 0)
+
+    def test_checker_scores(self):
+        archive = [Document(read_file(os.path.join(project_root, name)))
+                   for name in ("orig_0.8_add.txt", "orig_0.8_dis_15.txt")]
+        state = RevisionState()
+        state.update(self.original)
+        checker = RevisionChecker(archive, state.hasher)
+        before = checker.score(state)
+        state.update(self.revised)
+        after = checker.score(state)
+
+        revised = Document(self.revised)
+        for document, score in zip(archive, after):
+            expected = state.hasher.cosine(state.hasher.vector(revised), state.hasher.vector(document))
+            self.assertAlmostEqual(score['cosine'], expected, places=12)
+            union = revised.bigrams | document.bigrams
+            self.assertAlmostEqual(score['jaccard'], len(revised.bigrams & document.bigrams) / len(union))
+        self.assertNotEqual(before, after)
+
+    def test_check_revision(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, 'archive')
+            os.mkdir(archive)
+            for name in ("orig_0.8_add.txt", "orig_0.8_del.txt"):
+                with open(os.path.join(archive, name), 'w', encoding='utf-8') as file:
+                    file.write(read_file(os.path.join(project_root, name)))
+            submission = os.path.join(temp_dir, 'draft.txt')
+            state_path = os.path.join(temp_dir, 'draft.state')
+            output = os.path.join(temp_dir, 'result.csv')
+
+            with open(submission, 'w', encoding='utf-8') as file:
+                file.write(self.original)
+            check_revision(submission, archive, output, state_path)
+            with open(submission, 'w', encoding='utf-8') as file:
+                file.write(self.revised)
+            records, stats = check_revision(submission, archive, output, state_path)
+
+            changed = Counter(split_lines(self.revised)) - Counter(split_lines(self.original))
+            self.assertEqual(stats['added'], sum(changed.values()))
+            self.assertEqual([record['rank'] for record in records], [1, 2])
+            self.assertEqual(len(read_file(output).splitlines()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+from document import Document
+from file_handler import read_file
+from main import calculate_segment_similarity
+from segments import SegmentComparer, compare_segments, split_segments
+
+
+class TestSegments(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.original = read_file(os.path.join(project_root, "orig.txt"))
+        cls.comparison = read_file(os.path.join(project_root, "orig_0.8_add.txt"))
+
+    def test_split_offsets(self):
+        """片段偏移去除首尾空白并跳过空行"""
+        text = "  第一段。第二句！\n\n 第二段\n"
+        self.assertEqual([text[s:e] for s, e in split_segments(text)], ["第一段。第二句！", "第二段"])
+        self.assertEqual([text[s:e] for s, e in split_segments(text, 'sentence')], ["第一段。", "第二句！", "第二段"])
+        with self.assertRaises(ValueError):
+            split_segments(text, 'chapter')
+
+    def test_candidates_share_terms(self):
+        """候选段落按共有词语数排序，没有共有词语的段落不参与比较"""
+        comparer = SegmentComparer(max_candidates=2)
+        original = [Document("论文查重系统比较文本相似度", comparer.calculator.stop_words)]
+        comparison = [
+            Document("今天天气很好", comparer.calculator.stop_words),
+            Document("查重系统比较相似度", comparer.calculator.stop_words),
+            Document("论文查重系统", comparer.calculator.stop_words),
+        ]
+        self.assertEqual(comparer.candidate_pairs(original, comparison), [(0, 1), (0, 2)])
+
+    def test_report(self):
+        """每个原文段落都有记录，文档得分介于 0 和 1 之间"""
+        report = compare_segments(self.original, self.comparison)
+        self.assertEqual(len(report['segments']), len(split_segments(self.original)))
+        self.assertLessEqual(report['candidate_pairs'], 3 * len(report['segments']))
+        self.assertGreater(report['score'], 0.5)
+        for record in report['segments']:
+            if record['comparison_index'] is not None:
+                self.assertGreater(record['comparison_end'], record['comparison_start'])
+
+    def test_unrelated_text_scores_lower(self):
+        half = len(self.original) // 2
+        unrelated = compare_segments(self.original[:half], self.original[half:])
+        self.assertLess(unrelated['score'], compare_segments(self.original, self.comparison)['score'])
+
+    def test_parallel_matches_serial(self):
+        serial = compare_segments(self.original, self.comparison, metric='jaccard')
+        parallel = compare_segments(self.original, self.comparison, metric='jaccard', workers=2)
+        self.assertEqual(parallel, serial)
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            SegmentComparer(metric='bm25')
+
+    def test_cli_report(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "result.txt")
+            report = calculate_segment_similarity(
+                os.path.join(project_root, "orig.txt"), os.path.join(project_root, "orig_0.8_add.txt"), output
+            )
+            lines = read_file(output).splitlines()
+        self.assertTrue(lines[0].startswith(f"相似度: {report['score']:.2%}"))
+        self.assertEqual(len(lines), len(report['segments']) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
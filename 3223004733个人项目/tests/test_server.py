@@ -0,0 +1,173 @@
+import io
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import client
+from cache_isolation import setUpModule, tearDownModule
+from server import create_server, run_command
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "需要 Unix 套接字支持")
+class TestCheckServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.address = os.path.join(cls.temp_dir.name, "check.sock")
+        cls.server = create_server(cls.address)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+        cls.temp_dir.cleanup()
+
+    def output_path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_matches_in_process_run(self):
+        """服务端结果文件、输出和退出码与直接运行 main.py 一致"""
+        argv = [os.path.join(project_root, "orig.txt"), os.path.join(project_root, "orig_0.8_add.txt")]
+        response = client.send_request(argv + [self.output_path("served.txt")], address=self.address)
+        expected = run_command(argv + [self.output_path("local.txt")])
+
+        self.assertEqual(response, expected)
+        self.assertEqual(response['exit_code'], 0)
+        self.assertIn("查重完成", response['stdout'])
+        with open(self.output_path("served.txt"), encoding='utf-8') as served, \
+                open(self.output_path("local.txt"), encoding='utf-8') as local:
+            self.assertEqual(served.read(), local.read())
+
+    def test_relative_paths_use_client_cwd(self):
+        """相对路径按客户端的工作目录解析"""
+        response = client.send_request(
+            ["orig.txt", "orig_0.8_del.txt", self.output_path("relative.txt")],
+            cwd=project_root, address=self.address,
+        )
+        self.assertEqual(response['exit_code'], 0)
+        self.assertTrue(os.path.exists(self.output_path("relative.txt")))
+
+    def test_errors_keep_exit_codes(self):
+        """文件不存在和参数错误时返回与 main.py 相同的退出码"""
+        missing = client.send_request(
+            ["missing.txt", "orig.txt", self.output_path("missing.txt")], cwd=project_root, address=self.address
+        )
+        self.assertEqual(missing['exit_code'], 1)
+        self.assertIn("文件未找到", missing['stdout'])
+
+        usage = client.send_request(["orig.txt"], address=self.address)
+        self.assertEqual(usage['exit_code'], 2)
+        self.assertTrue(usage['stderr'])
+
+    def test_second_server_refuses_live_socket(self):
+        """已有服务运行时不会删除其套接字文件"""
+        with self.assertRaises(OSError):
+            create_server(self.address)
+        self.assertTrue(os.path.exists(self.address))
+
+
+class TestClient(unittest.TestCase):
+
+    def test_default_socket_in_private_dir(self):
+        """默认套接字位于 $XDG_RUNTIME_DIR 下当前用户私有的目录中"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            previous = os.environ.get('XDG_RUNTIME_DIR')
+            os.environ['XDG_RUNTIME_DIR'] = temp_dir
+            try:
+                path = client.default_socket_path()
+            finally:
+                if previous is None:
+                    del os.environ['XDG_RUNTIME_DIR']
+                else:
+                    os.environ['XDG_RUNTIME_DIR'] = previous
+            self.assertEqual(os.path.dirname(path), os.path.join(temp_dir, 'paper_check'))
+            self.assertFalse(path.startswith(os.path.join(tempfile.gettempdir(), 'paper_check')))
+
+            directory = os.path.dirname(path)
+            os.makedirs(directory, mode=0o755)
+            os.chmod(directory, 0o755)
+            client.ensure_private_dir(directory)
+            self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "需要 Unix 套接字支持")
+    def test_refuses_foreign_socket_file(self):
+        """套接字路径上不是本用户套接字的文件既不会被连接，也不会被服务删除"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            address = os.path.join(temp_dir, "check.sock")
+            with open(address, 'w', encoding='utf-8'):
+                pass
+            with self.assertRaises(PermissionError):
+                client.connect(address)
+            with self.assertRaises(PermissionError):
+                create_server(address)
+            self.assertTrue(os.path.exists(address))
+
+    def test_parse_address(self):
+        self.assertEqual(client.parse_address("127.0.0.1:8765"), ("127.0.0.1", 8765))
+        self.assertEqual(client.parse_address(":9000"), ("127.0.0.1", 9000))
+        self.assertEqual(client.parse_address("/tmp/check.sock"), "/tmp/check.sock")
+
+    def test_falls_back_to_local_run(self):
+        """服务未运行时客户端在进程内执行"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "result.txt")
+            os.environ[client.SERVER_ENV] = os.path.join(temp_dir, "absent.sock")
+            try:
+                exit_code = client.main([
+                    os.path.join(project_root, "orig.txt"), os.path.join(project_root, "orig_0.8_add.txt"), output
+                ])
+            finally:
+                del os.environ[client.SERVER_ENV]
+            self.assertEqual(exit_code, 0)
+            self.assertTrue(os.path.exists(output))
+
+    def test_no_local_rerun_after_request_sent(self):
+        """请求发出后连接中断时报告错误，不在本进程中重复执行"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            address = os.path.join(temp_dir, "broken.sock")
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(address)
+            listener.listen(1)
+
+            def drop_connection():
+                # 读完请求后不返回结果直接断开，模拟服务端执行过程中连接被重置
+                conn, _ = listener.accept()
+                with conn, conn.makefile('rb') as reader:
+                    reader.readline()
+
+            thread = threading.Thread(target=drop_connection, daemon=True)
+            thread.start()
+            output = os.path.join(temp_dir, "result.txt")
+            os.environ[client.SERVER_ENV] = address
+            try:
+                with mock.patch.object(client, 'run_local') as run_local, \
+                        mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                    exit_code = client.main([
+                        os.path.join(project_root, "orig.txt"), os.path.join(project_root, "orig_0.8_add.txt"), output
+                    ])
+            finally:
+                del os.environ[client.SERVER_ENV]
+                thread.join()
+                listener.close()
+            self.assertEqual(exit_code, 1)
+            run_local.assert_not_called()
+            self.assertIn("未在本进程中重试", stderr.getvalue())
+            self.assertFalse(os.path.exists(output))
+
+
+if __name__ == "__main__":
+    unittest.main()
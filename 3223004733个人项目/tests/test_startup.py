@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import jieba
+
+import jieba_dict
+from cache_isolation import setUpModule, tearDownModule
+
+HEAVY_MODULES = ['numpy', 'scipy', 'sklearn', 'jieba', 'chardet']
+
+
+def loaded_heavy_modules(code):
+    """在新进程中执行代码，返回其中已加载的重量级模块"""
+    script = code + f"\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ, PAPER_CHECK_TOKEN_CACHE='0')
+    result = subprocess.run([sys.executable, '-c', script], cwd=project_root, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_import_main_is_light(self):
+        """导入 main 不加载 numpy、sklearn、jieba 和 chardet"""
+        self.assertEqual(loaded_heavy_modules("import main"), [])
+
+    def test_jaccard_fallback_skips_sklearn(self):
+        """过短文本走 Jaccard 备用路径，不导入 sklearn 和 numpy"""
+        loaded = loaded_heavy_modules(
+            "from similarity_calculator import SimilarityCalculator\n"
+            "SimilarityCalculator().calculate_cosine_similarity('查重', '查重！')"
+        )
+        self.assertNotIn('sklearn', loaded)
+        self.assertNotIn('numpy', loaded)
+
+
+class TestJiebaDictCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cache_matches_jieba_prefix_dict(self):
+        """缓存的前缀词典与 jieba 自己构建的一致，第二次直接从缓存读取"""
+        tokenizer = jieba.Tokenizer()
+        expected = tokenizer.gen_pfdict(tokenizer.get_dict_file())
+
+        self.assertEqual(jieba_dict._load_prefix_dict(tokenizer, self.temp_dir.name), expected)
+        path = jieba_dict.cache_path(self.temp_dir.name)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(jieba_dict._load_prefix_dict(tokenizer, self.temp_dir.name), expected)
+
+    def test_corrupted_cache_is_rebuilt(self):
+        path = jieba_dict.build_cache(self.temp_dir.name)
+        with open(path, 'wb') as file:
+            file.write(b'broken')
+        freq, total = jieba_dict._load_prefix_dict(jieba.Tokenizer(), self.temp_dir.name)
+        self.assertGreater(total, 0)
+        self.assertIn('论文', freq)
+
+    def test_segmentation_matches_jieba(self):
+        """通过缓存加载词典的分词结果与 jieba 原生加载一致"""
+        text = "论文查重系统使用结巴分词对中文文本进行切分。"
+        self.assertEqual(jieba_dict.get_tokenizer(self.temp_dir.name).lcut(text), jieba.Tokenizer().lcut(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import random
+import sys
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+from file_handler import read_file
+from similarity_calculator import SimilarityCalculator
+from substring import CommonSubstringFinder, SuffixAutomaton, find_common_substrings
+
+
+def brute_force_coverage(text1, text2, min_length):
+    """逐个枚举子串计算覆盖率，作为对照"""
+    def covered(text, other):
+        flags = [False] * len(text)
+        for start in range(len(text)):
+            for end in range(start + min_length, len(text) + 1):
+                if text[start:end] in other:
+                    flags[start:end] = [True] * (end - start)
+        return sum(flags)
+    return (covered(text1, text2) + covered(text2, text1)) / (len(text1) + len(text2))
+
+
+class TestSubstring(unittest.TestCase):
+
+    def test_match_lengths_against_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            text1 = ''.join(rng.choice('ab') for _ in range(rng.randrange(1, 25)))
+            text2 = ''.join(rng.choice('abc') for _ in range(rng.randrange(1, 25)))
+            lengths, ends = SuffixAutomaton(text1).match_lengths(text2)
+            for position, length in enumerate(lengths):
+                expected = max(
+                    size for size in range(position + 2)
+                    if text2[position + 1 - size:position + 1] in text1
+                )
+                self.assertEqual(length, expected)
+                if length:
+                    self.assertEqual(text1[ends[position] + 1 - length:ends[position] + 1],
+                                     text2[position + 1 - length:position + 1])
+
+    def test_coverage_against_brute_force(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            text1 = ''.join(rng.choice('ab') for _ in range(rng.randrange(1, 20)))
+            text2 = ''.join(rng.choice('abc') for _ in range(rng.randrange(1, 20)))
+            min_length = rng.randrange(1, 5)
+            self.assertAlmostEqual(
+                CommonSubstringFinder(min_length).coverage(text1, text2),
+                brute_force_coverage(text1, text2, min_length),
+            )
+
+    def test_maximal_spans(self):
+        original = "今天天气很好，我们去公园散步。晚上一起去看电影吧。"
+        comparison = "晚上一起去看电影吧。今天天气很好，我们去公园散步。"
+        report = find_common_substrings(original, comparison, min_length=4)
+
+        self.assertEqual(report['coverage'], 1.0)
+        self.assertEqual([span['length'] for span in report['spans']], [10, 15])
+        for span in report['spans']:
+            self.assertEqual(original[span['original_start']:span['original_end']],
+                             comparison[span['comparison_start']:span['comparison_end']])
+
+    def test_reordering_keeps_coverage(self):
+        """段落调换顺序时覆盖率几乎不变，编辑距离相似度明显下降"""
+        text = read_file(os.path.join(project_root, "orig.txt"))
+        paragraphs = text.split('\n')
+        reordered = '\n'.join(paragraphs[len(paragraphs) // 2:] + paragraphs[:len(paragraphs) // 2])
+        calculator = SimilarityCalculator()
+
+        self.assertGreater(calculator.calculate_substring_similarity(text, reordered), 0.99)
+        self.assertLess(calculator.calculate_similarity(text, reordered, 'edit'), 0.9)
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(find_common_substrings('', '')['coverage'], 1.0)
+        self.assertEqual(find_common_substrings('abc', '')['coverage'], 0.0)
+        with self.assertRaises(ValueError):
+            CommonSubstringFinder(0)
+
+    def test_comprehensive_with_substring_structure(self):
+        calculator = SimilarityCalculator(structure='substring')
+        text1 = read_file(os.path.join(project_root, "orig.txt"))
+        text2 = read_file(os.path.join(project_root, "orig_0.8_dis_10.txt"))
+        score = calculator.calculate_comprehensive_similarity(text1, text2)
+
+        self.assertTrue(0.0 <= score <= 1.0)
+        for threshold in (0.3, score, score + 0.01, 0.95):
+            with self.subTest(threshold=threshold):
+                self.assertEqual(calculator.check_threshold(text1, text2, threshold)['above'], score >= threshold)
+        with self.assertRaises(ValueError):
+            SimilarityCalculator(structure='lcs')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+import similarity_calculator
+from document import Document
+from file_handler import read_file
+from main import check_similarity_threshold
+from similarity_calculator import SimilarityCalculator
+
+
+class TestThreshold(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.calculator = SimilarityCalculator()
+        original = read_file(os.path.join(project_root, "orig.txt"))
+        cls.pairs = {
+            'add': (original, read_file(os.path.join(project_root, "orig_0.8_add.txt"))),
+            'dis_15': (original, read_file(os.path.join(project_root, "orig_0.8_dis_15.txt"))),
+            'dis_1': (original, read_file(os.path.join(project_root, "orig_0.8_dis_1.txt"))),
+            'halves': (original[:len(original) // 2], original[len(original) // 2:]),
+            'short': (original[:300], original[:30]),
+        }
+
+    def test_verdict_matches_full_score(self):
+        """各种阈值下的判定与完整计算综合相似度后比较的结果一致"""
+        for name, (text1, text2) in self.pairs.items():
+            doc1, doc2 = Document(text1), Document(text2)
+            score = self.calculator.calculate_comprehensive_similarity(doc1, doc2)
+            for threshold in [0.0, 0.1, 0.3, 0.5, score, score + 0.0001, 0.9, 1.0]:
+                with self.subTest(pair=name, threshold=threshold):
+                    verdict = self.calculator.check_threshold(doc1, doc2, threshold)
+                    self.assertEqual(verdict['above'], score >= threshold)
+                    self.assertLessEqual(verdict['lower_bound'], score)
+                    self.assertGreaterEqual(verdict['upper_bound'], score)
+
+    def test_cheap_stages_decide_clear_cases(self):
+        """明显的情况在计算编辑距离之前就能确定"""
+        text1, text2 = self.pairs['short']
+        self.assertEqual(self.calculator.check_threshold(text1, text2, 0.9)['decided_by'], 'length')
+        text1, text2 = self.pairs['add']
+        self.assertEqual(self.calculator.check_threshold(text1, text2, 0.3)['decided_by'], 'cosine')
+
+    def test_edit_distance_computed_once(self):
+        """余弦相似度需要高相似度修正时，编辑距离只在 edit 阶段计算一次，修正与编辑相似度共用结果"""
+        doc1, doc2 = (Document(text) for text in self.pairs['dis_1'])
+        score = self.calculator.calculate_comprehensive_similarity(doc1, doc2)
+        doc1, doc2 = (Document(text) for text in self.pairs['dis_1'])
+        with mock.patch.object(similarity_calculator, 'levenshtein', wraps=similarity_calculator.levenshtein) as distance, \
+                mock.patch.object(similarity_calculator, 'edit_similarity') as edit_similarity:
+            verdict = self.calculator.check_threshold(doc1, doc2, score)
+        self.assertEqual((verdict['above'], verdict['decided_by']), (True, 'edit'))
+        self.assertEqual(verdict['lower_bound'], score)
+        self.assertEqual(distance.call_count, 1)
+        edit_similarity.assert_not_called()
+
+    def test_empty_text(self):
+        self.assertTrue(self.calculator.check_threshold("", "", 1.0)['above'])
+        self.assertFalse(self.calculator.check_threshold("论文", "", 0.1)['above'])
+
+    def test_cli_writes_verdict(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "result.txt")
+            verdict = check_similarity_threshold(
+                os.path.join(project_root, "orig.txt"), os.path.join(project_root, "orig_0.8_add.txt"), output, 0.3
+            )
+            self.assertTrue(verdict['above'])
+            with open(output, encoding='utf-8') as file:
+                self.assertIn("不低于阈值 30.00%", file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import document
+from cache_isolation import setUpModule, tearDownModule
+from file_handler import read_file
+from token_cache import TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = TokenCache(cache_dir=self.temp_dir.name, config='test')
+        self.text = read_file(os.path.join(project_root, "orig.txt"))
+
+    def tearDown(self):
+        document.set_token_cache(None)
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """写入后读取得到相同的分词结果"""
+        tokens = ['论文', '查重', '，', '系统']
+        text = ''.join(tokens)
+        self.assertIsNone(self.cache.get(text))
+        self.cache.put(text, tokens)
+        self.assertEqual(self.cache.get(text), tokens)
+
+    def test_config_isolation(self):
+        """配置不同的缓存互不命中"""
+        tokens = ['论文', '查重']
+        self.cache.put('论文查重', tokens)
+        other = TokenCache(cache_dir=self.temp_dir.name, config='other')
+        self.assertIsNone(other.get('论文查重'))
+
+    def test_rejects_inconsistent_tokens(self):
+        """分词结果拼接后与原文不一致时不缓存"""
+        self.cache.put('论文查重', ['论文'])
+        self.assertIsNone(self.cache.get('论文查重'))
+
+    def test_lru_eviction(self):
+        """超过大小上限时淘汰最久未使用的条目"""
+        texts = ['第一篇', '第二篇', '第三篇']
+        for age, text in zip([300, 100, 200], texts):
+            self.cache.put(text, [text[:2], text[2:]])
+            path = self.cache._path(self.cache.key(text))
+            os.utime(path, (age, age))
+        entry_size = os.path.getsize(self.cache._path(self.cache.key(texts[0])))
+
+        self.cache.evict(target_bytes=entry_size * 2)
+        self.assertIsNone(self.cache.get('第二篇'))
+        self.assertIsNotNone(self.cache.get('第一篇'))
+        self.assertIsNotNone(self.cache.get('第三篇'))
+
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('第一篇'))
+
+    def test_segment_skips_jieba_on_hit(self):
+        """缓存命中时不再调用 jieba"""
+        document.set_token_cache(TokenCache(cache_dir=self.temp_dir.name, config=document.tokenizer_config()))
+        first = document.segment(self.text)
+        with mock.patch.object(document, 'get_tokenizer') as get_tokenizer:
+            second = document.segment(self.text)
+            get_tokenizer.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_cache_can_be_disabled(self):
+        with mock.patch.dict(os.environ, {'PAPER_CHECK_TOKEN_CACHE': '0'}):
+            self.assertIsNone(document.get_token_cache())
+
+
+if __name__ == "__main__":
+    unittest.main()
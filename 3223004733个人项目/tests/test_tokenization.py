@@ -0,0 +1,116 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+import main
+from cache_isolation import setUpModule, tearDownModule
+from corpus_store import CorpusWriter
+from document import Document, tokenizer_config
+from file_handler import read_file
+from parallel import ParallelScorer
+from similarity_calculator import SimilarityCalculator
+from tokenization import (
+    CharNgramTokenizer, JiebaTokenizer, create_tokenizer, get_default_tokenizer, set_default_tokenizer,
+)
+
+VARIANT_FILES = [
+    "orig_0.8_add.txt",
+    "orig_0.8_del.txt",
+    "orig_0.8_dis_1.txt",
+    "orig_0.8_dis_10.txt",
+    "orig_0.8_dis_15.txt",
+]
+
+
+class TestTokenization(unittest.TestCase):
+
+    def tearDown(self):
+        set_default_tokenizer(None)
+
+    def test_char_ngrams(self):
+        """汉字串取重叠的 n 字片段，其他文字和数字整体作为一个词，标点被丢弃"""
+        self.assertEqual(
+            CharNgramTokenizer(2).tokenize("今天天气，GPT-4 很好"),
+            ['今天', '天天', '天气', 'GPT', '4', '很好'],
+        )
+        self.assertEqual(CharNgramTokenizer(3).tokenize("今天天气"), ['今天天', '天天气'])
+        # 不足 n 个汉字的片段不产生词语
+        self.assertEqual(CharNgramTokenizer(3).tokenize("今天"), [])
+        with self.assertRaises(ValueError):
+            CharNgramTokenizer(0)
+
+    def test_create_tokenizer(self):
+        self.assertIsInstance(create_tokenizer('jieba'), JiebaTokenizer)
+        self.assertEqual(create_tokenizer('char3').n, 3)
+        with self.assertRaises(ValueError):
+            create_tokenizer('unknown')
+
+    def test_config_depends_on_tokenizer(self):
+        """不同分词器的分词配置和评分配置指纹不同，缓存结果不会混用"""
+        configs = {tokenizer_config(create_tokenizer(name)) for name in ('jieba', 'char2', 'char3')}
+        self.assertEqual(len(configs), 3)
+        fingerprints = {
+            SimilarityCalculator(tokenizer=create_tokenizer(name)).config_fingerprint()
+            for name in ('jieba', 'char2')
+        }
+        self.assertEqual(len(fingerprints), 2)
+
+    def test_document_uses_default_tokenizer(self):
+        set_default_tokenizer(CharNgramTokenizer(2))
+        self.assertEqual(Document("今天天气").tokens, ['今天', '天天', '天气'])
+        set_default_tokenizer(None)
+        self.assertIsInstance(get_default_tokenizer(), JiebaTokenizer)
+
+    def test_ranking_matches_jieba(self):
+        """char2 的综合相似度给出与 jieba 相同的样例排序"""
+        original = read_file(os.path.join(project_root, "orig.txt"))
+        variants = [read_file(os.path.join(project_root, name)) for name in VARIANT_FILES]
+
+        def ranking(tokenizer):
+            calculator = SimilarityCalculator(tokenizer=tokenizer)
+            scores = [calculator.calculate_comprehensive_similarity(original, variant) for variant in variants]
+            return sorted(range(len(scores)), key=lambda index: -scores[index])
+
+        self.assertEqual(ranking(CharNgramTokenizer(2)), ranking(JiebaTokenizer()))
+
+    def test_parallel_load_documents(self):
+        """n-gram 分词器不能用词长数组还原，并行读取时在主进程中分词，结果与单进程一致"""
+        set_default_tokenizer(CharNgramTokenizer(2))
+        paths = [os.path.join(project_root, name) for name in VARIANT_FILES[:2]]
+        with ParallelScorer(2) as scorer:
+            docs = scorer.load_documents(paths)
+        self.assertEqual([doc.tokens for doc in docs], [Document(read_file(path)).tokens for path in paths])
+
+    def test_corpus_store_requires_reversible_tokenizer(self):
+        set_default_tokenizer(CharNgramTokenizer(2))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(ValueError):
+                CorpusWriter(os.path.join(temp_dir, 'corpus.pcc'))
+
+    def test_main_tokenizer_option(self):
+        """--tokenizer 只对本次运行生效"""
+        original_path = os.path.join(project_root, "orig.txt")
+        comparison_path = os.path.join(project_root, VARIANT_FILES[0])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "result.txt")
+            main.main([original_path, comparison_path, output, '--tokenizer', 'char2'])
+            result = read_file(output)
+            main.main([original_path, comparison_path, output])
+            default_result = read_file(output)
+
+        calculator = SimilarityCalculator(tokenizer=CharNgramTokenizer(2))
+        expected = calculator.calculate_cosine_similarity(read_file(original_path), read_file(comparison_path))
+        self.assertEqual(result, f"相似度: {expected:.2%}")
+        self.assertNotEqual(result, default_result)
+        self.assertIsInstance(get_default_tokenizer(), JiebaTokenizer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录（以及 cache_isolation 所在的测试目录）到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.append(current_dir)
+
+from cache_isolation import setUpModule, tearDownModule
+from main import calculate_similarity
+from winnowing import Winnower, kgram_hashes, normalize, winnow
+
+
+class TestWinnowing(unittest.TestCase):
+
+    def setUp(self):
+        self.winnower = Winnower(k=5, window=4)
+
+    def test_normalize_keeps_offsets(self):
+        """规范化文本中的每个字符都能映射回原文"""
+        text = "论文，查重 System_A!"
+        codes, offsets = normalize(text)
+        normalized = ''.join(map(chr, codes))
+        self.assertEqual(normalized, "论文查重systema")
+        self.assertEqual(''.join(text[i] for i in offsets).lower(), normalized)
+
+    def test_winnow_density(self):
+        """每个窗口至少选出一个指纹"""
+        codes, _ = normalize("abcdefghijklmnopqrstuvwxyz" * 3)
+        hashes = kgram_hashes(codes, 5)
+        _, positions = winnow(hashes, 4)
+        self.assertTrue(all(b - a <= 4 for a, b in zip(positions, positions[1:])))
+
+    def test_identical_texts(self):
+        text = "我始终为内心的需要而写作，理智代替不了我的写作，这也是我为什么经常感到自己力不从心的原因"
+        result = self.winnower.compare(text, text)
+        self.assertEqual(result['score'], 1.0)
+        self.assertEqual(len(result['spans']), 1)
+        span = result['spans'][0]
+        # 第一个指纹一定落在第一个窗口内
+        self.assertEqual(span['original_start'], span['comparison_start'])
+        self.assertLess(span['original_start'], self.winnower.window)
+
+    def test_copied_passage_offsets(self):
+        """复制的段落能在两篇文本中定位"""
+        passage = "事实上我只能成为现在这样的作家，我始终为内心的需要而写作"
+        original = "第一章 绪论。" + passage + "。以上是原文的其他内容。"
+        comparison = "这是完全不同的开头部分，讨论别的问题。" + passage + "。结尾"
+        result = self.winnower.compare(original, comparison)
+        self.assertGreater(result['score'], 0.0)
+        self.assertEqual(len(result['spans']), 1)
+
+        span = result['spans'][0]
+        copied1 = original[span['original_start']:span['original_end']]
+        copied2 = comparison[span['comparison_start']:span['comparison_end']]
+        self.assertEqual(copied1, copied2)
+        self.assertIn(copied1, passage)
+        self.assertGreater(len(copied1), len(passage) // 2)
+
+    def test_unrelated_texts(self):
+        result = self.winnower.compare("今天天气晴朗适合出门散步", "机器学习模型需要大量训练数据")
+        self.assertEqual(result['score'], 0.0)
+        self.assertEqual(result['spans'], [])
+
+    def test_large_input(self):
+        """百万字符级输入也能完成比较"""
+        with open(os.path.join(project_root, "orig.txt"), encoding='utf-8') as file:
+            text = file.read()
+        big = text * (1_000_000 // len(text) + 1)
+        result = self.winnower.compare(big, big[len(text) // 2:])
+        self.assertGreater(result['score'], 0.99)
+
+    def test_cli_writes_spans(self):
+        """--spans 将重复片段写在相似度之后"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "result.txt")
+            calculate_similarity(
+                os.path.join(project_root, "orig.txt"),
+                os.path.join(project_root, "orig_0.8_dis_1.txt"),
+                output_path,
+                report_spans=True,
+            )
+            with open(output_path, encoding='utf-8') as file:
+                lines = file.read().splitlines()
+        self.assertTrue(lines[0].startswith("相似度"))
+        self.assertTrue(lines[1].startswith("指纹重合度"))
+        self.assertTrue(any(line.startswith("原文[") for line in lines[3:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,13 @@
 # text_processor.py
-import jieba
-import re  # 添加这行导入语句
+from document import PUNCTUATION_PATTERN, Document
 
 class TextProcessor:
-    def __init__(self):
-        pass
+    def __init__(self, tokenizer=None):
+        """
+        Args:
+            tokenizer (Tokenizer | None): 分词器，默认使用 tokenization.get_default_tokenizer()
+        """
+        self.tokenizer = tokenizer
     
     def process(self, text):
         """
@@ -12,21 +15,28 @@ class TextProcessor:
         
         Args:
             text (str): 输入文本
-            
+        
         Returns:
             str: 分词后的字符串，词语用空格分隔
         """
         if not text or not isinstance(text, str):
             return ""
         
-        # 清洗文本：去除标点符号和特殊字符
-        text = re.sub(r'[^\w\s]', '', text)
-        
-        # 使用jieba分词
-        words = jieba.cut(text)
+        # 先去除标点符号再分词（与最初的实现逐字节一致），过滤空白后词语用空格拼接；
+        # 与 Document(text).processed_text（先分词再逐词去除标点）的切分可能不同
+        return self.to_document(PUNCTUATION_PATTERN.sub('', text)).processed_text
+    
+    def to_document(self, text, stop_words=None):
+        """
+        将文本包装为只分词一次的 Document，供 SimilarityCalculator 直接使用
         
-        # 过滤空字符串和空格
-        words = [word.strip() for word in words if word.strip()]
+        Args:
+            text (str): 输入文本
+            stop_words (set[str] | None): 停用词表，默认使用内置停用词
         
-        # 将词语列表拼接成字符串
-        return ' '.join(words)
\ No newline at end of file
+        Returns:
+            Document: 文档对象
+        """
+        if not isinstance(text, str):
+            text = ""
+        return Document(text, stop_words, tokenizer=self.tokenizer)
\ No newline at end of file
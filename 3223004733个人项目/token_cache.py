@@ -0,0 +1,180 @@
+"""
+分词缓存模块
+
+该模块提供按内容寻址的磁盘分词缓存：键为“分词配置指纹 + 文本内容”的 SHA-256，
+值为压缩后的词长数组（jieba 的分词结果拼接后等于原文，因此只需保存每个词的长度）。
+缓存按总大小上限淘汰最久未使用的条目。
+"""
+
+import hashlib
+import os
+import tempfile
+import zlib
+from array import array
+
+# 缓存文件格式版本，格式变化时递增使旧缓存失效
+CACHE_FORMAT_VERSION = 1
+# 默认缓存大小上限：256 MB
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def split_by_lengths(text, lengths):
+    """
+    按词长数组从原文中切出分词结果
+
+    Args:
+        text (str): 原文
+        lengths (Iterable[int]): 每个词的长度
+
+    Returns:
+        list[str]: 分词结果
+    """
+    tokens = []
+    position = 0
+    for length in lengths:
+        tokens.append(text[position:position + length])
+        position += length
+    return tokens
+
+
+def cache_root():
+    """缓存根目录，可通过环境变量 PAPER_CHECK_CACHE_DIR 指定"""
+    base = os.environ.get('PAPER_CHECK_CACHE_DIR')
+    if base:
+        return base
+    return os.path.join(os.path.expanduser('~'), '.cache', 'paper_check')
+
+
+def default_cache_dir():
+    """默认分词缓存目录"""
+    return os.path.join(cache_root(), 'tokens')
+
+
+class TokenCache:
+    """按内容寻址的磁盘分词缓存"""
+
+    def __init__(self, cache_dir=None, config='', max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str | None): 缓存目录，默认使用 default_cache_dir()
+            config (str): 分词配置指纹，配置不同的缓存互不命中
+            max_bytes (int): 缓存总大小上限（字节）
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._config_digest = hashlib.sha256(
+            f"{CACHE_FORMAT_VERSION}\0{config}".encode('utf-8')
+        ).digest()
+        # 当前缓存总大小，首次写入时扫描目录得到
+        self._total_bytes = None
+
+    def key(self, text):
+        """计算文本在当前配置下的缓存键"""
+        digest = hashlib.sha256(self._config_digest)
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, text):
+        """
+        读取缓存的分词结果
+
+        Args:
+            text (str): 原文
+
+        Returns:
+            list[str] | None: 分词结果，未命中时返回 None
+        """
+        path = self._path(self.key(text))
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            lengths = array('I')
+            lengths.frombytes(zlib.decompress(data))
+        except (OSError, zlib.error, ValueError):
+            return None
+
+        if sum(lengths) != len(text):
+            return None
+
+        # 更新修改时间，作为 LRU 淘汰依据
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return split_by_lengths(text, lengths)
+
+    def put(self, text, tokens):
+        """
+        写入分词结果
+
+        Args:
+            text (str): 原文
+            tokens (list[str]): 分词结果，拼接后必须等于原文，否则不缓存
+        """
+        if ''.join(tokens) != text:
+            return
+
+        data = zlib.compress(array('I', (len(token) for token in tokens)).tobytes())
+        path = self._path(self.key(text))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再原子替换，避免并发读到不完整的数据
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(data)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        """列出全部缓存文件 (修改时间, 大小, 路径)"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target_bytes=None):
+        """
+        按最久未使用顺序删除缓存文件，直到总大小不超过目标值
+
+        Args:
+            target_bytes (int | None): 目标大小，默认为上限的 80%
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.8)
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
+
+    def clear(self):
+        """清空缓存"""
+        self.evict(target_bytes=0)
@@ -0,0 +1,157 @@
+"""
+分词器模块
+
+Document 通过分词器把原文切分为词语，默认使用 jieba。粗筛大量论文时 jieba 分词的耗时远超相似度计算本身，
+因此提供字符 n-gram 分词器作为快速替代：先用 CLEANUP_PATTERN 把标点替换为空格，
+再由一个正则表达式在 C 层一次取出汉字串内全部重叠的 n 字片段以及其他文字、数字组成的连续片段，不需要词典。
+
+分词器可以按对象传给 Document、TextProcessor 和 SimilarityCalculator，
+也可以用 set_default_tokenizer 设置进程级的默认分词器（命令行参数 --tokenizer）。
+分词配置（tokenizer_config）包含分词器名称，分词缓存、IDF 模型、结果缓存和语料库存储都不会混用不同分词器的结果。
+
+在 orig_0.8_* 样例上与 jieba 的对比（benchmarks/bench_tokenizers.py 可复现，分词缓存关闭）：
+    样例                 余弦 jieba / char2 / char3    综合 jieba / char2 / char3
+    orig_0.8_add.txt     0.9672 / 0.9820 / 0.9294      0.9007 / 0.9066 / 0.8856
+    orig_0.8_del.txt     0.9474 / 0.8964 / 0.8910      0.8336 / 0.8132 / 0.8110
+    orig_0.8_dis_1.txt   0.9867 / 0.9893 / 0.9736      0.9247 / 0.9257 / 0.9194
+    orig_0.8_dis_10.txt  0.9049 / 0.9104 / 0.9422      0.8455 / 0.8477 / 0.8604
+    orig_0.8_dis_15.txt  0.8747 / 0.8842 / 0.7779      0.7647 / 0.7685 / 0.7260
+综合相似度的排序与 jieba 一致；只看余弦相似度时 del 与 dis_10 两个得分接近的样例次序互换。
+分词吞吐量 jieba 约 0.4 MB/s（已加载词典），char2 约 7.7 MB/s，char3 约 9.4 MB/s。
+粗筛时可以用 char2 排除明显不相似的论文，再用 jieba 计算最终结果。
+"""
+
+import re
+
+# 可在命令行中选择的分词器
+TOKENIZERS = ('jieba', 'char2', 'char3')
+
+_default_tokenizer = None
+
+
+class Tokenizer:
+    """分词器接口"""
+
+    # 分词器名称，写入分词配置
+    name = None
+    # 分词结果拼接后是否等于原文（分词缓存、并行分词的词长数组和语料库存储依赖这一性质）
+    reversible = True
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    def config(self):
+        """分词器配置，分词结果随之变化的参数都应包含在内"""
+        return self.name
+
+    def prepare(self):
+        """提前加载分词所需的资源（如词典），默认无需加载"""
+
+    def tokenize(self, text, use_cache=True):
+        """
+        对文本进行分词
+
+        Args:
+            text (str): 输入文本
+            use_cache (bool): 是否允许读写分词缓存
+
+        Returns:
+            list[str]: 分词结果
+        """
+        raise NotImplementedError
+
+
+class JiebaTokenizer(Tokenizer):
+    """jieba 精确模式分词（保留空白和标点，拼接后等于原文）"""
+
+    name = 'jieba'
+
+    def config(self):
+        from jieba_dict import jieba_version
+
+        return f"jieba={jieba_version()}"
+
+    def prepare(self):
+        from jieba_dict import get_tokenizer
+
+        get_tokenizer()
+
+    def tokenize(self, text, use_cache=True):
+        from document import segment
+
+        if not use_cache:
+            from jieba_dict import get_tokenizer
+
+            return get_tokenizer().lcut(text)
+        return segment(text)
+
+
+class CharNgramTokenizer(Tokenizer):
+    """汉字 n-gram 分词：汉字串取重叠的 n 字片段，其他文字和数字的连续片段整体作为一个词"""
+
+    reversible = False
+
+    def __init__(self, n=2):
+        """
+        Args:
+            n (int): 汉字片段长度
+        """
+        if n < 1:
+            raise ValueError("n 必须为正整数")
+        from document import CLEANUP_PATTERN
+
+        self.n = n
+        self.name = f"char{n}"
+        self._cleanup = CLEANUP_PATTERN
+        # 第一个分支在每个汉字处向前看 n 个汉字并只消耗一个字符，从而取出全部重叠片段
+        self._pattern = re.compile(
+            rf'(?=([\u4e00-\u9fff]{{{n}}}))[\u4e00-\u9fff]|([^\W\u4e00-\u9fff]+)'
+        )
+
+    def __repr__(self):
+        return f"CharNgramTokenizer(n={self.n})"
+
+    def tokenize(self, text, use_cache=True):
+        matches = self._pattern.findall(self._cleanup.sub(' ', text))
+        return [ngram or word for ngram, word in matches if ngram or word]
+
+
+def create_tokenizer(name):
+    """
+    按名称创建分词器
+
+    Args:
+        name (str): TOKENIZERS 中的名称
+
+    Returns:
+        Tokenizer: 分词器
+    """
+    if name == 'jieba':
+        return JiebaTokenizer()
+    if name.startswith('char') and name[4:].isdigit():
+        return CharNgramTokenizer(int(name[4:]))
+    raise ValueError(f"不支持的分词器: {name}")
+
+
+def get_default_tokenizer():
+    """
+    获取默认分词器
+
+    Returns:
+        Tokenizer: 未设置时为 jieba
+    """
+    global _default_tokenizer
+    if _default_tokenizer is None:
+        _default_tokenizer = JiebaTokenizer()
+    return _default_tokenizer
+
+
+def set_default_tokenizer(tokenizer):
+    """
+    设置默认分词器
+
+    Args:
+        tokenizer (Tokenizer | None): 分词器，None 表示恢复 jieba
+    """
+    global _default_tokenizer
+    _default_tokenizer = tokenizer
@@ -0,0 +1,217 @@
+"""
+Winnowing 指纹模块
+
+该模块实现 MOSS 风格的 winnowing 文档指纹：对规范化文本的字符 k-gram
+计算滚动哈希，在每个长度为 window 的窗口中选取最小哈希作为指纹，
+再通过指纹匹配在线性时间内找出两篇文档中重复的片段及其位置。
+
+长度不少于 window + k - 1 的公共片段一定会被检测到。
+"""
+
+import re
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 多项式滚动哈希的基数，运算在 uint64 上自然溢出（即模 2^64）
+HASH_BASE = np.uint64(1000003)
+# 同一哈希在原文中最多记录的位置数，避免高度重复的文本产生平方级的匹配对
+MAX_POSITIONS_PER_HASH = 16
+
+# 非字母、数字、汉字的字符（含下划线）
+_NON_WORD_PATTERN = re.compile(r'[\W_]')
+
+
+def normalize(text):
+    """
+    规范化文本：只保留字母、数字和汉字并转为小写，同时记录每个字符在原文中的位置
+
+    Args:
+        text (str): 原文
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: (规范化文本的 Unicode 码点数组, 每个码点对应的原文下标)
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # 个别字符小写后长度会变化（如 'İ'），这些字符保持原样以保证下标一一对应
+        lowered = ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+    # 非文字字符替换为 \0，再用向量运算取出剩余字符及其下标
+    masked = _NON_WORD_PATTERN.sub('\0', lowered)
+    codes = np.frombuffer(masked.encode('utf-32-le'), dtype=np.uint32)
+    offsets = np.flatnonzero(codes)
+    return codes[offsets], offsets
+
+
+def kgram_hashes(codes, k):
+    """
+    计算全部字符 k-gram 的滚动哈希
+
+    Args:
+        codes (numpy.ndarray): 规范化文本的码点数组
+        k (int): k-gram 长度
+
+    Returns:
+        numpy.ndarray: 长度为 len(codes) - k + 1 的 uint64 哈希数组
+    """
+    if len(codes) < k:
+        return np.zeros(0, dtype=np.uint64)
+
+    codes = codes.astype(np.uint64)
+    count = len(codes) - k + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for j in range(k):
+        hashes = hashes * HASH_BASE + codes[j:j + count]
+    return hashes
+
+
+def winnow(hashes, window):
+    """
+    在每个窗口中选取最小哈希（有多个最小值时取最右侧）作为指纹
+
+    Args:
+        hashes (numpy.ndarray): k-gram 哈希数组
+        window (int): 窗口大小
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: (指纹哈希, 指纹在规范化文本中的位置)
+    """
+    if len(hashes) == 0:
+        return hashes, np.zeros(0, dtype=np.int64)
+    if len(hashes) < window:
+        position = len(hashes) - 1 - int(np.argmin(hashes[::-1]))
+        return hashes[position:position + 1], np.array([position])
+
+    windows = sliding_window_view(hashes, window)
+    rightmost = window - 1 - np.argmin(windows[:, ::-1], axis=1)
+    # 相邻窗口选出的位置单调不减，去掉连续重复即可
+    positions = np.arange(len(windows)) + rightmost
+    keep = np.ones(len(positions), dtype=bool)
+    keep[1:] = positions[1:] != positions[:-1]
+    positions = positions[keep]
+    return hashes[positions], positions
+
+
+class Winnower:
+    """Winnowing 指纹计算与匹配"""
+
+    def __init__(self, k=5, window=4):
+        """
+        Args:
+            k (int): 字符 k-gram 长度
+            window (int): winnowing 窗口大小
+        """
+        if k < 1 or window < 1:
+            raise ValueError("k 和 window 必须为正整数")
+        self.k = k
+        self.window = window
+
+    def fingerprint(self, text):
+        """
+        计算文本指纹
+
+        Args:
+            text (str): 原文
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+                (指纹哈希, 指纹在规范化文本中的位置, 规范化文本到原文的下标映射)
+        """
+        codes, offsets = normalize(text)
+        hashes, positions = winnow(kgram_hashes(codes, self.k), self.window)
+        return hashes, positions, offsets
+
+    def compare(self, original, comparison):
+        """
+        比较两篇文本，返回指纹相似度和重复片段
+
+        Args:
+            original (str): 原文
+            comparison (str): 待比较文本
+
+        Returns:
+            dict: score 为待比较文本指纹在原文中出现的比例；
+                  spans 为重复片段列表，每项包含两篇文本中的起止下标（左闭右开）和长度
+        """
+        hashes1, positions1, offsets1 = self.fingerprint(original)
+        hashes2, positions2, offsets2 = self.fingerprint(comparison)
+
+        if len(hashes2) == 0:
+            return {'score': 1.0 if len(hashes1) == 0 else 0.0, 'spans': []}
+
+        # 原文指纹按哈希排序，待比较文本的每个指纹用二分查找定位全部相同哈希
+        order = np.argsort(hashes1, kind='stable')
+        sorted_hashes = hashes1[order]
+        sorted_positions = positions1[order]
+        left = np.searchsorted(sorted_hashes, hashes2, side='left')
+        right = np.searchsorted(sorted_hashes, hashes2, side='right')
+        counts = np.minimum(right - left, MAX_POSITIONS_PER_HASH)
+        matched = int(np.count_nonzero(counts))
+
+        # 展开所有匹配对 (原文位置, 待比较文本位置)
+        total = int(counts.sum())
+        starts = np.repeat(left, counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        pairs1 = sorted_positions[starts + within]
+        pairs2 = np.repeat(positions2, counts)
+
+        spans = [
+            {
+                'original_start': int(offsets1[start1]),
+                'original_end': int(offsets1[end1 - 1]) + 1,
+                'comparison_start': int(offsets2[start2]),
+                'comparison_end': int(offsets2[end2 - 1]) + 1,
+                'length': end2 - start2,
+            }
+            for start1, end1, start2, end2 in self._merge_pairs(pairs1, pairs2)
+        ]
+        return {'score': matched / len(hashes2), 'spans': spans}
+
+    def _merge_pairs(self, positions1, positions2):
+        """
+        将同一对角线上相邻的匹配 k-gram 合并为连续片段（规范化文本坐标）
+
+        相邻指纹的间距不超过 window，间距在此范围内的匹配视为同一片段。
+
+        Returns:
+            list[tuple[int, int, int, int]]: (原文起点, 原文终点, 比较文本起点, 比较文本终点)，按比较文本位置排序
+        """
+        if len(positions1) == 0:
+            return []
+
+        # 按 (对角线, 原文位置) 排序；合成单个整数键比 lexsort 快
+        diagonals = positions2 - positions1
+        width = int(positions1.max()) + 1
+        order = np.argsort((diagonals - diagonals.min()) * width + positions1, kind='stable')
+        positions1 = positions1[order]
+        diagonals = diagonals[order]
+
+        breaks = np.ones(len(positions1), dtype=bool)
+        breaks[1:] = (diagonals[1:] != diagonals[:-1]) | (positions1[1:] - positions1[:-1] > self.k + self.window)
+        first = np.flatnonzero(breaks)
+        last = np.append(first[1:], len(positions1)) - 1
+
+        starts1 = positions1[first]
+        ends1 = positions1[last] + self.k
+        spans = sorted(zip(
+            starts1.tolist(), ends1.tolist(),
+            (starts1 + diagonals[first]).tolist(), (ends1 + diagonals[first]).tolist(),
+        ), key=lambda span: (span[2], span[0]))
+        return spans
+
+
+def compare_texts(original, comparison, k=5, window=4):
+    """
+    比较两篇文本的函数接口
+
+    Args:
+        original (str): 原文
+        comparison (str): 待比较文本
+        k (int): 字符 k-gram 长度
+        window (int): winnowing 窗口大小
+
+    Returns:
+        dict: 包含 score 和 spans 的比较结果
+    """
+    return Winnower(k, window).compare(original, comparison)